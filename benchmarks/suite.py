@@ -0,0 +1,226 @@
+import gc
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import click
+
+from benchmarks.synthetic import population, write_corpus, write_trace
+from pfuzz.gem5_statistics.tick_statistics import Tick_statistics
+from pfuzz.gem5_statistics.tick_table import DECODED, FETCHED, RETIRED, Tick_table
+from pfuzz.gem5_statistics.window_analysis import Window_analysis
+from pfuzz.mutation.mutation import Assembly_mutation, Mutation
+
+Result = Dict[str, float]
+Benchmark = Tuple[int, Callable[[], Any]]
+
+TEMPLATE_CONFIG = {"--flag-{}".format(number): range(16) for number in range(8)}
+
+
+def measure(items: int, func: Callable[[], Any], repeat: int) -> Result:
+    """
+    Best time of `repeat` runs and peak memory allocated by Python
+    in a separate traced run, as tracing slows the code down
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "items": items,
+        "seconds": best,
+        "per_second": items / best if best > 0 else 0.0,
+        "peak_bytes": peak,
+    }
+
+
+def trace_benchmarks(work_dir: Path, scale: float, seed: int) -> Dict[str, Benchmark]:
+    instructions = max(1, int(200_000 * scale))
+    path = work_dir / "trace.txt"
+    write_trace(path, instructions, seed)
+    statistics = Tick_statistics()
+    analysis = Window_analysis()
+    table: Tick_table = statistics.get_tick_statistics_list(str(path))
+
+    return {
+        "get_tick_statistics_list": (
+            instructions,
+            lambda: statistics.get_tick_statistics_list(str(path)),
+        ),
+        "worst_ratio_window": (
+            len(table),
+            lambda: analysis.worst_ratio_window(table, FETCHED, DECODED, 100),
+        ),
+        "longest_run_without_retired": (
+            len(table),
+            lambda: analysis.longest_run_without(table, RETIRED),
+        ),
+    }
+
+
+def assembly_benchmarks(
+    work_dir: Path, scale: float, seed: int
+) -> Dict[str, Benchmark]:
+    children = max(1, int(2_000 * scale))
+    paths = write_corpus(work_dir / "corpus", 20, seed=seed)
+    labels = {path: Assembly_mutation().find_labels_and_jumps(path) for path in paths}
+
+    def mutate() -> None:
+        random.seed(seed)
+        mutation = Assembly_mutation()
+        for child in range(children):
+            mutation.assembly_mutate(paths[child % len(paths)], 3, 1, child)
+
+    def crossover() -> None:
+        random.seed(seed)
+        mutation = Assembly_mutation()
+        for child in range(children):
+            path1 = paths[child % len(paths)]
+            path2 = paths[(child + 1) % len(paths)]
+            mutation.assembly_crossover(
+                path1, path2, labels[path1], labels[path2], 2, child
+            )
+
+    return {
+        "assembly_mutate": (children, mutate),
+        "assembly_crossover": (children, crossover),
+    }
+
+
+def genetic_benchmarks(scale: float, seed: int) -> Dict[str, Benchmark]:
+    size = max(2, int(64 * scale))
+    iterations = 20
+    reproduce = size // 2
+    evaluations = size + iterations * size
+
+    def run() -> None:
+        random.seed(seed)
+        generated: List[Dict[str, str]] = []
+        Mutation().genetic_func(
+            population(TEMPLATE_CONFIG, size, seed),
+            TEMPLATE_CONFIG,
+            iterations,
+            size,
+            reproduce,
+            func_generate=generated.append,
+            func_run=lambda: sum(int(value) for value in generated[-1].values()),
+            desired_output=-1,
+        )
+
+    return {"genetic_func": (evaluations, run)}
+
+
+def run_suite(
+    scale: float = 1.0,
+    repeat: int = 3,
+    seed: int = 0,
+    only: Tuple[str, ...] = (),
+) -> Dict[str, Result]:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        work_dir = Path(tmp_dir)
+        benchmarks = {
+            **trace_benchmarks(work_dir, scale, seed),
+            **assembly_benchmarks(work_dir, scale, seed),
+            **genetic_benchmarks(scale, seed),
+        }
+        return {
+            name: measure(items, func, repeat)
+            for name, (items, func) in benchmarks.items()
+            if not only or name in only
+        }
+
+
+def compare(
+    results: Dict[str, Result], baseline: Dict[str, Result], tolerance: float
+) -> List[str]:
+    """
+    Benchmarks whose throughput dropped or peak memory grew
+    by more than `tolerance` relative to the baseline
+    """
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        if result["per_second"] < before["per_second"] * (1 - tolerance):
+            regressions.append("{}: throughput".format(name))
+        if result["peak_bytes"] > before["peak_bytes"] * (1 + tolerance):
+            regressions.append("{}: peak memory".format(name))
+    return regressions
+
+
+def report(results: Dict[str, Result], baseline: Dict[str, Result]) -> str:
+    lines = [
+        "{:<30} {:>12} {:>14} {:>12} {:>10}".format(
+            "benchmark", "seconds", "items/s", "peak MiB", "vs base"
+        )
+    ]
+    for name, result in results.items():
+        before = baseline.get(name)
+        change = (
+            "{:+.1%}".format(result["per_second"] / before["per_second"] - 1)
+            if before and before["per_second"]
+            else "-"
+        )
+        lines.append(
+            "{:<30} {:>12.4f} {:>14.0f} {:>12.2f} {:>10}".format(
+                name,
+                result["seconds"],
+                result["per_second"],
+                result["peak_bytes"] / (1 << 20),
+                change,
+            )
+        )
+    return "\n".join(lines)
+
+
+@click.command()
+@click.option("--scale", type=float, default=1.0, help="Multiplier of workload sizes")
+@click.option("--repeat", type=int, default=3, help="Timed runs per benchmark")
+@click.option("--seed", type=int, default=0)
+@click.option("--only", multiple=True, help="Run only the named benchmarks")
+@click.option("--save", type=click.Path(path_type=Path), default=None)
+@click.option("--baseline", type=click.Path(path_type=Path), default=None)
+@click.option("--tolerance", type=float, default=0.25)
+def main(
+    scale: float,
+    repeat: int,
+    seed: int,
+    only: Tuple[str, ...],
+    save: Optional[Path],
+    baseline: Optional[Path],
+    tolerance: float,
+) -> None:
+    """Run the benchmarks, optionally checking them against a saved baseline"""
+    results = run_suite(scale, repeat, seed, only)
+    before: Dict[str, Result] = {}
+    if baseline is not None:
+        with open(baseline, "r") as baseline_file:
+            before = json.load(baseline_file)
+    click.echo(report(results, before))
+
+    if save is not None:
+        with open(save, "w") as save_file:
+            json.dump(results, save_file, indent=2)
+
+    regressions = compare(results, before, tolerance)
+    if regressions:
+        click.echo("Regressions:\n" + "\n".join(regressions), err=True)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import random
+from pathlib import Path
+from typing import Dict, List
+
+from pfuzz.mutation.mutation import RISCV_INSTRUCTIONS
+
+REGISTERS = ["a0", "a1", "a2", "a3", "t0", "t1", "t2", "s0", "s1", "sp"]
+BRANCHES = ["beq", "bne", "blt", "bge"]
+
+
+def write_trace(path: Path, instructions: int, seed: int = 0) -> None:
+    """
+    O3PipeView trace of `instructions` instructions fetched a few at a time,
+    each going through the pipeline with random stage latencies. Some
+    instructions are squashed before completion, some retire with a store
+    """
+    rng = random.Random(seed)
+    tick = 1000
+    with open(path, "w") as trace:
+        for number in range(instructions):
+            if rng.random() < 0.4:
+                tick += 500 * rng.randint(1, 4)
+            stage_tick = tick
+            lines = [
+                "O3PipeView:fetch:{}:0x{:08x}:0:{}:  {} a0, a1, a2\n".format(
+                    stage_tick,
+                    0x10000 + 4 * number,
+                    number + 1,
+                    rng.choice(RISCV_INSTRUCTIONS),
+                )
+            ]
+            squashed = rng.random() < 0.05
+            for stage in ("decode", "rename", "dispatch", "issue", "complete"):
+                stage_tick += 500 * rng.randint(1, 6)
+                if squashed and stage == "complete":
+                    stage_tick = 0
+                lines.append("O3PipeView:{}:{}\n".format(stage, stage_tick))
+            retire_tick = 0 if squashed else stage_tick + 500 * rng.randint(1, 8)
+            store_tick = retire_tick + 500 if rng.random() < 0.2 else 0
+            lines.append(
+                "O3PipeView:retire:{}:store:{}\n".format(retire_tick, store_tick)
+            )
+            trace.writelines(lines)
+
+
+def write_program(path: Path, blocks: int, block_size: int, seed: int = 0) -> None:
+    """RISC-V assembly function of `blocks` labelled basic blocks"""
+    rng = random.Random(seed)
+    lines = ["\t.text\n", "\t.globl main\n", "main:\n"]
+    for block in range(blocks):
+        lines.append(".L{}:\n".format(block))
+        for _ in range(block_size):
+            destination, *sources = rng.sample(REGISTERS, 3)
+            lines.append(
+                "\t{} {}, {}, {}\n".format(
+                    rng.choice(RISCV_INSTRUCTIONS), destination, *sources
+                )
+            )
+        lines.append(
+            "\t{} a0, a1, .L{}\n".format(rng.choice(BRANCHES), rng.randrange(blocks))
+        )
+    lines.append("\tret\n")
+    with open(path, "w") as program:
+        program.writelines(lines)
+
+
+def write_corpus(
+    directory: Path,
+    programs: int,
+    blocks: int = 32,
+    block_size: int = 8,
+    seed: int = 0,
+) -> List[str]:
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for number in range(programs):
+        path = directory / "program-{}.s".format(number)
+        write_program(path, blocks, block_size, seed * programs + number)
+        paths.append(str(path))
+    return paths
+
+
+def population(
+    template_config: Dict[str, range], size: int, seed: int = 0
+) -> List[tuple[Dict[str, str], float]]:
+    rng = random.Random(seed)
+    return [
+        (
+            {flag: str(rng.choice(values)) for flag, values in template_config.items()},
+            0.0,
+        )
+        for _ in range(size)
+    ]
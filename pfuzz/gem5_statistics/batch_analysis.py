@@ -0,0 +1,212 @@
+import csv
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import click
+
+from pfuzz.gem5_statistics.table_cache import Table_cache
+from pfuzz.gem5_statistics.tick_statistics import Tick_statistics
+from pfuzz.gem5_statistics.trace_decoder import DECODE_ERRORS
+
+Report = Dict[str, Any]
+
+METRICS = ("stall_ticks", "fetch_decode_ratio", "cycles_per_instruction")
+FIELDS = (
+    "rank",
+    "path",
+    "size",
+    "ticks",
+    *METRICS,
+    "stall_start_tick",
+    "ratio_start_tick",
+    "seconds",
+    "error",
+)
+
+
+def analyze_trace(
+    path_to_trace: str,
+    cycle_number: int = 100,
+    cache_dir: Optional[Path] = None,
+) -> Report:
+    """Stall and ratio analyses of a single trace"""
+    start = time.perf_counter()
+    report: Report = {"path": path_to_trace}
+    table_cache = None if cache_dir is None else Table_cache(cache_dir)
+    statistics = Tick_statistics(table_cache)
+    try:
+        report["size"] = os.path.getsize(path_to_trace)
+        table = statistics.get_tick_statistics_list(path_to_trace)
+    except DECODE_ERRORS as error:
+        report["error"] = "{}: {}".format(type(error).__name__, error)
+        report["seconds"] = time.perf_counter() - start
+        return report
+
+    report["ticks"] = len(table)
+    windows = statistics.get_pipeline_windows(table, cycle_number)
+    objectives = statistics.get_pipeline_objectives(
+        table, cycle_number, windows=windows
+    )
+    report.update(zip(METRICS, objectives, strict=True))
+    if len(table):
+        stall, ratio = windows
+        report["stall_start_tick"] = None if stall is None else stall.start_tick
+        report["ratio_start_tick"] = None if ratio is None else ratio.start_tick
+    report["seconds"] = time.perf_counter() - start
+    return report
+
+
+def _analyze_chunk(
+    paths: List[str], cycle_number: int, cache_dir: Optional[Path]
+) -> List[Report]:
+    return [analyze_trace(path, cycle_number, cache_dir) for path in paths]
+
+
+def find_traces(patterns: Sequence[str]) -> List[str]:
+    """
+    Trace files given by paths, glob patterns or directories,
+    a directory standing for every file in it except table sidecars
+    """
+    traces = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "**", "*")
+        for path in glob.glob(pattern, recursive=True):
+            if os.path.isfile(path) and not path.endswith(".ticks"):
+                traces.add(path)
+    return sorted(traces)
+
+
+class Batch_analysis:
+    """
+    Analysis of many traces over a process pool. Traces are scheduled
+    largest first, so a huge trace does not start last and hold up the
+    batch, and small traces are grouped into chunks of about `chunk_bytes`
+    to keep the per-task overhead low
+
+    :cache_dir: directory of the table sidecars, see Table_cache
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        cycle_number: int = 100,
+        chunk_bytes: int = 64 << 20,
+        cache_dir: Optional[Path] = None,
+    ) -> None:
+        self.max_workers = max_workers
+        self.cycle_number = cycle_number
+        self.chunk_bytes = chunk_bytes
+        self.cache_dir = cache_dir
+
+    def chunks(self, traces: Sequence[str]) -> List[List[str]]:
+        """Traces in chunks, the chunks and their traces largest first"""
+        sized = sorted(((os.path.getsize(path), path) for path in traces), reverse=True)
+        chunks: List[List[str]] = []
+        chunk_size = self.chunk_bytes
+        for size, path in sized:
+            if chunk_size + size > self.chunk_bytes:
+                chunks.append([])
+                chunk_size = 0
+            chunks[-1].append(path)
+            chunk_size += size
+        return chunks
+
+    def run(self, traces: Sequence[str]) -> List[Report]:
+        """Reports of the traces in the order they finish"""
+        arguments = (self.cycle_number, self.cache_dir)
+        chunks = self.chunks(traces)
+        if self.max_workers == 1 or len(chunks) <= 1:
+            return [
+                report
+                for chunk in chunks
+                for report in _analyze_chunk(chunk, *arguments)
+            ]
+
+        reports = []
+        with ProcessPoolExecutor(self.max_workers) as executor:
+            futures = [
+                executor.submit(_analyze_chunk, chunk, *arguments) for chunk in chunks
+            ]
+            for future in as_completed(futures):
+                reports.extend(future.result())
+        return reports
+
+
+def rank(
+    reports: List[Report], sort_by: str = "stall_ticks", top: Optional[int] = None
+) -> List[Report]:
+    """
+    Reports of the worst programs first by the `sort_by` metric, ties
+    in path order and failed traces last, numbered by their rank
+    """
+    ranked = sorted(
+        sorted(reports, key=lambda report: str(report["path"])),
+        key=lambda report: (
+            "error" not in report,
+            report.get(sort_by) or 0.0,
+        ),
+        reverse=True,
+    )[:top]
+    for number, report in enumerate(ranked, 1):
+        report["rank"] = number
+    return ranked
+
+
+def write_json(reports: List[Report], path: Path) -> None:
+    with open(path, "w") as report_file:
+        json.dump(reports, report_file, indent=2)
+
+
+def write_csv(reports: List[Report], path: Path) -> None:
+    with open(path, "w", newline="") as report_file:
+        writer = csv.DictWriter(report_file, FIELDS)
+        writer.writeheader()
+        writer.writerows(reports)
+
+
+@click.command()
+@click.argument("traces", nargs=-1, required=True)
+@click.option("--jobs", type=int, default=None, help="Worker processes")
+@click.option("--sort-by", type=click.Choice(METRICS), default="stall_ticks")
+@click.option("--top", type=int, default=None, help="Keep only the worst N")
+@click.option("--cycle-number", type=int, default=100, help="Ratio window length")
+@click.option("--cache-dir", type=click.Path(path_type=Path), default=None)
+@click.option("--json", "json_path", type=click.Path(path_type=Path), default=None)
+@click.option("--csv", "csv_path", type=click.Path(path_type=Path), default=None)
+def main(
+    traces: Tuple[str, ...],
+    jobs: Optional[int],
+    sort_by: str,
+    top: Optional[int],
+    cycle_number: int,
+    cache_dir: Optional[Path],
+    json_path: Optional[Path],
+    csv_path: Optional[Path],
+) -> None:
+    """Rank the programs of TRACES (files, globs or directories) by stress"""
+    paths = find_traces(traces)
+    reports = rank(
+        Batch_analysis(jobs, cycle_number, cache_dir=cache_dir).run(paths),
+        sort_by,
+        top,
+    )
+    if json_path is not None:
+        write_json(reports, json_path)
+    if csv_path is not None:
+        write_csv(reports, csv_path)
+    for report in reports:
+        click.echo(
+            "{:>5} {:>14} {}".format(
+                report["rank"], report.get(sort_by, "error"), report["path"]
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
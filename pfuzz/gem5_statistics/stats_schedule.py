@@ -0,0 +1,76 @@
+import importlib
+from typing import Any, Iterable, List, Optional, Tuple
+
+RESET = "reset"
+DUMP = "dump"
+
+Stats_window = Tuple[int, int]
+
+
+def coalesce(windows: Iterable[Stats_window]) -> List[Stats_window]:
+    """
+    Sort stats windows by their end and drop the repeated ones. A window
+    starting before the end of the previous one is clipped to start there,
+    since the stats cannot be reset in the middle of another window
+    """
+    coalesced: List[Stats_window] = []
+    for start, end in sorted(set(windows), key=lambda window: (window[1], window[0])):
+        if coalesced and end == coalesced[-1][1]:
+            continue
+        if coalesced:
+            start = max(start, coalesced[-1][1])
+        coalesced.append((min(start, end), end))
+    return coalesced
+
+
+class Stats_scheduler:
+    """
+    Scheduler of gem5 stats resets and dumps for a set of tick windows.
+    The windows are sorted and coalesced into a plan of (tick, action)
+    pairs, and the simulation jumps from one planned tick to the next
+    with a single m5.simulate call instead of polling m5.curTick
+
+    :m5: gem5 m5 module, imported when the scheduler runs if None
+    """
+
+    def __init__(self, m5: Optional[Any] = None) -> None:
+        self.m5 = m5
+        self.simulate_calls = 0
+        self.dumps = 0
+
+    def plan(self, windows: Iterable[Stats_window]) -> List[Tuple[int, str]]:
+        """Resets and dumps of the windows in the order of their ticks"""
+        actions: List[Tuple[int, str]] = []
+        for start, end in coalesce(windows):
+            if start < end:
+                actions.append((start, RESET))
+            actions.append((end, DUMP))
+        return sorted(actions, key=lambda action: (action[0], action[1] == RESET))
+
+    def run(self, windows: Iterable[Stats_window]) -> int:
+        """
+        Simulate up to the end of the last window dumping the stats of every
+        window. Actions planned before the current tick happen right away,
+        the run stops early if the simulation exits before the next action
+
+        :return: number of dumped windows
+        """
+        m5 = importlib.import_module("m5") if self.m5 is None else self.m5
+        current = m5.curTick()
+        for tick, action in self.plan(windows):
+            if tick > current:
+                m5.simulate(tick - current)
+                self.simulate_calls += 1
+                current = m5.curTick()
+                if current < tick:
+                    break
+            if action == RESET:
+                m5.stats.reset()
+            else:
+                m5.stats.dump()
+                self.dumps += 1
+        return self.dumps
+
+    def dump_exclusive(self, ticks: Iterable[int], interval: int = 1000) -> int:
+        """Dump the stats of the `interval` ticks before each of the ticks"""
+        return self.run((tick - interval, tick) for tick in ticks)
@@ -0,0 +1,98 @@
+import hashlib
+import mmap
+import os
+import struct
+from array import array
+from pathlib import Path
+from typing import List, Optional, cast
+
+from pfuzz.gem5_statistics.tick_table import STAGES, Tick_table
+
+# read as a native integer, so sidecars written on a machine
+# with another byte order do not match
+MAGIC = 0x5446_5A50
+VERSION = 1
+HEADER = struct.Struct("=IIQQQ16s")
+
+
+class Table_cache:
+    """
+    Sidecar files holding parsed Tick_table columns in binary form: a header
+    with the format version and the size, modification time and path hash
+    of the trace, then the tick numbers as int64 and the counts of every
+    stage as uint32. A sidecar is memory-mapped on load and the table
+    columns are views into it, so loading takes no parsing and processes
+    analysing the same trace share its pages. Loaded tables are read-only
+
+    :directory: where sidecars are kept, next to the traces if None
+    """
+
+    def __init__(self, directory: Optional[Path] = None) -> None:
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        if directory is not None:
+            directory.mkdir(parents=True, exist_ok=True)
+
+    def _path_hash(self, path_to_trace: str) -> bytes:
+        return hashlib.sha256(os.path.abspath(path_to_trace).encode()).digest()[:16]
+
+    def sidecar_path(self, path_to_trace: str) -> Path:
+        if self.directory is None:
+            return Path(path_to_trace + ".ticks")
+        return self.directory / (self._path_hash(path_to_trace).hex() + ".ticks")
+
+    def _header(self, path_to_trace: str, rows: int) -> bytes:
+        stat = os.stat(path_to_trace)
+        return HEADER.pack(
+            MAGIC,
+            VERSION,
+            stat.st_size,
+            stat.st_mtime_ns,
+            rows,
+            self._path_hash(path_to_trace),
+        )
+
+    def load(self, path_to_trace: str) -> Optional[Tick_table]:
+        """Table of the trace if an up-to-date sidecar exists"""
+        try:
+            with open(self.sidecar_path(path_to_trace), "rb") as sidecar:
+                data = mmap.mmap(sidecar.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            self.misses += 1
+            return None
+
+        rows = HEADER.unpack_from(data)[4] if len(data) >= HEADER.size else -1
+        if (
+            rows < 0
+            or data[: HEADER.size] != self._header(path_to_trace, rows)
+            or len(data) != HEADER.size + rows * (8 + 4 * len(STAGES))
+        ):
+            data.close()
+            self.misses += 1
+            return None
+
+        view = memoryview(data)
+        offset = HEADER.size + 8 * rows
+        tick_numbers = view[HEADER.size : offset].cast("q")
+        during: List[memoryview] = []
+        for _ in STAGES:
+            during.append(view[offset : offset + 4 * rows].cast("I"))
+            offset += 4 * rows
+        self.hits += 1
+        # the views provide the read-only part of the array interface
+        return Tick_table.from_buffers(
+            cast("array[int]", tick_numbers), cast("list[array[int]]", during)
+        )
+
+    def store(self, path_to_trace: str, table: Tick_table) -> None:
+        sidecar_path = self.sidecar_path(path_to_trace)
+        temporary = sidecar_path.with_name(
+            "{}.{}.tmp".format(sidecar_path.name, os.getpid())
+        )
+        with open(temporary, "wb") as sidecar:
+            sidecar.write(self._header(path_to_trace, len(table)))
+            sidecar.write(table.tick_numbers.tobytes())
+            for column in table.during:
+                sidecar.write(column.tobytes())
+        os.replace(temporary, sidecar_path)
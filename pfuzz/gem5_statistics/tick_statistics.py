@@ -1,10 +1,25 @@
 from dataclasses import dataclass
-from typing import Dict, List
+from typing import Iterator, List, Optional, Tuple
+
+from pfuzz.gem5_statistics.stats_schedule import Stats_scheduler
+from pfuzz.gem5_statistics.table_cache import Table_cache
+from pfuzz.gem5_statistics.tick_table import (
+    DECODED,
+    FETCHED,
+    RETIRED,
+    STAGES,
+    Tick_row,
+    Tick_table,
+    Tick_window,
+)
+from pfuzz.gem5_statistics.trace_decoder import Trace_decoder
+from pfuzz.gem5_statistics.window_analysis import Window, Window_analysis
+from pfuzz.metrics import PARSE, metrics
 
 
 class Tick_statistics:
-    def __init__(self) -> None:
-        pass
+    def __init__(self, table_cache: Optional[Table_cache] = None) -> None:
+        self.table_cache = table_cache
 
     """
     Class containing all the neccessary tools
@@ -37,156 +52,155 @@ class Tick_statistics:
         retired_so_far: int = 0
         stored_so_far: int = 0
 
-    def update_so_far_stages_numbers(
-        self, ticks: Dict[str, _Tick], tick_number: str
-    ) -> None:
-        ticks[tick_number].fetched_so_far = ticks["so_far"].fetched_so_far
-        ticks[tick_number].decoded_so_far = ticks["so_far"].decoded_so_far
-        ticks[tick_number].renamed_so_far = ticks["so_far"].renamed_so_far
-        ticks[tick_number].dispatched_so_far = ticks["so_far"].dispatched_so_far
-        ticks[tick_number].issued_so_far = ticks["so_far"].issued_so_far
-        ticks[tick_number].completed_so_far = ticks["so_far"].completed_so_far
-        ticks[tick_number].retired_so_far = ticks["so_far"].retired_so_far
-        ticks[tick_number].stored_so_far = ticks["so_far"].stored_so_far
-
-    def proccess_stage(
-        self, stage: str, ticks: Dict[str, _Tick], current_tick: str
-    ) -> str:
-        stage = stage.removeprefix("O3PipeView:")
-        prefix = stage[0:3]
-        tick_number = (
-            stage.split(":")[1].rstrip()
-            if stage.split(":")[1].rstrip() != "0"
-            else current_tick
-        )
-
-        if tick_number not in ticks:
-            ticks[tick_number] = self._Tick()
-
-        if prefix == "fet":
-            ticks[tick_number].tick_number = int(tick_number)
-            ticks[tick_number].fetched_during_this_tick += 1
-            ticks["so_far"].fetched_so_far += 1
-        elif prefix == "dec":
-            ticks[tick_number].tick_number = int(tick_number)
-            ticks[tick_number].decoded_during_this_tick += 1
-            ticks["so_far"].decoded_so_far += 1
-        elif prefix == "ren":
-            ticks[tick_number].tick_number = int(tick_number)
-            ticks[tick_number].renamed_during_this_tick += 1
-            ticks["so_far"].renamed_so_far += 1
-        elif prefix == "dis":
-            ticks[tick_number].tick_number = int(tick_number)
-            ticks[tick_number].dispatched_during_this_tick += 1
-            ticks["so_far"].dispatched_so_far += 1
-        elif prefix == "iss":
-            ticks[tick_number].tick_number = int(tick_number)
-            ticks[tick_number].issued_during_this_tick += 1
-            ticks["so_far"].issued_so_far += 1
-        elif prefix == "com":
-            ticks[tick_number].tick_number = int(tick_number)
-            ticks[tick_number].completed_during_this_tick += 1
-            ticks["so_far"].completed_so_far += 1
-        elif prefix == "ret":
-            ticks[tick_number].tick_number = int(tick_number)
-            ticks[tick_number].retired_during_this_tick += 1
-            ticks["so_far"].retired_so_far += 1
-
-            retire_tick = tick_number
-            self.update_so_far_stages_numbers(ticks, retire_tick)
-
-            tick_number = (
-                stage.split(":")[3].rstrip()
-                if stage.split(":")[3].rstrip() != "0"
-                else retire_tick
-            )
-
-            if tick_number not in ticks:
-                ticks[tick_number] = self._Tick()
-
-            ticks[tick_number].tick_number = int(tick_number)
-            ticks[tick_number].stored_during_this_tick += 1
-            ticks["so_far"].stored_so_far += 1
-
-        self.update_so_far_stages_numbers(ticks, tick_number)
-        return tick_number
-
-    def get_tick_statistics_list(self, path_to_trace: str) -> List[_Tick]:
+    def iter_ticks(self, path_to_trace: str) -> Iterator[_Tick]:
+        """
+        Stream per-tick records of a trace in ascending tick order with bounded
+        memory. gem5 dumps instructions in fetch order, so once a fetch at some
+        tick is seen, every earlier tick is final and is yielded right away.
+        Events arriving for an already yielded tick are counted at the oldest
+        tick still pending
+
+        :path_to_trace: path to a plain, gzip or zstd compressed trace
+        :return: iterator over Tick dataclass instances
+        """
+        window = Tick_window()
+        so_far = [0] * len(STAGES)
+
+        for stage, tick_number in Trace_decoder().file_events(path_to_trace):
+            if not window.add(stage, tick_number):
+                window.add(stage, window.watermark)
+            for finished, during in window.finished():
+                yield self._finish_tick(finished, during, so_far)
+
+        for finished, during in window.drain():
+            yield self._finish_tick(finished, during, so_far)
+
+    def _finish_tick(
+        self, tick_number: int, during: List[int], so_far: List[int]
+    ) -> _Tick:
+        for stage, count in enumerate(during):
+            so_far[stage] += count
+        return self._Tick(tick_number, *during, *so_far)
+
+    def get_tick_statistics_list(self, path_to_trace: str) -> Tick_table:
         """
         Function for aquiring the information for each tick from a given trace
-        in a form of a dictionary of instances of Tick dataclass
+        in a form of a columnar table sorted by tick number, whose rows have
+        the same attributes as the Tick dataclass
 
         :path_to_trace: path to where the examined trace is stored
-        :return: dictionary with Tick dataclass instances containing information for each tick from trace
+        :return: table containing information for each tick from trace,
+            loaded from and saved to the table cache if there is one
         """
-        ticks = {}
-        ticks["so_far"] = self._Tick()
-
-        with open(path_to_trace, "r") as trace:
-
-            lines = trace.readlines()
-            current_tick = "0"
-
-            for line in lines:
-                old_tick = current_tick
-                current_tick = self.proccess_stage(line, ticks, old_tick)
-
-        tick_list = list(ticks.values())
-        tick_list.sort(key=lambda x: x.tick_number)
-        return tick_list
+        if self.table_cache is not None:
+            cached = self.table_cache.load(path_to_trace)
+            if cached is not None:
+                return cached
+        with metrics.stage(PARSE):
+            table = Trace_decoder().decode_file(path_to_trace).table()
+        if self.table_cache is not None:
+            try:
+                self.table_cache.store(path_to_trace, table)
+            except OSError:
+                # the sidecar only saves parsing next time, e.g. a read-only
+                # trace directory must not lose the parsed table
+                pass
+        return table
 
     def get_longest_tick_sequence_without_retired(
         self,
-        ticks_list: List[_Tick],
+        ticks_list: Tick_table,
     ) -> List[int]:
-        count, count_max = 0, 0
-        tick_sequence, longest_tick_sequence = [], []
-
-        for tick in ticks_list:
-            if tick.retired_during_this_tick == 0:
-                count += 1
-                tick_sequence.append(tick.tick_number)
-            else:
-                if count >= count_max:
-                    count = count_max
-                    longest_tick_sequence = tick_sequence
-                    tick_sequence = []
-                    count = 0
-        longest_tick_sequence.reverse()
-        return longest_tick_sequence
+        """
+        Function for finding the longest sequence of ticks
+        during which no instruction was retired
 
-    def get_worst_fetch_decode_ratio_cycle_sequence(
-        self, ticks_list: List[_Tick], cycle_number: int
-    ) -> List[_Tick]:
-        worst_ratio = 0.0
-        worst_sequence = [self._Tick()]
+        :ticks_list: table of ticks from get_tick_statistics_list
+        :return: tick numbers of the sequence in ascending order
+        """
+        window = Window_analysis().longest_run_without(ticks_list, RETIRED)
+        if window is None:
+            return []
+        return list(ticks_list.tick_numbers[window.start : window.end])
 
-        for i in range(1, len(ticks_list) - cycle_number):
-            fetched = 0
-            decoded = 0
-            temp_ratio = 0.0
-            sequence_examined = []
+    def get_worst_fetch_decode_ratio_cycle_sequence(
+        self, ticks_list: Tick_table, cycle_number: int
+    ) -> List[Tick_row]:
+        """
+        Function for finding the sequence of `cycle_number` ticks
+        with the highest fetched to decoded instructions ratio
 
-            for j in range(i, cycle_number):
-                sequence_examined.append(ticks_list[j])
-                fetched += ticks_list[j].fetched_during_this_tick
-                decoded += ticks_list[j].decoded_during_this_tick
+        :ticks_list: table of ticks from get_tick_statistics_list
+        :cycle_number: length of the examined sequences
+        :return: ticks of the worst sequence
+        """
+        window = Window_analysis().worst_ratio_window(
+            ticks_list, FETCHED, DECODED, cycle_number
+        )
+        if window is None:
+            return []
+        return [ticks_list[index] for index in range(window.start, window.end)]
 
-            temp_ratio = fetched if decoded == 0 else fetched / decoded
+    def get_pipeline_windows(
+        self, ticks_list: Tick_table, cycle_number: int = 100
+    ) -> Tuple[Optional[Window], Optional[Window]]:
+        """
+        Function for finding the windows the pipeline objectives are
+        computed from
 
-            if temp_ratio > worst_ratio:
-                worst_ratio = temp_ratio
+        :ticks_list: table of ticks from get_tick_statistics_list
+        :cycle_number: length of the sequences examined for the worst ratio
+        :return: the longest sequence without retired instructions and the
+            `cycle_number` ticks with the worst fetched to decoded ratio
+        """
+        if not len(ticks_list):
+            return None, None
+        analysis = Window_analysis()
+        return (
+            analysis.longest_run_without(ticks_list, RETIRED),
+            analysis.worst_ratio_window(
+                ticks_list, FETCHED, DECODED, min(cycle_number, len(ticks_list))
+            ),
+        )
 
-        return worst_sequence
+    def get_pipeline_objectives(
+        self,
+        ticks_list: Tick_table,
+        cycle_number: int = 100,
+        cycle_ticks: int = 1000,
+        windows: Optional[Tuple[Optional[Window], Optional[Window]]] = None,
+    ) -> Tuple[float, float, float]:
+        """
+        Function for summarizing a trace as a vector of stress metrics,
+        each one higher for a more stressed pipeline
+
+        :ticks_list: table of ticks from get_tick_statistics_list
+        :cycle_number: length of the sequences examined for the worst ratio
+        :cycle_ticks: number of ticks in a processor cycle
+        :windows: result of get_pipeline_windows if already computed
+        :return: ticks spanned by the longest sequence without retired
+            instructions, the worst fetched to decoded ratio over
+            `cycle_number` ticks and the number of cycles per retired
+            instruction
+        """
+        if not len(ticks_list):
+            return (0.0, 0.0, 0.0)
+        if windows is None:
+            windows = self.get_pipeline_windows(ticks_list, cycle_number)
+        stall, ratio = windows
+        ticks = ticks_list.tick_numbers
+        cycles = (ticks[-1] - ticks[0]) / cycle_ticks + 1
+        retired = sum(ticks_list.during[RETIRED])
+        return (
+            0.0 if stall is None else float(stall.end_tick - stall.start_tick),
+            0.0 if ratio is None else ratio.value,
+            cycles / max(retired, 1),
+        )
 
-    def get_stats_for_certain_ticks_exclusively(self, ticks: List[int]) -> None:
+    def get_stats_for_certain_ticks_exclusively(
+        self, ticks: List[int], interval: int = 1000
+    ) -> None:
         """Function to be put into simulation to generate stats for each
-        tick exclusively in stats.txt (not commulative stats)"""
-        for tick in ticks:
-            while True:
-                if m5.curTick() == tick - 1000:  # type: ignore[name-defined] # noqa: F821
-                    m5.stats.reset()  # type: ignore[name-defined] # noqa: F821
-                if m5.curTick() == tick:  # type: ignore[name-defined] # noqa: F821
-                    m5.stats.dump()  # type: ignore[name-defined] # noqa: F821
-                    break
-                m5.simulate(1000)  # type: ignore[name-defined] # noqa: F821
+        tick exclusively in stats.txt (not commulative stats), reset
+        `interval` ticks before it"""
+        Stats_scheduler().dump_exclusive(ticks, interval)
@@ -0,0 +1,211 @@
+import heapq
+from array import array
+from itertools import accumulate
+from typing import Dict, Iterator, List, Optional, Tuple
+
+STAGES = (
+    "fetched",
+    "decoded",
+    "renamed",
+    "dispatched",
+    "issued",
+    "completed",
+    "retired",
+    "stored",
+)
+FETCHED, DECODED, RENAMED, DISPATCHED, ISSUED, COMPLETED, RETIRED, STORED = range(8)
+
+
+class Tick_window:
+    """
+    Counters of the ticks that may still receive events. gem5 dumps
+    instructions in fetch order, so once a fetch at some tick is seen,
+    every earlier tick is finished
+    """
+
+    def __init__(self) -> None:
+        self.pending: Dict[int, List[int]] = {}
+        self.order: List[int] = []
+        self.watermark = 0
+
+    def add(self, stage: int, tick_number: int, count: int = 1) -> bool:
+        """
+        Count an event, returning False if its tick was already finished
+        and the event has to be handled by the caller
+        """
+        if tick_number not in self.pending:
+            if tick_number < self.watermark:
+                return False
+            self.pending[tick_number] = [0] * len(STAGES)
+            heapq.heappush(self.order, tick_number)
+        self.pending[tick_number][stage] += count
+        if stage == FETCHED and tick_number > self.watermark:
+            self.watermark = tick_number
+        return True
+
+    def finished(self) -> Iterator[Tuple[int, List[int]]]:
+        """Pop the ticks below the watermark in ascending order"""
+        while self.order and self.order[0] < self.watermark:
+            tick_number = heapq.heappop(self.order)
+            yield tick_number, self.pending.pop(tick_number)
+
+    def drain(self) -> Iterator[Tuple[int, List[int]]]:
+        """Pop all the remaining ticks in ascending order"""
+        while self.order:
+            tick_number = heapq.heappop(self.order)
+            yield tick_number, self.pending.pop(tick_number)
+
+
+class Tick_table:
+    """
+    Columnar storage of per-tick stage counters sorted by tick number.
+    Every stage has an array of counts during each tick, the cumulative
+    "so far" column of a stage is computed once by prefix sum on first use
+    """
+
+    def __init__(self) -> None:
+        self.tick_numbers = array("q")
+        self.during = [array("I") for _ in STAGES]
+        self._so_far: List[Optional[array[int]]] = [None] * len(STAGES)
+
+    @classmethod
+    def from_columns(
+        cls, tick_numbers: List[int], during: List[List[int]]
+    ) -> "Tick_table":
+        """Table of sorted tick numbers and the counts of every stage"""
+        table = cls()
+        table.tick_numbers = array("q", tick_numbers)
+        table.during = [array("I", column) for column in during]
+        return table
+
+    @classmethod
+    def from_buffers(
+        cls, tick_numbers: "array[int]", during: List["array[int]"]
+    ) -> "Tick_table":
+        """Table using the given columns without copying them"""
+        table = cls()
+        table.tick_numbers = tick_numbers
+        table.during = during
+        return table
+
+    def append(self, tick_number: int, counts: List[int]) -> None:
+        """Append a tick that is greater than every tick in the table"""
+        self._invalidate()
+        self.tick_numbers.append(tick_number)
+        for column, count in zip(self.during, counts, strict=True):
+            column.append(count)
+
+    def so_far(self, stage: int) -> "array[int]":
+        so_far = self._so_far[stage]
+        if so_far is None:
+            so_far = array("q", accumulate(self.during[stage]))
+            self._so_far[stage] = so_far
+        return so_far
+
+    def _invalidate(self) -> None:
+        self._so_far = [None] * len(STAGES)
+
+    def __len__(self) -> int:
+        return len(self.tick_numbers)
+
+    def __getitem__(self, index: int) -> "Tick_row":
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("tick index out of range")
+        return Tick_row(self, index)
+
+    def __iter__(self) -> Iterator["Tick_row"]:
+        for index in range(len(self)):
+            yield Tick_row(self, index)
+
+
+class Tick_row:
+    """
+    Lightweight view of a single row of a Tick_table with the same
+    attributes as Tick_statistics._Tick
+    """
+
+    __slots__ = ("table", "index")
+
+    def __init__(self, table: Tick_table, index: int) -> None:
+        self.table = table
+        self.index = index
+
+    def astuple(self) -> Tuple[int, ...]:
+        return (
+            self.tick_number,
+            *(column[self.index] for column in self.table.during),
+            *(self.table.so_far(stage)[self.index] for stage in range(len(STAGES))),
+        )
+
+    def __repr__(self) -> str:
+        return "Tick_row{}".format(self.astuple())
+
+    @property
+    def tick_number(self) -> int:
+        return self.table.tick_numbers[self.index]
+
+    @property
+    def fetched_during_this_tick(self) -> int:
+        return self.table.during[FETCHED][self.index]
+
+    @property
+    def decoded_during_this_tick(self) -> int:
+        return self.table.during[DECODED][self.index]
+
+    @property
+    def renamed_during_this_tick(self) -> int:
+        return self.table.during[RENAMED][self.index]
+
+    @property
+    def dispatched_during_this_tick(self) -> int:
+        return self.table.during[DISPATCHED][self.index]
+
+    @property
+    def issued_during_this_tick(self) -> int:
+        return self.table.during[ISSUED][self.index]
+
+    @property
+    def completed_during_this_tick(self) -> int:
+        return self.table.during[COMPLETED][self.index]
+
+    @property
+    def retired_during_this_tick(self) -> int:
+        return self.table.during[RETIRED][self.index]
+
+    @property
+    def stored_during_this_tick(self) -> int:
+        return self.table.during[STORED][self.index]
+
+    @property
+    def fetched_so_far(self) -> int:
+        return self.table.so_far(FETCHED)[self.index]
+
+    @property
+    def decoded_so_far(self) -> int:
+        return self.table.so_far(DECODED)[self.index]
+
+    @property
+    def renamed_so_far(self) -> int:
+        return self.table.so_far(RENAMED)[self.index]
+
+    @property
+    def dispatched_so_far(self) -> int:
+        return self.table.so_far(DISPATCHED)[self.index]
+
+    @property
+    def issued_so_far(self) -> int:
+        return self.table.so_far(ISSUED)[self.index]
+
+    @property
+    def completed_so_far(self) -> int:
+        return self.table.so_far(COMPLETED)[self.index]
+
+    @property
+    def retired_so_far(self) -> int:
+        return self.table.so_far(RETIRED)[self.index]
+
+    @property
+    def stored_so_far(self) -> int:
+        return self.table.so_far(STORED)[self.index]
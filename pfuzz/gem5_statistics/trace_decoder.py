@@ -0,0 +1,165 @@
+import gzip
+import io
+import mmap
+import os
+import re
+from collections import Counter
+from itertools import repeat
+from typing import IO, Iterator, List, Tuple, Union, cast
+
+from pfuzz.gem5_statistics.tick_table import (
+    COMPLETED,
+    DECODED,
+    DISPATCHED,
+    FETCHED,
+    ISSUED,
+    RENAMED,
+    RETIRED,
+    STAGES,
+    STORED,
+    Tick_table,
+)
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+Buffer = Union[bytes, mmap.mmap]
+
+# every match is one event: a stage line or the store part of a retire line
+EVENT_PATTERN = re.compile(
+    rb"(?:O3PipeView:|:(?=store:))(fet|dec|ren|dis|iss|com|ret|sto)[^:\n]*:(\d+)"
+)
+STAGE_COLUMNS = {
+    b"fet": FETCHED,
+    b"dec": DECODED,
+    b"ren": RENAMED,
+    b"dis": DISPATCHED,
+    b"iss": ISSUED,
+    b"com": COMPLETED,
+    b"ret": RETIRED,
+    b"sto": STORED,
+}
+
+# errors reading or decompressing a trace, zstd streams failing with
+# ImportError without the zstandard package
+DECODE_ERRORS: Tuple[type[Exception], ...] = (
+    OSError,
+    ValueError,
+    EOFError,
+    ImportError,
+) + (() if zstandard is None else (zstandard.ZstdError,))
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def open_binary_trace(path_to_trace: str) -> IO[bytes]:
+    """Open a plain, gzip or zstd compressed trace as a stream of bytes"""
+    with open(path_to_trace, "rb") as probe:
+        magic = probe.read(4)
+
+    if magic.startswith(_GZIP_MAGIC):
+        return cast(IO[bytes], gzip.open(path_to_trace, "rb"))
+    if magic.startswith(_ZSTD_MAGIC):
+        if zstandard is None:
+            raise ImportError(
+                "reading zstd traces requires the zstandard package, "
+                "installed with the pfuzz[zstd] extra"
+            )
+        stream: IO[bytes] = zstandard.ZstdDecompressor().stream_reader(
+            open(path_to_trace, "rb"), closefd=True
+        )
+        return stream
+    return open(path_to_trace, "rb")
+
+
+class Trace_decoder:
+    """
+    Bytes-level decoder of O3PipeView traces. One compiled pattern finds
+    the stage prefix and the integer ticks of every line, a table maps the
+    prefix to a counter column and the counts of each stage are gathered
+    per tick in a Counter. Plain traces are memory-mapped and scanned in
+    place, compressed ones are decompressed in chunks of whole lines
+    """
+
+    def __init__(self, chunk_size: int = 1 << 22) -> None:
+        self.chunk_size = chunk_size
+        self.current_tick = 0
+        self.counts: List[Counter[int]] = [Counter() for _ in STAGES]
+
+    def events(
+        self, data: Buffer, pos: int = 0, endpos: int = -1
+    ) -> Iterator[Tuple[int, int]]:
+        """
+        (stage, tick) events of the lines of data[pos:endpos] in trace order,
+        continuing from the tick of the last decoded event. A zero tick
+        means the stage happened at the same tick as the previous event
+        """
+        endpos = len(data) if endpos < 0 else endpos
+        for prefix, tick in EVENT_PATTERN.findall(data, pos, endpos):
+            self.current_tick = int(tick) or self.current_tick
+            yield STAGE_COLUMNS[prefix], self.current_tick
+
+    def decode(self, data: Buffer, pos: int = 0, endpos: int = -1) -> None:
+        """Count the events of data[pos:endpos], which must hold whole lines"""
+        endpos = len(data) if endpos < 0 else endpos
+        columns: List[List[int]] = [[] for _ in STAGES]
+        appenders = {
+            prefix: columns[stage].append for prefix, stage in STAGE_COLUMNS.items()
+        }
+        current_tick = self.current_tick
+        for prefix, tick in EVENT_PATTERN.findall(data, pos, endpos):
+            current_tick = int(tick) or current_tick
+            appenders[prefix](current_tick)
+        self.current_tick = current_tick
+        for counter, column in zip(self.counts, columns, strict=True):
+            counter.update(column)
+
+    def chunks(self, path_to_trace: str) -> Iterator[Tuple[Buffer, int, int]]:
+        """
+        Parts (data, pos, endpos) of a plain, gzip or zstd compressed trace,
+        each holding whole lines. A plain trace is memory-mapped and split
+        without copying
+        """
+        with open_binary_trace(path_to_trace) as trace:
+            if isinstance(trace, io.BufferedReader):
+                if os.fstat(trace.fileno()).st_size == 0:
+                    return
+                with mmap.mmap(trace.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    start = 0
+                    while start < len(mapped):
+                        end = min(start + self.chunk_size, len(mapped))
+                        if end < len(mapped):
+                            end = mapped.rfind(b"\n", start, end) + 1 or end
+                        yield mapped, start, end
+                        start = end
+                return
+
+            partial = b""
+            while chunk := trace.read(self.chunk_size):
+                data = partial + chunk
+                end = data.rfind(b"\n") + 1
+                yield data, 0, end
+                partial = data[end:]
+            yield partial, 0, len(partial)
+
+    def decode_file(self, path_to_trace: str) -> "Trace_decoder":
+        """Count the events of a trace"""
+        for data, pos, endpos in self.chunks(path_to_trace):
+            self.decode(data, pos, endpos)
+        return self
+
+    def file_events(self, path_to_trace: str) -> Iterator[Tuple[int, int]]:
+        """(stage, tick) events of a trace in trace order"""
+        for data, pos, endpos in self.chunks(path_to_trace):
+            yield from self.events(data, pos, endpos)
+
+    def table(self) -> Tick_table:
+        """Counted events as a table sorted by tick number"""
+        ticks = sorted(set().union(*self.counts))
+        return Tick_table.from_columns(
+            ticks,
+            [list(map(counter.get, ticks, repeat(0))) for counter in self.counts],
+        )
@@ -0,0 +1,155 @@
+import subprocess
+import time
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+from pfuzz.gem5_statistics.tick_table import (
+    DECODED,
+    FETCHED,
+    RETIRED,
+    Tick_table,
+    Tick_window,
+)
+from pfuzz.gem5_statistics.trace_decoder import Trace_decoder
+
+
+class Trace_follower:
+    """
+    Incremental analysis of a plain-text O3 pipeline trace that gem5 is
+    still writing. Every poll reads the bytes appended since the previous
+    one, so the trace is parsed once however often it is polled. Finished
+    ticks go to `table` and update the longest stall without retired
+    instructions and the worst fetched to decoded ratio over `cycle_number`
+    ticks, the same values Tick_statistics.get_pipeline_objectives gives
+    for the whole trace. Events for an already finished tick are counted
+    at the oldest pending tick, as in Tick_statistics.iter_ticks
+
+    :stall_target: stall length in ticks at which the target is reached
+    :ratio_target: fetched to decoded ratio at which the target is reached
+    """
+
+    def __init__(
+        self,
+        path_to_trace: str,
+        stall_target: Optional[int] = None,
+        ratio_target: Optional[float] = None,
+        cycle_number: int = 100,
+        chunk_size: int = 1 << 20,
+    ) -> None:
+        self.path_to_trace = path_to_trace
+        self.stall_target = stall_target
+        self.ratio_target = ratio_target
+        self.cycle_number = cycle_number
+        self.chunk_size = chunk_size
+        self.offset = 0
+        self.table = Tick_table()
+        self.longest_stall = 0
+        self.worst_ratio = 0.0
+        self._decoder = Trace_decoder()
+        self._window = Tick_window()
+        self._partial = b""
+        self._stall_start: Optional[int] = None
+        self._recent: Deque[Tuple[int, int]] = deque()
+        self._fetched = 0
+        self._decoded = 0
+
+    @property
+    def reached(self) -> bool:
+        """Whether any of the targets is reached"""
+        return (
+            self.stall_target is not None and self.longest_stall >= self.stall_target
+        ) or (self.ratio_target is not None and self.worst_ratio >= self.ratio_target)
+
+    def poll(self) -> bool:
+        """
+        Consume the lines appended to the trace since the last poll
+
+        :return: whether a target is reached
+        """
+        try:
+            trace = open(self.path_to_trace, "rb")
+        except FileNotFoundError:
+            return self.reached
+        with trace:
+            trace.seek(self.offset)
+            while True:
+                data = trace.read(self.chunk_size)
+                if not data:
+                    break
+                self.offset += len(data)
+                self._feed(data)
+        return self.reached
+
+    def _feed(self, data: bytes) -> None:
+        data = self._partial + data
+        end = data.rfind(b"\n") + 1
+        self._partial = data[end:]
+
+        for stage, tick_number in self._decoder.events(data, 0, end):
+            if not self._window.add(stage, tick_number):
+                self._window.add(stage, self._window.watermark)
+        for tick_number, counts in self._window.finished():
+            self._append(tick_number, counts)
+
+    def _append(self, tick_number: int, counts: List[int]) -> None:
+        self.table.append(tick_number, counts)
+
+        if counts[RETIRED]:
+            self._stall_start = None
+        else:
+            if self._stall_start is None:
+                self._stall_start = tick_number
+            self.longest_stall = max(
+                self.longest_stall, tick_number - self._stall_start
+            )
+
+        self._recent.append((counts[FETCHED], counts[DECODED]))
+        self._fetched += counts[FETCHED]
+        self._decoded += counts[DECODED]
+        if len(self._recent) > self.cycle_number:
+            fetched, decoded = self._recent.popleft()
+            self._fetched -= fetched
+            self._decoded -= decoded
+        if len(self._recent) == self.cycle_number:
+            self.worst_ratio = max(
+                self.worst_ratio, self._fetched / max(self._decoded, 1)
+            )
+
+    def finish(self) -> Tick_table:
+        """Consume the rest of the finished trace and close the pending ticks"""
+        self.poll()
+        if self._partial:
+            self._feed(b"\n")
+        for tick_number, counts in self._window.drain():
+            self._append(tick_number, counts)
+        if 0 < len(self._recent) < self.cycle_number:
+            self.worst_ratio = self._fetched / max(self._decoded, 1)
+        return self.table
+
+    def follow(
+        self,
+        process: Optional["subprocess.Popen[bytes]"] = None,
+        interval: float = 0.5,
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """
+        Poll the trace until a target is reached, the simulator `process`
+        exits or `timeout` seconds pass. A simulator still running when
+        the target is reached is terminated, saving the rest of the run
+
+        :return: whether a target is reached
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            running = process is None or process.poll() is None
+            if self.poll():
+                if process is not None and running:
+                    process.terminate()
+                    process.wait()
+                return True
+            if not running:
+                self.finish()
+                return self.reached
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(interval)
@@ -0,0 +1,101 @@
+from array import array
+from dataclasses import dataclass
+from itertools import accumulate, compress, islice
+from operator import not_, or_, sub, truediv
+from typing import Iterator, List, Optional
+
+from pfuzz.gem5_statistics.tick_table import Tick_table
+
+
+@dataclass
+class Window:
+    """
+    Range of table rows [start, end) found by a window analysis,
+    its first and last tick numbers, the value it was selected by
+    and the number of events of every stage inside it
+    """
+
+    start: int
+    end: int
+    start_tick: int
+    end_tick: int
+    value: float
+    totals: List[int]
+
+
+class Window_analysis:
+    """
+    Sliding-window and run-length analyses over a Tick_table, computed in
+    linear time by itertools/operator kernels that run without a Python-level
+    call per tick
+    """
+
+    def window(self, table: Tick_table, start: int, end: int, value: float) -> Window:
+        return Window(
+            start,
+            end,
+            table.tick_numbers[start],
+            table.tick_numbers[end - 1],
+            value,
+            [sum(column[start:end]) for column in table.during],
+        )
+
+    def _rolling_sums(
+        self, table: Tick_table, stage: int, length: int
+    ) -> Iterator[int]:
+        during = table.during[stage]
+        return accumulate(
+            map(sub, islice(during, length, None), during),
+            initial=sum(during[:length]),
+        )
+
+    def rolling_sums(self, table: Tick_table, stage: int, length: int) -> "array[int]":
+        """
+        Number of events of a stage in every window of `length` consecutive
+        rows, the i-th item covering rows [i, i + length)
+        """
+        return array("q", self._rolling_sums(table, stage, length))
+
+    def rolling_ratios(
+        self, table: Tick_table, numerator: int, denominator: int, length: int
+    ) -> "array[float]":
+        """
+        Ratio of events of two stages in every window of `length` rows.
+        Windows without denominator events get the numerator count itself
+        """
+        numerators = self._rolling_sums(table, numerator, length)
+        denominators = self.rolling_sums(table, denominator, length)
+        # max(denominator, 1) without a Python-level call per window
+        denominators = array("q", map(or_, denominators, map(not_, denominators)))
+        return array("d", map(truediv, numerators, denominators))
+
+    def worst_ratio_window(
+        self, table: Tick_table, numerator: int, denominator: int, length: int
+    ) -> Optional[Window]:
+        """
+        Window of `length` rows with the highest numerator/denominator ratio,
+        e.g. FETCHED/DECODED or ISSUED/RETIRED, the earliest one on ties
+        """
+        if length <= 0 or length > len(table):
+            return None
+        ratios = self.rolling_ratios(table, numerator, denominator, length)
+        worst = max(ratios)
+        start = ratios.index(worst)
+        return self.window(table, start, start + length, worst)
+
+    def longest_run_without(self, table: Tick_table, stage: int) -> Optional[Window]:
+        """
+        Longest run of consecutive rows without events of a stage,
+        e.g. the longest stall without RETIRED instructions
+        """
+        active = [-1]
+        active.extend(compress(range(len(table)), table.during[stage]))
+        active.append(len(table))
+        gaps = array("q", map(sub, islice(active, 1, None), active))
+
+        widest = gaps.index(max(gaps))
+        if gaps[widest] <= 1:
+            return None
+        start = active[widest] + 1
+        end = active[widest + 1]
+        return self.window(table, start, end, end - start)
@@ -0,0 +1,186 @@
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+
+class Artifact_cache:
+    """
+    Content-addressed store of generated C programs and their binaries.
+    Files are stored once per content hash, an index maps build keys
+    to the stored source and binary, and the least recently used builds
+    are evicted once the store grows beyond `max_bytes`. The index also
+    keeps the size of every object and their running total, so the store
+    is never scanned
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = 1 << 30) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_db"] = None
+        state["_lock"] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            (self.directory / "objects").mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(
+                self.directory / "index.sqlite", timeout=60, check_same_thread=False
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS builds ("
+                "key TEXT PRIMARY KEY, source TEXT, binary TEXT, used REAL)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS objects ("
+                "name TEXT PRIMARY KEY, size INTEGER)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS totals ("
+                "name TEXT PRIMARY KEY, bytes INTEGER)"
+            )
+            if self._total(self._db) is None:
+                self._index_objects(self._db)
+        return self._db
+
+    def _total(self, db: sqlite3.Connection) -> Optional[int]:
+        row: Optional[Tuple[int]] = db.execute(
+            "SELECT bytes FROM totals WHERE name = 'objects'"
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def _index_objects(self, db: sqlite3.Connection) -> None:
+        """Record the sizes of the objects of a store created without them"""
+        for path in (self.directory / "objects").glob("*/*"):
+            if path.is_file() and not path.name.startswith("tmp"):
+                db.execute(
+                    "INSERT OR IGNORE INTO objects (name, size) VALUES (?, ?)",
+                    (path.name, path.stat().st_size),
+                )
+        db.execute(
+            "INSERT OR IGNORE INTO totals (name, bytes) "
+            "SELECT 'objects', COALESCE(SUM(size), 0) FROM objects"
+        )
+        db.commit()
+
+    def _object_path(self, digest: str) -> Path:
+        return self.directory / "objects" / digest[:2] / digest
+
+    def _store_object(self, db: sqlite3.Connection, path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        name = digest.hexdigest()
+
+        stored = self._object_path(name)
+        if not stored.exists():
+            stored.parent.mkdir(parents=True, exist_ok=True)
+            fd, temporary = tempfile.mkstemp(dir=stored.parent)
+            os.close(fd)
+            # copy the mode as well, so restored binaries stay executable
+            shutil.copy(path, temporary)
+            os.replace(temporary, stored)
+        size = stored.stat().st_size
+        inserted = db.execute(
+            "INSERT OR IGNORE INTO objects (name, size) VALUES (?, ?)", (name, size)
+        )
+        if inserted.rowcount == 1:
+            db.execute(
+                "UPDATE totals SET bytes = bytes + ? WHERE name = 'objects'", (size,)
+            )
+        return name
+
+    def get(self, key: str, c_path: Path, binary_path: Path) -> bool:
+        """Copy the artifacts of a cached build to the given paths if present"""
+        with self._lock:
+            db = self._connect()
+            row: Optional[Tuple[str, str]] = db.execute(
+                "SELECT source, binary FROM builds WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return False
+            try:
+                shutil.copyfile(self._object_path(row[0]), c_path)
+                shutil.copy(self._object_path(row[1]), binary_path)
+            except FileNotFoundError:
+                db.execute("DELETE FROM builds WHERE key = ?", (key,))
+                db.commit()
+                self.misses += 1
+                return False
+            db.execute("UPDATE builds SET used = ? WHERE key = ?", (time.time(), key))
+            db.commit()
+            self.hits += 1
+            return True
+
+    def put(self, key: str, c_path: Path, binary_path: Path) -> None:
+        """Store the artifacts of a successful build"""
+        with self._lock:
+            db = self._connect()
+            source = self._store_object(db, c_path)
+            binary = self._store_object(db, binary_path)
+            db.execute(
+                "INSERT OR REPLACE INTO builds (key, source, binary, used) "
+                "VALUES (?, ?, ?, ?)",
+                (key, source, binary, time.time()),
+            )
+            db.commit()
+            self._evict(db)
+
+    def size(self) -> int:
+        """Total size of the stored objects"""
+        with self._lock:
+            return self._total(self._connect()) or 0
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        total = self._total(db) or 0
+        if total <= self.max_bytes:
+            return
+        for key, source, binary in db.execute(
+            "SELECT key, source, binary FROM builds ORDER BY used"
+        ).fetchall():
+            db.execute("DELETE FROM builds WHERE key = ?", (key,))
+            for name in (source, binary):
+                referenced = db.execute(
+                    "SELECT 1 FROM builds WHERE source = ? OR binary = ?",
+                    (name, name),
+                ).fetchone()
+                if referenced is not None:
+                    continue
+                row = db.execute(
+                    "SELECT size FROM objects WHERE name = ?", (name,)
+                ).fetchone()
+                if row is None:
+                    continue
+                db.execute("DELETE FROM objects WHERE name = ?", (name,))
+                db.execute(
+                    "UPDATE totals SET bytes = bytes - ? WHERE name = 'objects'",
+                    row,
+                )
+                total -= row[0]
+                self._object_path(name).unlink(missing_ok=True)
+            if total <= self.max_bytes:
+                break
+        db.commit()
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
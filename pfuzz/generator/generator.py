@@ -1,48 +1,262 @@
-import os
+import asyncio
+import hashlib
+import json
 import random
 import subprocess
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict
+from typing import IO, Any, Dict, List, Optional, Tuple, Union
 
 import pfuzz.constants
+from pfuzz.generator.artifact_cache import Artifact_cache
+from pfuzz.metrics import COMPILE, GENERATE, metrics
+from pfuzz.worker import worker_dir, worker_name
+
+COMPILE_FLAGS = ["--static", "-O0", "-I/usr/local/include"]
+SEED_FLAGS = ("--seed", "-s")
+
+
+@dataclass
+class Build_result:
+    """
+    Artifacts of generating and compiling a single Csmith configuration
+    together with exit codes and timings of both steps
+    """
+
+    config: Dict[str, str]
+    c_path: Path
+    binary_path: Path
+    generate_returncode: Optional[int] = None
+    compile_returncode: Optional[int] = None
+    generate_seconds: float = 0.0
+    compile_seconds: float = 0.0
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.generate_returncode == 0 and self.compile_returncode == 0
 
 
 class Generator:
-    def __init__(self, template_config: Dict[str, range]) -> None:
+    def __init__(
+        self,
+        template_config: Dict[str, range],
+        csmith: str = "csmith",
+        compiler: str = "riscv64-linux-gnu-gcc",
+        compile_flags: Optional[List[str]] = None,
+        artifact_cache: Optional[Artifact_cache] = None,
+    ) -> None:
         self.template_config = template_config
+        self.csmith = csmith
+        self.compiler = compiler
+        self.compile_flags = list(
+            COMPILE_FLAGS if compile_flags is None else compile_flags
+        )
+        self.artifact_cache = artifact_cache
+        self._versions: Dict[str, str] = {}
 
     def generate_config(self, config: Dict[str, str]) -> None:
         for flag in self.template_config.keys():
             if random.randint(0, 1):
                 config[flag] = str(random.choice(self.template_config[flag]))
 
-    def generate(self, config: Dict[str, str], c_name: str, out_name: str) -> None:
-        if not config:
-            self.generate_config(config)
-
-        out_dir = Path(__file__).resolve().parent / pfuzz.constants.OUT_DIR
+    def output_dir(self, out_dir: Optional[Path] = None) -> Path:
+        """
+        Directory generated files are written to: the explicitly given one,
+        then the one of the current evaluation worker, then the default one,
+        in a subdirectory per evaluation pool worker
+        """
+        if out_dir is None:
+            out_dir = worker_dir()
+        if out_dir is None:
+            out_dir = Path(__file__).resolve().parent / pfuzz.constants.OUT_DIR
+            name = worker_name()
+            if name is not None:
+                out_dir = out_dir / name
         if not out_dir.is_dir():
             out_dir.mkdir(parents=True)
-        os.chdir(out_dir)
+        return out_dir
 
-        run_process = ["csmith"]
+    def csmith_command(self, config: Dict[str, str]) -> List[str]:
+        run_process = [self.csmith]
         for flag in config.keys():
             run_process.append(flag)
             run_process.append(config[flag])
+        return run_process
+
+    def compile_command(self, c_name: str, out_name: str) -> List[str]:
+        return [self.compiler, *self.compile_flags, c_name, "-o", out_name]
+
+    def tool_version(self, tool: str) -> str:
+        if tool not in self._versions:
+            try:
+                process = subprocess.run(
+                    [tool, "--version"], capture_output=True, text=True
+                )
+                self._versions[tool] = process.stdout.strip()
+            except OSError:
+                self._versions[tool] = ""
+        return self._versions[tool]
+
+    def build_key(self, config: Dict[str, str]) -> Optional[str]:
+        """
+        Key identifying the artifacts of a configuration, or None when
+        the configuration has no fixed seed and Csmith output is random
+        """
+        if not any(flag in config for flag in SEED_FLAGS):
+            return None
+        description = [
+            self.tool_version(self.csmith),
+            sorted(config.items()),
+            self.tool_version(self.compiler),
+            self.compile_flags,
+        ]
+        return hashlib.sha256(json.dumps(description).encode()).hexdigest()
+
+    def _cached(self, config: Dict[str, str], c_path: Path, out_path: Path) -> bool:
+        if self.artifact_cache is None:
+            return False
+        key = self.build_key(config)
+        return key is not None and self.artifact_cache.get(key, c_path, out_path)
+
+    def _store(self, config: Dict[str, str], c_path: Path, out_path: Path) -> None:
+        if self.artifact_cache is None:
+            return
+        key = self.build_key(config)
+        if key is not None:
+            self.artifact_cache.put(key, c_path, out_path)
+
+    def generate(
+        self,
+        config: Dict[str, str],
+        c_name: str,
+        out_name: str,
+        out_dir: Optional[Path] = None,
+    ) -> None:
+        if not config:
+            self.generate_config(config)
+
+        out_dir = self.output_dir(out_dir)
+        if self._cached(config, out_dir / c_name, out_dir / out_name):
+            metrics.count("build_cached")
+            return
+
+        with open(out_dir / c_name, "w") as f, metrics.stage(GENERATE):
+            gen_proc = subprocess.run(
+                self.csmith_command(config), stdout=f, stderr=subprocess.DEVNULL
+            )
+
+        with metrics.stage(COMPILE):
+            compile_proc = subprocess.run(
+                self.compile_command(c_name, out_name),
+                capture_output=True,
+                cwd=out_dir,
+            )
+        if gen_proc.returncode == 0 and compile_proc.returncode == 0:
+            self._store(config, out_dir / c_name, out_dir / out_name)
+
+    async def _run(
+        self,
+        command: List[str],
+        cwd: Path,
+        stdout: Union[IO[Any], int],
+        timeout: Optional[float],
+    ) -> Tuple[int, float]:
+        start = time.monotonic()
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            cwd=cwd,
+            stdout=stdout,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        try:
+            returncode = await asyncio.wait_for(process.wait(), timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            returncode = await process.wait()
+        return returncode, time.monotonic() - start
+
+    async def generate_batch_async(
+        self,
+        configs: List[Dict[str, str]],
+        out_dir: Optional[Path] = None,
+        max_jobs: int = 8,
+        timeout: Optional[float] = None,
+        prefix: str = "program",
+    ) -> List[Build_result]:
+        """
+        Generate and cross-compile a batch of configurations as a pipeline:
+        up to `max_jobs` Csmith processes and `max_jobs` compilers run at once,
+        so compilation of one program overlaps generation of the next ones
+
+        :configs: Csmith configurations, empty ones are filled randomly
+        :out_dir: directory for the artifacts, see output_dir
+        :timeout: seconds after which a Csmith or compiler process is killed
+        :prefix: artifacts are named `<prefix>-<index>.c` and `<prefix>-<index>.out`
+        :return: build results in the order of configs
+        """
+        out_dir = self.output_dir(out_dir)
+        if self.artifact_cache is not None:
+            for tool in (self.csmith, self.compiler):
+                await asyncio.to_thread(self.tool_version, tool)
+        generating = asyncio.Semaphore(max_jobs)
+        compiling = asyncio.Semaphore(max_jobs)
+
+        async def build(index: int, config: Dict[str, str]) -> Build_result:
+            if not config:
+                self.generate_config(config)
+            c_name = "{}-{}.c".format(prefix, index)
+            out_name = "{}-{}.out".format(prefix, index)
+            result = Build_result(config, out_dir / c_name, out_dir / out_name)
+            if await asyncio.to_thread(
+                self._cached, config, result.c_path, result.binary_path
+            ):
+                result.generate_returncode = result.compile_returncode = 0
+                result.cached = True
+                metrics.count("build_cached")
+                return result
+
+            async with generating:
+                with open(result.c_path, "w") as source:
+                    result.generate_returncode, result.generate_seconds = (
+                        await self._run(
+                            self.csmith_command(config), out_dir, source, timeout
+                        )
+                    )
+            metrics.record(GENERATE, result.generate_seconds)
+            if result.generate_returncode != 0:
+                return result
+
+            async with compiling:
+                result.compile_returncode, result.compile_seconds = await self._run(
+                    self.compile_command(c_name, out_name),
+                    out_dir,
+                    asyncio.subprocess.DEVNULL,
+                    timeout,
+                )
+            metrics.record(COMPILE, result.compile_seconds)
+            if result.ok:
+                await asyncio.to_thread(
+                    self._store, config, result.c_path, result.binary_path
+                )
+            return result
+
+        return list(
+            await asyncio.gather(
+                *(build(index, config) for index, config in enumerate(configs))
+            )
+        )
 
-        gen_proc = subprocess.run(run_process, capture_output=True, text=True)
-        with open(c_name, "w") as f:
-            f.write(gen_proc.stdout)
-
-        subprocess.run(
-            [
-                "riscv64-linux-gnu-gcc",
-                "--static",
-                "-O0",
-                "-I/usr/local/include",
-                c_name,
-                "-o",
-                out_name,
-            ],
-            capture_output=True,
+    def generate_batch(
+        self,
+        configs: List[Dict[str, str]],
+        out_dir: Optional[Path] = None,
+        max_jobs: int = 8,
+        timeout: Optional[float] = None,
+        prefix: str = "program",
+    ) -> List[Build_result]:
+        """Blocking version of generate_batch_async"""
+        return asyncio.run(
+            self.generate_batch_async(configs, out_dir, max_jobs, timeout, prefix)
         )
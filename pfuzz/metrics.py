@@ -0,0 +1,199 @@
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator, List, Optional
+
+GENERATE = "generate"
+COMPILE = "compile"
+SIMULATE = "simulate"
+PARSE = "parse"
+SCORE = "score"
+
+_DISABLED: ContextManager[None] = nullcontext()
+
+
+class Stage_timer:
+    __slots__ = ("calls", "seconds", "max_seconds")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.calls += 1
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def merge(self, calls: int, seconds: float, max_seconds: float) -> None:
+        self.calls += calls
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, max_seconds)
+
+
+class Metrics:
+    """
+    Per-stage timers, counters and per-generation throughput of a campaign.
+    While disabled nothing is recorded and stage() returns a shared no-op
+    context manager. Stages timed inside worker processes are captured
+    per candidate, sent back with its result and merged by the evaluation
+    engine of the main process, which also records the score stage and
+    candidate statuses
+
+    :path: JSON-lines file to which every generation record is appended
+    """
+
+    def __init__(self, enabled: bool = False, path: Optional[Path] = None) -> None:
+        self.enabled = enabled
+        self.path = path
+        self.stages: Dict[str, Stage_timer] = {}
+        self.counters: Dict[str, int] = {}
+        self.generations: List[Dict[str, float]] = []
+        self._lock = threading.Lock()
+        self._generation_start = time.perf_counter()
+
+    def record(self, stage: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            timer = self.stages.get(stage)
+            if timer is None:
+                timer = self.stages[stage] = Stage_timer()
+            timer.add(seconds)
+
+    def stage(self, name: str) -> ContextManager[None]:
+        """Context manager timing one call of a stage"""
+        if not self.enabled:
+            return _DISABLED
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    @contextmanager
+    def capture(self) -> Iterator["Metrics"]:
+        """
+        Record the stages and counters of the block into a separate enabled
+        Metrics, whose snapshot can be merged into the metrics of another
+        process
+        """
+        captured = Metrics(enabled=True)
+        saved = self.enabled, self.stages, self.counters
+        self.enabled, self.stages, self.counters = (
+            True,
+            captured.stages,
+            captured.counters,
+        )
+        try:
+            yield captured
+        finally:
+            self.enabled, self.stages, self.counters = saved
+
+    def merge(self, snapshot: Dict[str, Any]) -> None:
+        """Add the stages and counters of a snapshot of another Metrics"""
+        if not self.enabled:
+            return
+        with self._lock:
+            for name, stage in snapshot["stages"].items():
+                timer = self.stages.get(name)
+                if timer is None:
+                    timer = self.stages[name] = Stage_timer()
+                timer.merge(stage["calls"], stage["seconds"], stage["max_seconds"])
+            for name, amount in snapshot["counters"].items():
+                self.counters[name] = self.counters.get(name, 0) + amount
+
+    def count(self, name: str, amount: int = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def generation(self, number: int, evaluated: int) -> None:
+        """Close a generation in which `evaluated` chromosomes were scored"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        seconds = now - self._generation_start
+        self._generation_start = now
+        record = {
+            "generation": number,
+            "evaluated": evaluated,
+            "seconds": seconds,
+            "per_second": evaluated / seconds if seconds > 0 else 0.0,
+        }
+        self.generations.append(record)
+        if self.path is not None:
+            self.write_jsonl(self.path, record)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "time": time.time(),
+                "stages": {
+                    name: {
+                        "calls": timer.calls,
+                        "seconds": timer.seconds,
+                        "max_seconds": timer.max_seconds,
+                    }
+                    for name, timer in self.stages.items()
+                },
+                "counters": dict(self.counters),
+                "generations": len(self.generations),
+            }
+
+    def write_jsonl(self, path: Path, record: Optional[Dict[str, Any]] = None) -> None:
+        """Append a record, by default a snapshot, to a JSON-lines file"""
+        with open(path, "a") as metrics_file:
+            metrics_file.write(json.dumps(record or self.snapshot()) + "\n")
+
+    def prometheus(self) -> str:
+        """Snapshot in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = [
+            "# TYPE pfuzz_stage_calls_total counter",
+            "# TYPE pfuzz_stage_seconds_total counter",
+            "# TYPE pfuzz_stage_max_seconds gauge",
+        ]
+        for name, stage in sorted(snapshot["stages"].items()):
+            for metric, key in (
+                ("pfuzz_stage_calls_total", "calls"),
+                ("pfuzz_stage_seconds_total", "seconds"),
+                ("pfuzz_stage_max_seconds", "max_seconds"),
+            ):
+                lines.append('{}{{stage="{}"}} {}'.format(metric, name, stage[key]))
+        lines.append("# TYPE pfuzz_events_total counter")
+        for name, value in sorted(snapshot["counters"].items()):
+            lines.append('pfuzz_events_total{{event="{}"}} {}'.format(name, value))
+        if self.generations:
+            lines.append("# TYPE pfuzz_generation_per_second gauge")
+            lines.append(
+                "pfuzz_generation_per_second {}".format(
+                    self.generations[-1]["per_second"]
+                )
+            )
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stages.clear()
+            self.counters.clear()
+            self.generations.clear()
+            self._generation_start = time.perf_counter()
+
+
+metrics = Metrics()
+
+
+def enable_metrics(path: Optional[Path] = None) -> Metrics:
+    """Start recording into the process-wide metrics"""
+    metrics.enabled = True
+    metrics.path = path
+    metrics.reset()
+    return metrics
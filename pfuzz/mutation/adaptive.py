@@ -0,0 +1,71 @@
+from typing import Any, Dict, Optional
+
+
+class Adaptive_rates:
+    """
+    Control of the number of crossovers and mutations per generation of
+    Mutation.genetic_func. While the best fitness improves, crossovers
+    exploit the survivors; after `patience` generations without improvement
+    or when the diversity of the survivors falls below `min_diversity`,
+    mutations are raised to explore and crossovers are lowered
+
+    :reproduce: starting number of crossovers and of mutations
+    :max_amount: upper bound of both numbers, at most the number of survivors
+    """
+
+    def __init__(
+        self,
+        reproduce: int,
+        max_amount: int,
+        min_amount: int = 1,
+        patience: int = 2,
+        min_diversity: float = 0.3,
+        step: float = 1.5,
+    ) -> None:
+        self.crossover = reproduce
+        self.mutation = reproduce
+        self.max_amount = max_amount
+        self.min_amount = min_amount
+        self.patience = patience
+        self.min_diversity = min_diversity
+        self.step = step
+        self.best: Optional[float] = None
+        self.stagnant = 0
+
+    def _clamp(self, amount: float) -> int:
+        return max(self.min_amount, min(self.max_amount, round(amount)))
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "crossover": self.crossover,
+            "mutation": self.mutation,
+            "best": self.best,
+            "stagnant": self.stagnant,
+        }
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        """Continue from a state returned by `state`"""
+        self.crossover = state["crossover"]
+        self.mutation = state["mutation"]
+        self.best = state["best"]
+        self.stagnant = state["stagnant"]
+
+    def update(self, best: float, diversity: float) -> None:
+        """Adjust the numbers to the fitness and diversity of the survivors"""
+        improved = self.best is None or best > self.best
+        if improved:
+            self.best = best
+            self.stagnant = 0
+        else:
+            self.stagnant += 1
+
+        if self.stagnant >= self.patience or diversity < self.min_diversity:
+            self.mutation = self._clamp(
+                max(self.mutation + 1, self.mutation * self.step)
+            )
+            self.crossover = self._clamp(self.crossover / self.step)
+        elif improved:
+            self.crossover = self._clamp(
+                max(self.crossover + 1, self.crossover * self.step)
+            )
+            self.mutation = self._clamp(self.mutation / self.step)
@@ -0,0 +1,100 @@
+import os
+import re
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+LABEL_PATTERN = re.compile(r"^\s*\w+:\s*")
+JUMP_PATTERN = re.compile(r"^\s*(j|jal|beq|bne|blt|bge|bltu|bgeu)")
+
+
+class Assembly_program:
+    """
+    RISC-V assembly program held in memory. Lines are interned and shared
+    between a parent and its offspring. Label and jump lines (basic block
+    boundaries) and mutable instruction lines are found on first use,
+    so offspring that are only written out are never parsed
+    """
+
+    __slots__ = ("lines", "_boundaries", "_instructions", "_operands")
+
+    def __init__(self, lines: Iterable[str]) -> None:
+        self.lines: List[str] = [sys.intern(line) for line in lines]
+        self._boundaries: Optional[List[int]] = None
+        self._instructions: List[int] = []
+        self._operands: List[str] = []
+
+    @classmethod
+    def from_file(cls, path: str) -> "Assembly_program":
+        with open(path, "r") as file:
+            return cls(file)
+
+    def _parse(self) -> List[int]:
+        if self._boundaries is not None:
+            return self._boundaries
+
+        self._boundaries = []
+        for line_number, line in enumerate(self.lines):
+            is_label = LABEL_PATTERN.match(line) is not None
+            if is_label or JUMP_PATTERN.match(line):
+                self._boundaries.append(line_number)
+
+            split_line = line.split()
+            if (
+                not split_line
+                or split_line[0].startswith("#")
+                or split_line[0].startswith(".")
+                or is_label
+            ):
+                continue
+            self._instructions.append(line_number)
+            self._operands.append(" ".join(split_line[1:]))
+        return self._boundaries
+
+    @property
+    def boundaries(self) -> List[int]:
+        """Numbers of label and jump lines"""
+        return self._parse()
+
+    @property
+    def instructions(self) -> List[int]:
+        """Numbers of lines holding an instruction"""
+        self._parse()
+        return self._instructions
+
+    @property
+    def operands(self) -> List[str]:
+        """Operands of every instruction in `instructions`"""
+        self._parse()
+        return self._operands
+
+    def replace_opcode(self, lines: List[str], instruction: int, opcode: str) -> None:
+        """Put `opcode` into the instruction with the given index in `lines`"""
+        operands = self.operands[instruction]
+        lines[self.instructions[instruction]] = (
+            "\t" + opcode + (" " + operands if operands else "") + "\n"
+        )
+
+    def write(self, path: str) -> None:
+        with open(path, "w") as file:
+            file.writelines(self.lines)
+
+
+class Program_store:
+    """
+    Parsed programs by path, reparsed only when the file changes
+    """
+
+    def __init__(self) -> None:
+        self._programs: Dict[str, Tuple[Tuple[int, int], Assembly_program]] = {}
+
+    def get(self, path: str) -> Assembly_program:
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        cached: Optional[Tuple[Tuple[int, int], Assembly_program]] = self._programs.get(
+            path
+        )
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        program = Assembly_program.from_file(path)
+        self._programs[path] = (version, program)
+        return program
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import sqlite3
+from collections import OrderedDict
+from pathlib import Path
+from types import TracebackType
+from typing import Optional
+
+from pfuzz.mutation.evaluation import OK, Evaluation_engine, Score
+
+
+class Fitness_cache:
+    """
+    Memoization of fitness values keyed by a canonical hash of the chromosome
+    and the generator/simulator version, with an in-memory LRU tier
+    and an optional SQLite tier that survives restarts. Fitness depending
+    on more than the chromosome, like the distance to a desired output,
+    is cached per `target` of the score
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 65536,
+        path: Optional[Path] = None,
+        version: str = "",
+    ) -> None:
+        self.max_entries = max_entries
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[str, float] = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        if path is not None:
+            self._db = sqlite3.connect(path)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS fitness (key TEXT PRIMARY KEY, value REAL)"
+            )
+
+    def key(self, chromosome: dict[str, str], target: Optional[float] = None) -> str:
+        fields: list[object] = [self.version, chromosome]
+        if target is not None:
+            fields.insert(1, target)
+        canonical = json.dumps(fields, sort_keys=True)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def _remember(self, key: str, fitness: float) -> None:
+        self._memory[key] = fitness
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(
+        self, chromosome: dict[str, str], target: Optional[float] = None
+    ) -> Optional[float]:
+        key = self.key(chromosome, target)
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return self._memory[key]
+        if self._db is not None:
+            row = self._db.execute(
+                "SELECT value FROM fitness WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                self._remember(key, row[0])
+                self.hits += 1
+                return float(row[0])
+        self.misses += 1
+        return None
+
+    def put(
+        self,
+        chromosome: dict[str, str],
+        fitness: float,
+        target: Optional[float] = None,
+    ) -> None:
+        key = self.key(chromosome, target)
+        self._remember(key, fitness)
+        if self._db is not None:
+            self._db.execute(
+                "INSERT OR REPLACE INTO fitness (key, value) VALUES (?, ?)",
+                (key, fitness),
+            )
+            self._db.commit()
+
+    def evaluate(
+        self,
+        engine: Evaluation_engine,
+        score: Score,
+        chromosomes: list[dict[str, str]],
+        target: Optional[float] = None,
+    ) -> list[float]:
+        """
+        Score the chromosomes with the engine, running only those that are
+        neither cached nor duplicated within the batch, the duplicates
+        counting as hits. Failed or timed out candidates are not cached
+        so they get another chance later
+        """
+        results: list[Optional[float]] = []
+        pending: dict[str, list[int]] = {}
+        for index, chromosome in enumerate(chromosomes):
+            key = self.key(chromosome, target)
+            if key in pending:
+                self.hits += 1
+                pending[key].append(index)
+                results.append(None)
+                continue
+            fitness = self.get(chromosome, target)
+            if fitness is None:
+                pending[key] = [index]
+            results.append(fitness)
+
+        batch = [chromosomes[indices[0]] for indices in pending.values()]
+        evaluated = engine.evaluate_results(score, batch)
+        for chromosome, indices, result in zip(
+            batch, pending.values(), evaluated, strict=True
+        ):
+            if result.status == OK:
+                self.put(chromosome, result.fitness, target)
+            for index in indices:
+                results[index] = result.fitness
+
+        return [0.0 if fitness is None else fitness for fitness in results]
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._memory)}
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __enter__(self) -> "Fitness_cache":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
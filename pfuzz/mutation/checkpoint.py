@@ -0,0 +1,130 @@
+import json
+import os
+import random
+from pathlib import Path
+from types import TracebackType
+from typing import IO, Any, Callable, Dict, List, Optional, Tuple
+
+Population = List[Tuple[Dict[str, str], float]]
+
+
+class Checkpoint:
+    """
+    Persistent state of a genetic campaign in `directory`: an append-only
+    log of every scored chromosome and a compact snapshot of the population,
+    the iteration counter, the random state and the state of adaptive
+    components of the search written every `snapshot_every` iterations.
+    On resume the snapshot is restored and the log serves fitness
+    values of chromosomes already simulated after it was taken, so the
+    campaign replays the same offspring without paying for them again.
+    Fitness values are logged per evaluated batch, so only the batch
+    interrupted by a crash is simulated once more
+    """
+
+    def __init__(self, directory: Path, snapshot_every: int = 1) -> None:
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.log_path = directory / "log.jsonl"
+        self.snapshot_path = directory / "snapshot.json"
+        self._scored: Dict[str, float] = {}
+        self._log: Optional[IO[str]] = None
+        self._read_log()
+
+    def _key(self, chromosome: Dict[str, str]) -> str:
+        return json.dumps(chromosome, sort_keys=True)
+
+    def _read_log(self) -> None:
+        if not self.log_path.exists():
+            return
+        with open(self.log_path, "r") as log:
+            for line in log:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn by an interrupted write
+                self._scored[self._key(entry["chromosome"])] = entry["fitness"]
+
+    def record(self, chromosome: Dict[str, str], fitness: float) -> None:
+        if self._log is None:
+            self._log = open(self.log_path, "a")
+        self._log.write(
+            json.dumps({"chromosome": chromosome, "fitness": fitness}) + "\n"
+        )
+        self._log.flush()
+        self._scored[self._key(chromosome)] = fitness
+
+    def wrap(
+        self, evaluate: Callable[[List[Dict[str, str]]], List[float]]
+    ) -> Callable[[List[Dict[str, str]]], List[float]]:
+        """
+        Evaluation function that takes fitness values from the log
+        and records the newly scored chromosomes
+        """
+
+        def evaluate_logged(chromosomes: List[Dict[str, str]]) -> List[float]:
+            missing = [c for c in chromosomes if self._key(c) not in self._scored]
+            for chromosome, fitness in zip(
+                missing, evaluate(missing) if missing else [], strict=True
+            ):
+                self.record(chromosome, fitness)
+            return [self._scored[self._key(c)] for c in chromosomes]
+
+        return evaluate_logged
+
+    def save(
+        self,
+        iteration: int,
+        population: Population,
+        components: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Snapshot the state at the start of every `snapshot_every` iteration
+
+        :components: JSON-serializable state of components of the search,
+            such as adaptive operator rates, by component name
+        """
+        if iteration % self.snapshot_every:
+            return
+        state = {
+            "iteration": iteration,
+            "population": population,
+            "random_state": random.getstate(),
+            "components": {} if components is None else components,
+        }
+        temporary = self.snapshot_path.with_suffix(".tmp")
+        with open(temporary, "w") as snapshot:
+            json.dump(state, snapshot)
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(temporary, self.snapshot_path)
+
+    def load(self) -> Optional[Tuple[int, Population, Dict[str, Any]]]:
+        """
+        Restore the random state of the last snapshot
+        and return its iteration, population and component states
+        """
+        if not self.snapshot_path.exists():
+            return None
+        with open(self.snapshot_path, "r") as snapshot:
+            state: Dict[str, Any] = json.load(snapshot)
+        version, internal, gauss_next = state["random_state"]
+        random.setstate((version, tuple(internal), gauss_next))
+        population = [(item[0], item[1]) for item in state["population"]]
+        return state["iteration"], population, state.get("components", {})
+
+    def close(self) -> None:
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def __enter__(self) -> "Checkpoint":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
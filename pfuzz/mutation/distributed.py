@@ -0,0 +1,293 @@
+import hashlib
+import importlib
+import ipaddress
+import itertools
+import json
+import queue
+import secrets
+import threading
+from concurrent.futures import Executor, Future
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import click
+
+from pfuzz.mutation.evaluation import (
+    FAILED,
+    Candidate_result,
+    Evaluation_engine,
+    Score,
+    run_candidate,
+)
+from pfuzz.worker import set_worker_dir
+
+Address = Tuple[str, int]
+_Job = Tuple[int, Dict[str, str], "Future[Candidate_result]", int]
+
+
+def chromosome_key(chromosome: Dict[str, str]) -> str:
+    return hashlib.sha256(json.dumps(chromosome, sort_keys=True).encode()).hexdigest()
+
+
+def is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class Coordinator_engine(Evaluation_engine):
+    """
+    Evaluation engine handing chromosomes out to worker processes, possibly
+    on other machines, that connect to `address` with run_worker. Workers
+    score chromosomes with their own score function, so the one passed
+    to submit/evaluate is not used. A worker that disconnects or misses
+    heartbeats for `heartbeat_timeout` seconds has its job re-queued,
+    up to `max_attempts` times per chromosome. Artifacts sent back by
+    workers are stored in `artifact_dir/<chromosome_key>/`
+
+    :authkey: shared secret workers authenticate with; messages are pickled,
+        so it has to be kept secret. If None a random one is generated,
+        available as `authkey`, which is only allowed when the coordinator
+        listens on a loopback address
+    """
+
+    def __init__(
+        self,
+        address: Address = ("localhost", 0),
+        authkey: Optional[bytes] = None,
+        heartbeat_timeout: float = 30.0,
+        max_attempts: int = 3,
+        failure_fitness: float = 0.0,
+        artifact_dir: Optional[Path] = None,
+    ) -> None:
+        super().__init__(None, failure_fitness, None)
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_attempts = max_attempts
+        self.artifact_dir = artifact_dir
+        self.requeued = 0
+        if authkey is None:
+            if not is_loopback(address[0]):
+                raise ValueError(
+                    "an authkey is required to listen on {}".format(address[0])
+                )
+            authkey = secrets.token_bytes(32)
+        self.authkey = authkey
+        self._jobs: "queue.Queue[_Job]" = queue.Queue()
+        self._ids = itertools.count()
+        self._workers = 0
+        self._stopping = threading.Event()
+        self._listener = Listener(address, authkey=authkey)
+        self.address: Address = self._listener.address
+        self._acceptor = threading.Thread(target=self._accept, daemon=True)
+        self._acceptor.start()
+
+    @property
+    def slots(self) -> int:
+        return max(1, self._workers)
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    def _accept(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                connection = self._listener.accept()
+            except (OSError, EOFError, AuthenticationError):
+                continue
+            if self._stopping.is_set():
+                connection.close()
+                break
+            threading.Thread(
+                target=self._serve, args=(connection,), daemon=True
+            ).start()
+
+    def _serve(self, connection: Connection) -> None:
+        with self._lock:
+            self._workers += 1
+        try:
+            while not self._stopping.is_set():
+                try:
+                    job = self._jobs.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if not self._run_job(connection, job):
+                    return
+            connection.send(("stop",))
+        except (OSError, EOFError):
+            pass
+        finally:
+            with self._lock:
+                self._workers -= 1
+            connection.close()
+
+    def _run_job(self, connection: Connection, job: _Job) -> bool:
+        job_id, chromosome, future, attempts = job
+        try:
+            connection.send(("job", job_id, chromosome))
+            while True:
+                if not connection.poll(self.heartbeat_timeout):
+                    raise TimeoutError()
+                message = connection.recv()
+                if message[0] == "result":
+                    break
+        except (OSError, EOFError, TimeoutError):
+            self._requeue(job)
+            return False
+
+        _, _, *fields, artifacts = message
+        self._save_artifacts(chromosome, artifacts)
+        future.set_result(Candidate_result(*fields))
+        return True
+
+    def _requeue(self, job: _Job) -> None:
+        job_id, chromosome, future, attempts = job
+        with self._lock:
+            self.requeued += 1
+        if attempts + 1 >= self.max_attempts:
+            future.set_result(Candidate_result(self.failure_fitness, FAILED, 0.0))
+        else:
+            self._jobs.put((job_id, chromosome, future, attempts + 1))
+
+    def _save_artifacts(
+        self, chromosome: Dict[str, str], artifacts: Dict[str, bytes]
+    ) -> None:
+        if self.artifact_dir is None or not artifacts:
+            return
+        directory = self.artifact_dir / chromosome_key(chromosome)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name, data in artifacts.items():
+            (directory / Path(name).name).write_bytes(data)
+
+    def _create_executor(self) -> Executor:
+        raise TypeError("the jobs of a Coordinator_engine are run by its workers")
+
+    def submit(
+        self, score: Score, chromosome: Dict[str, str]
+    ) -> "Future[Candidate_result]":
+        future: "Future[Candidate_result]" = Future()
+        future.add_done_callback(self._tally)
+        self._jobs.put((next(self._ids), chromosome, future, 0))
+        return future
+
+    def close(self) -> None:
+        if self._stopping.is_set():
+            return
+        self._stopping.set()
+        try:
+            Client(self.address, authkey=self.authkey).close()
+        except (OSError, EOFError):
+            pass
+        self._listener.close()
+        self._acceptor.join()
+
+
+def run_worker(
+    address: Address,
+    score: Score,
+    authkey: bytes,
+    heartbeat_interval: float = 5.0,
+    timeout: Optional[float] = None,
+    failure_fitness: float = 0.0,
+    work_dir: Optional[Path] = None,
+    artifacts: Sequence[str] = (),
+) -> None:
+    """
+    Serve a Coordinator_engine: score the chromosomes it sends until told
+    to stop, sending heartbeats while a simulation runs. Files in `work_dir`
+    matching the `artifacts` glob patterns are sent back with every result;
+    they are deleted before each job so only the job's own files are sent
+    """
+    connection = Client(address, authkey=authkey)
+    lock = threading.Lock()
+    if work_dir is not None:
+        work_dir.mkdir(parents=True, exist_ok=True)
+    set_worker_dir(work_dir)
+
+    def beat(done: threading.Event) -> None:
+        while not done.wait(heartbeat_interval):
+            with lock:
+                connection.send(("heartbeat",))
+
+    try:
+        while True:
+            message = connection.recv()
+            if message[0] != "job":
+                break
+            _, job_id, chromosome = message
+            if work_dir is not None:
+                for pattern in artifacts:
+                    for path in work_dir.glob(pattern):
+                        path.unlink()
+
+            done = threading.Event()
+            heartbeat = threading.Thread(target=beat, args=(done,), daemon=True)
+            heartbeat.start()
+            result = run_candidate(
+                score, chromosome, timeout, failure_fitness, capture=True
+            )
+            done.set()
+            heartbeat.join()
+
+            files: Dict[str, bytes] = {}
+            if work_dir is not None:
+                for pattern in artifacts:
+                    for path in work_dir.glob(pattern):
+                        files[path.name] = path.read_bytes()
+            with lock:
+                connection.send(("result", job_id, *result, files))
+    except (OSError, EOFError):
+        pass
+    finally:
+        set_worker_dir(None)
+        connection.close()
+
+
+def _load_score(reference: str) -> Any:
+    module, _, name = reference.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+@click.command()
+@click.option("--host", default="localhost", help="Coordinator host")
+@click.option("--port", type=int, required=True, help="Coordinator port")
+@click.option(
+    "--authkey",
+    required=True,
+    envvar="PFUZZ_AUTHKEY",
+    help="Shared secret of the campaign in hex, as printed by the coordinator",
+)
+@click.option("--score", required=True, help="Score function as module:function")
+@click.option("--work-dir", type=click.Path(path_type=Path), default=None)
+@click.option("--artifact", multiple=True, help="Glob of files to send back")
+@click.option("--timeout", type=float, default=None, help="Seconds per candidate")
+@click.option("--heartbeat-interval", type=float, default=5.0)
+def main(
+    host: str,
+    port: int,
+    authkey: str,
+    score: str,
+    work_dir: Optional[Path],
+    artifact: Tuple[str, ...],
+    timeout: Optional[float],
+    heartbeat_interval: float,
+) -> None:
+    """Run a fuzzing worker for a coordinator listening on HOST:PORT"""
+    run_worker(
+        (host, port),
+        _load_score(score),
+        bytes.fromhex(authkey),
+        heartbeat_interval,
+        timeout,
+        work_dir=work_dir,
+        artifacts=artifact,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,452 @@
+import itertools
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+from types import FrameType, TracebackType
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from pfuzz.metrics import SCORE, metrics
+from pfuzz.worker import set_worker_dir, set_worker_name
+
+Score = Callable[[dict[str, str]], float]
+
+OK = "ok"
+FAILED = "failed"
+TIMEOUT = "timeout"
+
+
+class Candidate_timeout(Exception):
+    """Raised inside a worker when a candidate exceeds its time budget"""
+
+
+class Candidate_result(NamedTuple):
+    fitness: float
+    status: str
+    seconds: float
+    metrics: Optional[Dict[str, Any]] = None
+
+
+@contextmanager
+def _deadline(timeout: Optional[float]) -> Iterator[None]:
+    """
+    Interrupt the enclosed block with Candidate_timeout after `timeout` seconds.
+    Signals are only delivered to the main thread, so elsewhere the block
+    runs to completion and the caller checks the elapsed time afterwards
+    """
+    if (
+        timeout is None
+        or not hasattr(signal, "setitimer")
+        or threading.current_thread() is not threading.main_thread()
+    ):
+        yield
+        return
+
+    def expire(signum: int, frame: Optional[FrameType]) -> None:
+        raise Candidate_timeout()
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def run_candidate(
+    score: Score,
+    chromosome: dict[str, str],
+    timeout: Optional[float],
+    failure_fitness: float,
+    capture: bool = False,
+    isolate: bool = True,
+) -> Candidate_result:
+    """
+    Score a single chromosome, turning timeouts into `failure_fitness`
+
+    :capture: return the metrics recorded while scoring with the result,
+        for workers outside the process merging them
+    :isolate: turn exceptions into `failure_fitness` as well, so one bad
+        candidate cannot break the batch, instead of propagating them
+    """
+    if not capture:
+        return _run_candidate(score, chromosome, timeout, failure_fitness, isolate)
+    with metrics.capture() as captured:
+        result = _run_candidate(score, chromosome, timeout, failure_fitness, isolate)
+    return result._replace(metrics=captured.snapshot())
+
+
+def _run_candidate(
+    score: Score,
+    chromosome: dict[str, str],
+    timeout: Optional[float],
+    failure_fitness: float,
+    isolate: bool,
+) -> Candidate_result:
+    start = time.monotonic()
+    try:
+        with _deadline(timeout):
+            fitness = score(chromosome)
+    except Candidate_timeout:
+        return Candidate_result(failure_fitness, TIMEOUT, time.monotonic() - start)
+    except Exception:
+        if not isolate:
+            raise
+        return Candidate_result(failure_fitness, FAILED, time.monotonic() - start)
+
+    seconds = time.monotonic() - start
+    if timeout is not None and seconds > timeout:
+        return Candidate_result(failure_fitness, TIMEOUT, seconds)
+    return Candidate_result(fitness, OK, seconds)
+
+
+def _shut_down(executor: Executor, future: "Future[Candidate_result]") -> None:
+    executor.shutdown(wait=False)
+
+
+def _init_worker(work_dir: Optional[Path], slots: Any) -> None:
+    name = "worker-{}".format(slots.get())
+    set_worker_name(name)
+    if work_dir is None:
+        return
+    directory = work_dir / name
+    directory.mkdir(parents=True, exist_ok=True)
+    set_worker_dir(directory)
+
+
+class Evaluation_engine(ABC):
+    """
+    Base class for strategies that score a generation of chromosomes.
+    Each worker gets its own subdirectory of `work_dir`, available
+    to `func_generate`/`func_run` through `pfuzz.worker.worker_dir`.
+    Without `work_dir` pool workers write to their own subdirectory
+    of the default output directory of the generator instead
+
+    :isolate_failures: score candidates raising an exception with
+        `failure_fitness` instead of letting the exception propagate
+    """
+
+    #: whether workers run in other processes and send their metrics back
+    remote_metrics = False
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        failure_fitness: float = 0.0,
+        work_dir: Optional[Path] = None,
+        isolate_failures: bool = True,
+    ) -> None:
+        self.timeout = timeout
+        self.failure_fitness = failure_fitness
+        self.work_dir = work_dir
+        self.isolate_failures = isolate_failures
+        self.evaluated = 0
+        self.failed = 0
+        self.timed_out = 0
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._submitted: Dict[
+            "Future[Candidate_result]", Tuple[Score, dict[str, str], Executor]
+        ] = {}
+        self._retries: Dict["Future[Candidate_result]", "Future[Candidate_result]"] = {}
+        self._broken: List[Tuple["Future[Candidate_result]", Score, dict[str, str]]] = (
+            []
+        )
+
+    @property
+    def slots(self) -> int:
+        """Number of candidates the engine can score at the same time"""
+        return 1
+
+    @abstractmethod
+    def _create_executor(self) -> Executor:
+        """Executor scoring the candidates"""
+
+    def _create_isolated_executor(self) -> Optional[Executor]:
+        """
+        Executor scoring a single candidate apart from every other one,
+        None if a crashing candidate cannot break its siblings
+        """
+        return None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = self._create_executor()
+        return self._executor
+
+    def _tally(self, future: "Future[Candidate_result]") -> None:
+        if future.cancelled() or future.exception() is not None:
+            return
+        result = future.result()
+        status = result.status
+        metrics.record(SCORE, result.seconds)
+        metrics.count(status)
+        if result.metrics is not None:
+            metrics.merge(result.metrics)
+        with self._lock:
+            self.evaluated += 1
+            if status == FAILED:
+                self.failed += 1
+            elif status == TIMEOUT:
+                self.timed_out += 1
+
+    def _submit(
+        self, executor: Executor, score: Score, chromosome: dict[str, str]
+    ) -> "Future[Candidate_result]":
+        future = executor.submit(
+            run_candidate,
+            score,
+            chromosome,
+            self.timeout,
+            self.failure_fitness,
+            self.remote_metrics and metrics.enabled,
+            self.isolate_failures,
+        )
+        future.add_done_callback(self._tally)
+        return future
+
+    def submit(
+        self, score: Score, chromosome: dict[str, str]
+    ) -> "Future[Candidate_result]":
+        executor = self._get_executor()
+        future = self._submit(executor, score, chromosome)
+        with self._lock:
+            self._submitted[future] = (score, chromosome, executor)
+        return future
+
+    def _isolate(self, executor: Executor) -> None:
+        """
+        Queue every candidate broken by the crash of a worker of `executor`
+        to be scored again in its own isolated executor
+        """
+        if executor is self._executor:
+            self.close()
+        with self._lock:
+            queued = {item[0] for item in self._broken}
+            self._broken.extend(
+                (future, score, chromosome)
+                for future, (score, chromosome, owner) in self._submitted.items()
+                if owner is executor
+                and future not in self._retries
+                and future not in queued
+                and future.done()
+                and isinstance(future.exception(), BrokenProcessPool)
+            )
+
+    def _launch(self) -> None:
+        """Start queued isolated candidates while there are free slots"""
+        while self._broken:
+            with self._lock:
+                running = sum(not retry.done() for retry in self._retries.values())
+            if running >= self.slots:
+                return
+            isolated = self._create_isolated_executor()
+            if isolated is None:
+                return
+            future, score, chromosome = self._broken.pop(0)
+            retry = self._submit(isolated, score, chromosome)
+            retry.add_done_callback(partial(_shut_down, isolated))
+            with self._lock:
+                self._retries[future] = retry
+
+    def collect(self, future: "Future[Candidate_result]") -> Candidate_result:
+        """
+        Wait for a submitted candidate. When a worker crashes, the candidates
+        it broke are scored again each in an isolated executor, so only the
+        candidate crashing a worker on its own counts as a failure
+        """
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            with self._lock:
+                submitted = self._submitted.get(future)
+            if submitted is not None:
+                self._isolate(submitted[2])
+        finally:
+            with self._lock:
+                self._submitted.pop(future, None)
+
+        while future not in self._retries and any(
+            item[0] is future for item in self._broken
+        ):
+            self._launch()
+            if future in self._retries:
+                break
+            with self._lock:
+                running = [
+                    retry for retry in self._retries.values() if not retry.done()
+                ]
+            if not running:
+                break
+            wait(running, return_when=FIRST_COMPLETED)
+
+        with self._lock:
+            retry = self._retries.pop(future, None)
+        try:
+            if retry is not None:
+                return retry.result()
+        except BrokenProcessPool:
+            pass
+        finally:
+            self._launch()
+        with self._lock:
+            self.evaluated += 1
+            self.failed += 1
+        return Candidate_result(self.failure_fitness, FAILED, 0.0)
+
+    def evaluate_results(
+        self, score: Score, chromosomes: list[dict[str, str]]
+    ) -> list[Candidate_result]:
+        """Score all the chromosomes, preserving their order"""
+        futures = [self.submit(score, chromosome) for chromosome in chromosomes]
+        return [self.collect(future) for future in futures]
+
+    def evaluate(self, score: Score, chromosomes: list[dict[str, str]]) -> list[float]:
+        return [result.fitness for result in self.evaluate_results(score, chromosomes)]
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self) -> "Evaluation_engine":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+
+class _Inline_executor(Executor):
+    def __init__(self, work_dir: Optional[Path]) -> None:
+        self.directory = None if work_dir is None else work_dir / "worker-0"
+
+    def submit(  # type: ignore[override]
+        self, fn: Callable[..., Candidate_result], /, *args: Any, **kwargs: Any
+    ) -> "Future[Candidate_result]":
+        future: "Future[Candidate_result]" = Future()
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        set_worker_dir(self.directory)
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as error:
+            future.set_exception(error)
+        finally:
+            set_worker_dir(None)
+        return future
+
+
+class Serial_engine(Evaluation_engine):
+    """
+    Score chromosomes one by one in the calling thread. Unless asked
+    to isolate failures, exceptions of the score function propagate
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        failure_fitness: float = 0.0,
+        work_dir: Optional[Path] = None,
+        isolate_failures: bool = False,
+    ) -> None:
+        super().__init__(timeout, failure_fitness, work_dir, isolate_failures)
+
+    def _create_executor(self) -> Executor:
+        return _Inline_executor(self.work_dir)
+
+
+class Thread_pool_engine(Evaluation_engine):
+    """
+    Score chromosomes in a pool of threads, suitable when `func_run`
+    spends its time waiting for an external simulator process.
+    A thread cannot be interrupted, so a candidate exceeding `timeout`
+    runs to completion and only then is scored as timed out
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        failure_fitness: float = 0.0,
+        work_dir: Optional[Path] = None,
+    ) -> None:
+        super().__init__(timeout, failure_fitness, work_dir)
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    @property
+    def slots(self) -> int:
+        return self.max_workers
+
+    def _create_executor(self) -> Executor:
+        slots: "queue.Queue[int]" = queue.Queue()
+        for slot in range(self.max_workers):
+            slots.put(slot)
+        return ThreadPoolExecutor(
+            self.max_workers,
+            initializer=_init_worker,
+            initargs=(self.work_dir, slots),
+        )
+
+
+class Process_pool_engine(Evaluation_engine):
+    """
+    Score chromosomes in a pool of processes. The score function together
+    with `func_generate` and `func_run` have to be picklable
+    """
+
+    remote_metrics = True
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        failure_fitness: float = 0.0,
+        work_dir: Optional[Path] = None,
+    ) -> None:
+        super().__init__(timeout, failure_fitness, work_dir)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._isolated_slots = itertools.count()
+
+    @property
+    def slots(self) -> int:
+        return self.max_workers
+
+    def _process_pool(self, slot_numbers: range) -> Executor:
+        context = multiprocessing.get_context()
+        slots = context.Queue()
+        for slot in slot_numbers:
+            slots.put(slot)
+        return ProcessPoolExecutor(
+            len(slot_numbers),
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.work_dir, slots),
+        )
+
+    def _create_executor(self) -> Executor:
+        return self._process_pool(range(self.max_workers))
+
+    def _create_isolated_executor(self) -> Optional[Executor]:
+        slot = self.max_workers + next(self._isolated_slots)
+        return self._process_pool(range(slot, slot + 1))
@@ -0,0 +1,127 @@
+import heapq
+import random
+from array import array
+from typing import Dict, List, Sequence
+
+from pfuzz.mutation.random_source import Random_source
+
+ABSENT = -1
+
+
+class Genome_population:
+    """
+    Population of Csmith configurations encoded as a row-major 2-D array
+    of integers: one row per chromosome and one column per flag of the
+    template config, holding the index of the value in the flag range or
+    ABSENT when the flag is not passed to Csmith. Chromosomes are decoded
+    into the dict form only when they are evaluated. Without numpy the
+    operators are not vectorized: they copy each child from its parent row
+    with one slice of the flat array and draw the random genes up front
+    """
+
+    def __init__(self, template_config: Dict[str, range]) -> None:
+        self.template_config = template_config
+        self.flags = list(template_config.keys())
+        self.ranges = [template_config[flag] for flag in self.flags]
+        self.width = len(self.flags)
+        self.genes = array("i")
+        self.fitness = array("d")
+
+    def __len__(self) -> int:
+        return len(self.fitness)
+
+    def empty(self) -> "Genome_population":
+        return Genome_population(self.template_config)
+
+    def row(self, index: int) -> "array[int]":
+        return self.genes[index * self.width : (index + 1) * self.width]
+
+    def append(self, genes: "array[int]", fitness: float = 0.0) -> None:
+        self.genes.extend(genes)
+        self.fitness.append(fitness)
+
+    @classmethod
+    def random_population(
+        cls,
+        template_config: Dict[str, range],
+        size: int,
+        rng: Random_source = random,
+    ) -> "Genome_population":
+        """Population with every flag set to a uniformly random value"""
+        population = cls(template_config)
+        population.genes = array("i", bytes(4 * population.width * size))
+        for column, values in enumerate(population.ranges):
+            population.genes[column :: population.width] = array(
+                "i", rng.choices(range(len(values)), k=size)
+            )
+        population.fitness = array("d", bytes(8 * size))
+        return population
+
+    def encode(self, chromosome: Dict[str, str], fitness: float = 0.0) -> None:
+        """Append a chromosome in the dict form"""
+        genes = array("i", [ABSENT] * self.width)
+        for column, flag in enumerate(self.flags):
+            if flag in chromosome:
+                genes[column] = self.ranges[column].index(int(chromosome[flag]))
+        self.append(genes, fitness)
+
+    def decode(self, index: int) -> Dict[str, str]:
+        """Chromosome of a row in the dict form"""
+        return {
+            flag: str(values[gene])
+            for flag, values, gene in zip(
+                self.flags, self.ranges, self.row(index), strict=True
+            )
+            if gene != ABSENT
+        }
+
+    def decode_rows(self, rows: Sequence[int]) -> List[Dict[str, str]]:
+        return [self.decode(index) for index in rows]
+
+    def take(self, rows: Sequence[int]) -> "Genome_population":
+        """Population made of the given rows"""
+        population = self.empty()
+        for index in rows:
+            population.append(self.row(index), self.fitness[index])
+        return population
+
+    def extend(self, other: "Genome_population") -> None:
+        self.genes.extend(other.genes)
+        self.fitness.extend(other.fitness)
+
+    def select(self, amount: int) -> List[int]:
+        """Rows of the `amount` fittest chromosomes, the fittest first"""
+        return heapq.nlargest(amount, range(len(self)), key=self.fitness.__getitem__)
+
+    def crossover(
+        self,
+        first: Sequence[int],
+        second: Sequence[int],
+        rng: Random_source = random,
+    ) -> "Genome_population":
+        """
+        Two children for every pair of rows, made by swapping
+        a single random gene between the parents
+        """
+        children = self.empty()
+        columns = rng.choices(range(self.width), k=len(first))
+        for index1, index2, column in zip(first, second, columns, strict=True):
+            child1 = self.row(index1)
+            child2 = self.row(index2)
+            child1[column], child2[column] = child2[column], child1[column]
+            children.append(child1)
+            children.append(child2)
+        return children
+
+    def mutate(
+        self, rows: Sequence[int], rng: Random_source = random
+    ) -> "Genome_population":
+        """A child for every row with a single gene set to a random value"""
+        children = self.empty()
+        sizes = [len(values) for values in self.ranges]
+        columns = rng.choices(range(self.width), k=len(rows))
+        for index, column in zip(rows, columns, strict=True):
+            child = self.row(index)
+            child[column] = int(rng.random() * sizes[column])
+            children.append(child)
+        return children
@@ -1,8 +1,31 @@
 import random
-import re
 import os
-from typing import Callable
+from array import array
+import heapq
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from functools import partial
+from itertools import count
+from typing import Any, Callable, Sequence, cast
 from typing import List
+from typing import Optional
+
+from pfuzz.metrics import SIMULATE, metrics
+from pfuzz.mutation.adaptive import Adaptive_rates
+from pfuzz.mutation.assembly import Assembly_program, Program_store
+from pfuzz.mutation.cache import Fitness_cache
+from pfuzz.mutation.checkpoint import Checkpoint
+from pfuzz.mutation.evaluation import (
+    OK,
+    Candidate_result,
+    Evaluation_engine,
+    Score,
+    Serial_engine,
+)
+from pfuzz.mutation.genome import Genome_population
+from pfuzz.mutation.pareto import pareto_select
+from pfuzz.mutation.random_source import Random_source
+from pfuzz.mutation.sampling import diversity
+from pfuzz.mutation.surrogate import Nearest_neighbour_surrogate
 
 
 class Mutation:
@@ -39,7 +62,8 @@ class Mutation:
         desired_output: float,
     ) -> float:
         func_generate(chromosome)
-        result = func_run()
+        with metrics.stage(SIMULATE):
+            result = func_run()
         if result != desired_output:
             fitness = 1.0 / abs(result - desired_output)
         else:
@@ -73,6 +97,33 @@ class Mutation:
             population.append((child1, 0.0))
             population.append((child2, 0.0))
 
+    def make_evaluator(
+        self,
+        func_generate: Callable[[dict[str, str]], None],
+        func_run: Callable[[], int],
+        desired_output: float,
+        engine: Optional[Evaluation_engine] = None,
+        cache: Optional[Fitness_cache] = None,
+    ) -> Callable[[list[dict[str, str]]], list[float]]:
+        """
+        Function scoring a batch of chromosomes with fitness_func
+        through the evaluation engine and the optional cache
+        """
+        evaluation_engine = Serial_engine() if engine is None else engine
+        score = partial(
+            self.fitness_func,
+            func_generate=func_generate,
+            func_run=func_run,
+            desired_output=desired_output,
+        )
+
+        def evaluate(chromosomes: list[dict[str, str]]) -> list[float]:
+            if cache is None:
+                return evaluation_engine.evaluate(score, chromosomes)
+            return cache.evaluate(evaluation_engine, score, chromosomes, desired_output)
+
+        return evaluate
+
     def genetic_func(
         self,
         population: list[tuple[dict[str, str], float]],
@@ -83,30 +134,347 @@ class Mutation:
         func_generate: Callable[[dict[str, str]], None],
         func_run: Callable[[], int],
         desired_output: float,
+        engine: Optional[Evaluation_engine] = None,
+        cache: Optional[Fitness_cache] = None,
+        checkpoint: Optional[Checkpoint] = None,
+        surrogate: Optional[Nearest_neighbour_surrogate] = None,
+        screen_fraction: float = 0.5,
+        rates: Optional[Adaptive_rates] = None,
     ) -> list[tuple[dict[str, str], float]]:
         """
         Function to implement genetic evolution for a set
         of Csmith starting configurations
-        """
 
-        for index, item in enumerate(population):
-            result = self.fitness_func(item[0], func_generate, func_run, desired_output)
-            population[index] = (item[0], result)
-
-        for i in range(iterations):
+        :engine: strategy used to score each generation, serial by default
+        :cache: memoization of already scored chromosomes, its hit/miss
+            counters are left for the caller to inspect after the run
+        :checkpoint: campaign state to save while running, together with
+            the states of `surrogate` and `rates`; if it holds a snapshot,
+            the run resumes from it and `population` is ignored
+        :surrogate: model trained on every scored chromosome; when given,
+            only the `screen_fraction` of the children it predicts to be
+            the fittest is simulated, the rest is dropped unscored
+        :rates: adaptive numbers of crossovers and mutations used instead of
+            `reproduce`, updated every generation from the best fitness and
+            the diversity of the survivors; all the children are scored
+        """
+        evaluate = self.make_evaluator(
+            func_generate, func_run, desired_output, engine, cache
+        )
+        start = 0
+        restored = None
+        components: dict[str, Any] = {}
+        if checkpoint is not None:
+            evaluate = checkpoint.wrap(evaluate)
+            restored = checkpoint.load()
+
+        if restored is not None:
+            start, population, components = restored
+            if rates is not None and "rates" in components:
+                rates.restore(components["rates"])
+        else:
+            results = evaluate([item[0] for item in population])
+            for index, item in enumerate(population):
+                population[index] = (item[0], results[index])
+        if surrogate is not None and "surrogate" in components:
+            surrogate.restore(components["surrogate"])
+        elif surrogate is not None:
+            surrogate.update(
+                [item[0] for item in population], [item[1] for item in population]
+            )
+
+        for i in range(start, iterations):
+            if checkpoint is not None:
+                components = {}
+                if surrogate is not None:
+                    components["surrogate"] = surrogate.state()
+                if rates is not None:
+                    components["rates"] = rates.state()
+                checkpoint.save(i, population, components)
             population = self.population_sort(population, alive)
             if population[0][1] == 1.0:
                 print(i + 1)
                 break
-            self.crossover(population, reproduce)
-            self.mutation(population, template_config, reproduce)
-            for index, item in enumerate(population[-alive:]):
-                result = self.fitness_func(
-                    item[0], func_generate, func_run, desired_output
+            survivors = len(population)
+            crossovers = mutations = reproduce
+            fresh = alive
+            if rates is not None:
+                rates.update(
+                    population[0][1],
+                    diversity([item[0] for item in population], template_config),
                 )
-                population[-alive + index] = (item[0], result)
+                crossovers, mutations = rates.crossover, rates.mutation
+            self.crossover(population, min(crossovers, len(population)))
+            self.mutation(population, template_config, min(mutations, len(population)))
+            if rates is not None:
+                fresh = len(population) - survivors
+            if surrogate is None:
+                results = evaluate([item[0] for item in population[-fresh:]])
+                for index, item in enumerate(population[-fresh:]):
+                    population[-fresh + index] = (item[0], results[index])
+            else:
+                children = [item[0] for item in population[survivors:]]
+                children = [
+                    children[index]
+                    for index in surrogate.screen(children, screen_fraction)
+                ]
+                results = evaluate(children)
+                surrogate.update(children, results)
+                population[survivors:] = zip(children, results, strict=True)
+            metrics.generation(i + 1, len(results))
         return population
 
+    def resume_genetic_func(
+        self,
+        checkpoint: Checkpoint,
+        template_config: dict[str, range],
+        iterations: int,
+        alive: int,
+        reproduce: int,
+        func_generate: Callable[[dict[str, str]], None],
+        func_run: Callable[[], int],
+        desired_output: float,
+        engine: Optional[Evaluation_engine] = None,
+        cache: Optional[Fitness_cache] = None,
+        surrogate: Optional[Nearest_neighbour_surrogate] = None,
+        screen_fraction: float = 0.5,
+        rates: Optional[Adaptive_rates] = None,
+    ) -> list[tuple[dict[str, str], float]]:
+        """
+        Continue an interrupted genetic_func run from its checkpoint,
+        with the same arguments it was started with
+        """
+        if not checkpoint.snapshot_path.exists():
+            raise FileNotFoundError(checkpoint.snapshot_path)
+        return self.genetic_func(
+            [],
+            template_config,
+            iterations,
+            alive,
+            reproduce,
+            func_generate,
+            func_run,
+            desired_output,
+            engine,
+            cache,
+            checkpoint,
+            surrogate,
+            screen_fraction,
+            rates,
+        )
+
+    def steady_state_func(
+        self,
+        population: list[tuple[dict[str, str], float]],
+        template_config: dict[str, range],
+        evaluations: int,
+        alive: int,
+        func_generate: Callable[[dict[str, str]], None],
+        func_run: Callable[[], int],
+        desired_output: float,
+        engine: Optional[Evaluation_engine] = None,
+        cache: Optional[Fitness_cache] = None,
+        crossover_rate: float = 0.5,
+    ) -> list[tuple[dict[str, str], float]]:
+        """
+        Steady-state genetic evolution without generation barriers: as soon
+        as a candidate is scored it is folded into a min-heap of the `alive`
+        fittest chromosomes and a new offspring is submitted in its place,
+        so every slot of the engine stays busy under uneven simulation times
+
+        :evaluations: number of offspring to score after the initial population
+        :return: the fittest chromosomes, the fittest first
+        """
+        evaluation_engine = Serial_engine() if engine is None else engine
+        score = partial(
+            self.fitness_func,
+            func_generate=func_generate,
+            func_run=func_run,
+            desired_output=desired_output,
+        )
+        survivors: list[tuple[float, int, dict[str, str]]] = []
+        pending: dict[Future[Candidate_result], dict[str, str]] = {}
+        order = count()
+        submitted = 0
+        best = 0.0
+
+        def fold(chromosome: dict[str, str], fitness: float) -> None:
+            nonlocal best
+            best = max(best, fitness)
+            item = (fitness, next(order), chromosome)
+            if len(survivors) < alive:
+                heapq.heappush(survivors, item)
+            else:
+                heapq.heappushpop(survivors, item)
+
+        def offspring() -> dict[str, str]:
+            if len(survivors) > 1 and random.random() < crossover_rate:
+                first, second = random.sample(survivors, 2)
+                return self.crossover_func(first[2], second[2])[0]
+            return self.mutation_func(random.choice(survivors)[2], template_config)
+
+        def submit(chromosome: dict[str, str]) -> None:
+            fitness = None if cache is None else cache.get(chromosome, desired_output)
+            if fitness is None:
+                pending[evaluation_engine.submit(score, chromosome)] = chromosome
+            else:
+                fold(chromosome, fitness)
+
+        for chromosome, _ in population:
+            submit(chromosome)
+
+        while True:
+            while (
+                len(pending) < evaluation_engine.slots
+                and submitted < evaluations
+                and survivors
+                and best != 1.0
+            ):
+                submitted += 1
+                submit(offspring())
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                chromosome = pending.pop(future)
+                result = evaluation_engine.collect(future)
+                if cache is not None and result.status == OK:
+                    cache.put(chromosome, result.fitness, desired_output)
+                fold(chromosome, result.fitness)
+
+        return [(item[2], item[0]) for item in sorted(survivors, reverse=True)]
+
+    def genetic_func_genome(
+        self,
+        population: Genome_population,
+        iterations: int,
+        alive: int,
+        reproduce: int,
+        func_generate: Callable[[dict[str, str]], None],
+        func_run: Callable[[], int],
+        desired_output: float,
+        engine: Optional[Evaluation_engine] = None,
+        cache: Optional[Fitness_cache] = None,
+    ) -> Genome_population:
+        """
+        Genetic evolution over an integer-encoded population, chromosomes
+        are decoded into the dict form only to be evaluated. Unlike
+        genetic_func, every child of a generation gets evaluated
+        """
+        evaluate = self.make_evaluator(
+            func_generate, func_run, desired_output, engine, cache
+        )
+
+        population.fitness = array(
+            "d", evaluate(population.decode_rows(range(len(population))))
+        )
+
+        for i in range(iterations):
+            population = population.take(population.select(alive))
+            if population.fitness[0] == 1.0:
+                print(i + 1)
+                break
+            rows = range(len(population))
+            parents = random.sample(rows, reproduce)
+            children = population.crossover(
+                parents, [random.choice(parents) for _ in parents]
+            )
+            children.extend(population.mutate(random.sample(rows, reproduce)))
+            children.fitness = array(
+                "d", evaluate(children.decode_rows(range(len(children))))
+            )
+            metrics.generation(i + 1, len(children))
+            population.extend(children)
+        return population
+
+    def objectives_func(
+        self,
+        chromosome: dict[str, str],
+        func_generate: Callable[[dict[str, str]], None],
+        func_run: Callable[[], Sequence[float]],
+    ) -> tuple[float, ...]:
+        func_generate(chromosome)
+        with metrics.stage(SIMULATE):
+            return tuple(func_run())
+
+    def pareto_func(
+        self,
+        population: list[dict[str, str]],
+        template_config: dict[str, range],
+        iterations: int,
+        alive: int,
+        reproduce: int,
+        func_generate: Callable[[dict[str, str]], None],
+        func_run: Callable[[], Sequence[float]],
+        engine: Optional[Evaluation_engine] = None,
+        objectives: Optional[int] = None,
+    ) -> list[tuple[dict[str, str], tuple[float, ...]]]:
+        """
+        Multi-objective genetic evolution: `func_run` returns a vector of
+        metrics to maximize, e.g. Tick_statistics.get_pipeline_objectives,
+        and survivors are chosen by non-dominated sorting with crowding
+        distance, so one campaign searches several stress targets at once.
+        Every child of a generation gets evaluated. Failed candidates get
+        the failure fitness of the engine in every objective
+
+        :objectives: number of metrics `func_run` returns, by default
+            the length of the first vector it successfully returns
+        :return: survivors, the first Pareto front first
+        """
+        evaluation_engine = Serial_engine() if engine is None else engine
+        # the engine passes whatever the score returns through unchanged
+        score = cast(
+            Score,
+            partial(
+                self.objectives_func, func_generate=func_generate, func_run=func_run
+            ),
+        )
+
+        width = objectives
+
+        def failed() -> tuple[float, ...]:
+            return (evaluation_engine.failure_fitness,) * (width or 1)
+
+        def evaluate(
+            chromosomes: list[dict[str, str]],
+        ) -> list[tuple[dict[str, str], tuple[float, ...]]]:
+            nonlocal width
+            results = evaluation_engine.evaluate_results(score, chromosomes)
+            vectors = [
+                cast(tuple[float, ...], result.fitness) if result.status == OK else None
+                for result in results
+            ]
+            if width is None:
+                width = next((len(v) for v in vectors if v is not None), None)
+            return [
+                (chromosome, failed() if vector is None else vector)
+                for chromosome, vector in zip(chromosomes, vectors, strict=True)
+            ]
+
+        scored = evaluate(population)
+        for i in range(iterations):
+            survivors = pareto_select([item[1] for item in scored], alive)
+            parents = [scored[index][0] for index in survivors]
+            children: list[dict[str, str]] = []
+            for chromosome in random.sample(parents, min(reproduce, len(parents))):
+                children.extend(self.crossover_func(chromosome, random.choice(parents)))
+            for chromosome in random.sample(parents, min(reproduce, len(parents))):
+                children.append(self.mutation_func(chromosome, template_config))
+            scored = [scored[index] for index in survivors] + evaluate(children)
+            # candidates failing before any succeeded were given a failure
+            # vector of a guessed length
+            scored = [
+                (chromosome, vector if len(vector) == width else failed())
+                for chromosome, vector in scored
+            ]
+            metrics.generation(i + 1, len(children))
+
+        return [
+            scored[index]
+            for index in pareto_select([item[1] for item in scored], alive)
+        ]
+
 
 RISCV_INSTRUCTIONS = [
     "add",
@@ -134,7 +502,7 @@ RISCV_INSTRUCTIONS = [
 
 class Assembly_mutation:
     def __init__(self) -> None:
-        pass
+        self.programs = Program_store()
 
     """
     Class containing all the neccessary tools
@@ -142,16 +510,67 @@ class Assembly_mutation:
     """
 
     def find_labels_and_jumps(self, path: str) -> List[int]:
-        label_jump_lines = []
-        label_pattern = re.compile(r"^\s*\w+:\s*")
-        jump_pattern = re.compile(r"^\s*(j|jal|beq|bne|blt|bge|bltu|bgeu)")
+        return list(self.programs.get(path).boundaries)
 
-        with open(path, "r") as file:
-            for line_number, line in enumerate(file):
-                if label_pattern.match(line) or jump_pattern.match(line):
-                    label_jump_lines.append(line_number)
+    def child_path(self, path: str, generation_number: int, child_number: int) -> str:
+        directory = os.path.dirname(path)
+        name, ext = os.path.splitext(path)
+        child_name = "-".join((str(generation_number), str(child_number)))
+        return os.path.join(directory, child_name + ext)
 
-        return label_jump_lines
+    def crossover_programs(
+        self,
+        parent1: Assembly_program,
+        parent2: Assembly_program,
+        labels1: Optional[List[int]] = None,
+        labels2: Optional[List[int]] = None,
+        rng: Random_source = random,
+    ) -> Optional[Assembly_program]:
+        """
+        Replace a random basic block of the first parent
+        with a random basic block of the second one
+
+        :labels1: label and jump lines of the first parent, found if omitted
+        :labels2: label and jump lines of the second parent, found if omitted
+        :return: child program or None if a parent has too few basic blocks
+        """
+        labels1 = parent1.boundaries if labels1 is None else labels1
+        labels2 = parent2.boundaries if labels2 is None else labels2
+
+        if len(labels1) < 2 or len(labels2) < 2:
+            return None
+
+        num1 = rng.randint(0, len(labels1) - 2)
+        num2 = rng.randint(0, len(labels2) - 2)
+
+        return Assembly_program(
+            parent1.lines[: labels1[num1] + 1]
+            + parent2.lines[labels2[num2] + 1 : labels2[num2 + 1]]
+            + parent1.lines[labels1[num1 + 1] :]
+        )
+
+    def mutate_program(
+        self,
+        program: Assembly_program,
+        max_mutatings: int,
+        rng: Random_source = random,
+    ) -> Assembly_program:
+        """
+        Replace opcodes of up to `max_mutatings` instructions
+        with random RISC-V instructions
+        """
+        lines = program.lines.copy()
+        count = max_mutatings
+
+        for instruction in range(len(program.instructions)):
+            if count <= 0:
+                break
+            if rng.random() > 0.3:
+                program.replace_opcode(
+                    lines, instruction, rng.choice(RISCV_INSTRUCTIONS)
+                )
+                count -= 1
+        return Assembly_program(lines)
 
     def assembly_crossover(
         self,
@@ -163,66 +582,22 @@ class Assembly_mutation:
         child_number: int,
     ) -> str:
 
-        if len(labels1) < 2 or len(labels2) < 2:
+        child = self.crossover_programs(
+            self.programs.get(path1), self.programs.get(path2), labels1, labels2
+        )
+        if child is None:
             return "Малое количество базовых блоков для скрещивания"
 
-        num1 = random.randint(0, len(labels1) - 2)
-        num2 = random.randint(0, len(labels2) - 2)
-
-        directory = os.path.dirname(path1)
-        name, ext = os.path.splitext(path1)
-        child_name = "-".join((str(generation_number), str(child_number)))
-        child_file_path = os.path.join(directory, child_name + ext)
-
-        with open(path1, "r") as parent, open(path2, "r") as parent2, open(
-            child_file_path, "w+"
-        ) as child:
-
-            for line_number, line in enumerate(parent, start=0):
-                child.write(line)
-                if line_number >= labels1[num1]:
-                    break
-
-            for line_number, line in enumerate(parent2):
-                if line_number >= labels2[num2 + 1]:
-                    break
-                if line_number >= labels2[num2] + 1:
-                    child.write(line)
-
-            for line_number, line in enumerate(parent):
-                if line_number >= labels1[num1 + 1] - labels1[num1] - 1:
-                    child.write(line)
+        child_file_path = self.child_path(path1, generation_number, child_number)
+        child.write(child_file_path)
         return child_file_path
 
     def assembly_mutate(
         self, path: str, max_mutatings: int, generation_number: int, child_number: int
     ) -> str:
 
-        directory = os.path.dirname(path)
-        name, ext = os.path.splitext(path)
-        child_name = "-".join((str(generation_number), str(child_number)))
-        child_file_path = os.path.join(directory, child_name + ext)
-
-        count = max_mutatings
+        child = self.mutate_program(self.programs.get(path), max_mutatings)
 
-        with open(path, "r") as parent, open(child_file_path, "w+") as child:
-
-            for line in parent:
-
-                split_line = line.split()
-
-                if (
-                    not split_line
-                    or split_line[0].startswith("#")
-                    or split_line[0].startswith(".")
-                    or re.compile(r"^\s*\w+:\s*").match(line)
-                ):
-                    child.write(line)
-                else:
-                    if count > 0 and random.random() > 0.3:
-                        split_line[0] = random.choice(RISCV_INSTRUCTIONS)
-                        child.write("\t" + " ".join(split_line) + "\n")
-                        count -= 1
-                    else:
-                        child.write(line)
+        child_file_path = self.child_path(path, generation_number, child_number)
+        child.write(child_file_path)
         return child_file_path
@@ -0,0 +1,134 @@
+import hashlib
+import random
+from itertools import repeat
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+from pfuzz.gem5_statistics.tick_table import Tick_table
+from pfuzz.mutation.assembly import Assembly_program
+
+Signature = Tuple[int, ...]
+
+_PRIME = (1 << 61) - 1
+
+
+def shingles(tokens: Sequence[Hashable], n: int) -> Set[Tuple[Hashable, ...]]:
+    """Set of the n-grams of a token sequence, the sequence itself if shorter"""
+    if len(tokens) < n:
+        return {tuple(tokens)}
+    return {tuple(tokens[index : index + n]) for index in range(len(tokens) - n + 1)}
+
+
+class Min_hash:
+    """
+    MinHash signatures of sets, whose agreement in a position estimates
+    the Jaccard similarity of the sets. Items are hashed with blake2b,
+    so signatures are stable across processes
+    """
+
+    def __init__(self, num_perm: int = 64, seed: int = 0) -> None:
+        rng = random.Random(seed)
+        self.permutations = [
+            (rng.randrange(1, _PRIME), rng.randrange(_PRIME)) for _ in range(num_perm)
+        ]
+
+    def signature(self, items: Iterable[Hashable]) -> Signature:
+        hashes = [
+            int.from_bytes(
+                hashlib.blake2b(repr(item).encode(), digest_size=8).digest(), "little"
+            )
+            for item in items
+        ]
+        if not hashes:
+            return (_PRIME,) * len(self.permutations)
+        return tuple(
+            min((a * value + b) % _PRIME for value in hashes)
+            for a, b in self.permutations
+        )
+
+    def program_signature(self, program: Assembly_program, n: int = 3) -> Signature:
+        """Signature of the opcode n-grams of an assembly program"""
+        opcodes = [program.lines[line].split()[0] for line in program.instructions]
+        return self.signature(shingles(opcodes, n))
+
+    def trace_signature(self, table: Tick_table, n: int = 4) -> Signature:
+        """
+        Signature of the n-grams of pipeline states of a trace, the state of
+        a tick being the number of events of every stage capped at 3
+        """
+        capped = [list(map(min, column, repeat(3))) for column in table.during]
+        states = list(zip(*capped, strict=True))
+        return self.signature(shingles(states, n))
+
+
+def similarity(first: Signature, second: Signature) -> float:
+    """Estimated Jaccard similarity of the sets of two signatures"""
+    return sum(x == y for x, y in zip(first, second, strict=True)) / len(first)
+
+
+class Novelty_index:
+    """
+    Locality-sensitive hashing index of MinHash signatures: a signature is
+    cut into `bands` bands and items sharing any band are candidate
+    neighbours. Items with an estimated similarity of at least `threshold`
+    are near-duplicates, whose fitness can stand in for a simulation
+    """
+
+    def __init__(self, bands: int = 16, threshold: float = 0.9) -> None:
+        self.bands = bands
+        self.threshold = threshold
+        self.signatures: Dict[Hashable, Signature] = {}
+        self.fitness: Dict[Hashable, float] = {}
+        self._buckets: List[Dict[Signature, List[Hashable]]] = [
+            {} for _ in range(bands)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def _bands(self, signature: Signature) -> Iterable[Tuple[int, Signature]]:
+        rows = len(signature) // self.bands
+        for band in range(self.bands):
+            yield band, signature[band * rows : (band + 1) * rows]
+
+    def add(
+        self, key: Hashable, signature: Signature, fitness: Optional[float] = None
+    ) -> None:
+        if key not in self.signatures:
+            for band, part in self._bands(signature):
+                self._buckets[band].setdefault(part, []).append(key)
+        self.signatures[key] = signature
+        if fitness is not None:
+            self.fitness[key] = fitness
+
+    def neighbours(self, signature: Signature) -> List[Tuple[float, Hashable]]:
+        """Candidate neighbours with their similarity, the most similar first"""
+        keys: Set[Hashable] = set()
+        for band, part in self._bands(signature):
+            keys.update(self._buckets[band].get(part, ()))
+        return sorted(
+            ((similarity(signature, self.signatures[key]), key) for key in keys),
+            key=lambda item: item[0],
+            reverse=True,
+        )
+
+    def duplicates(self, signature: Signature) -> List[Hashable]:
+        return [
+            key for value, key in self.neighbours(signature) if value >= self.threshold
+        ]
+
+    def estimate(self, signature: Signature) -> Optional[float]:
+        """Mean fitness of the scored near-duplicates, None if there are none"""
+        scores = [
+            self.fitness[key]
+            for key in self.duplicates(signature)
+            if key in self.fitness
+        ]
+        return sum(scores) / len(scores) if scores else None
+
+    def novelty(self, signature: Signature, k: int = 5) -> float:
+        """
+        One minus the mean similarity to the `k` nearest indexed items,
+        missing neighbours counting as completely different
+        """
+        nearest = [value for value, _ in self.neighbours(signature)[:k]]
+        return 1.0 - sum(nearest) / k
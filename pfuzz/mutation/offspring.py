@@ -0,0 +1,188 @@
+import io
+import os
+import random
+import tarfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from pfuzz.mutation.assembly import Assembly_program
+from pfuzz.mutation.mutation import Assembly_mutation
+from pfuzz.mutation.novelty import Min_hash, Novelty_index
+from pfuzz.mutation.validity import Assembly_validator
+
+_parents: List[Assembly_program] = []
+
+
+def _load_parents(lines: List[List[str]]) -> None:
+    global _parents
+    _parents = [Assembly_program(program) for program in lines]
+
+
+def _make_children(
+    numbers: range,
+    seed: int,
+    generation_number: int,
+    max_mutatings: int,
+    crossover_rate: float,
+) -> List[Tuple[int, str]]:
+    mutation = Assembly_mutation()
+    children = []
+    for child_number in numbers:
+        rng = random.Random("{}-{}-{}".format(seed, generation_number, child_number))
+        parent = rng.choice(_parents)
+        child = None
+        if len(_parents) > 1 and rng.random() < crossover_rate:
+            child = mutation.crossover_programs(parent, rng.choice(_parents), rng=rng)
+        if child is None:
+            child = mutation.mutate_program(parent, max_mutatings, rng=rng)
+        children.append((child_number, "".join(child.lines)))
+    return children
+
+
+class Assembly_population:
+    """
+    Population-level generation of assembly offspring. Every child is made
+    from its own seed derived from (seed, generation, child number), so the
+    result does not depend on the number of workers or chunking
+
+    :novelty: index of the opcode n-gram signatures of the parents and
+        the children made so far; children that are near-duplicates
+        of an indexed program are dropped before they are simulated
+    :validator: filter dropping the children that would not assemble
+    """
+
+    def __init__(
+        self,
+        parents: List[str],
+        max_mutatings: int = 3,
+        crossover_rate: float = 0.5,
+        seed: int = 0,
+        novelty: Optional[Novelty_index] = None,
+        validator: Optional[Assembly_validator] = None,
+    ) -> None:
+        self.parents = [Assembly_program.from_file(path) for path in parents]
+        self.extension = os.path.splitext(parents[0])[1] if parents else ".s"
+        self.max_mutatings = max_mutatings
+        self.crossover_rate = crossover_rate
+        self.seed = seed
+        self.novelty = novelty
+        self.validator = validator
+        self.min_hash = Min_hash()
+        self.duplicates = 0
+        if novelty is not None:
+            for path, program in zip(parents, self.parents, strict=True):
+                novelty.add(path, self.min_hash.program_signature(program))
+
+    def make_children(
+        self,
+        count: int,
+        generation_number: int,
+        max_workers: Optional[int] = None,
+        chunk_size: int = 256,
+    ) -> List[Tuple[int, str]]:
+        """
+        Produce `count` children as (child number, program text) pairs.
+        A child is a crossover of two random parents with probability
+        `crossover_rate` and a mutation of a random parent otherwise.
+        Invalid children are left out with a validator and near-duplicate
+        children with a novelty index
+        """
+        chunks = [
+            range(start, min(start + chunk_size, count))
+            for start in range(0, count, chunk_size)
+        ]
+        arguments = (
+            self.seed,
+            generation_number,
+            self.max_mutatings,
+            self.crossover_rate,
+        )
+        lines = [program.lines for program in self.parents]
+
+        if max_workers == 1 or len(chunks) <= 1:
+            _load_parents(lines)
+            children = [
+                child for chunk in chunks for child in _make_children(chunk, *arguments)
+            ]
+        else:
+            with ProcessPoolExecutor(
+                max_workers, initializer=_load_parents, initargs=(lines,)
+            ) as executor:
+                futures = [
+                    executor.submit(_make_children, chunk, *arguments)
+                    for chunk in chunks
+                ]
+                children = [child for future in futures for child in future.result()]
+        if self.validator is not None:
+            valid = self.validator.validate([text for _, text in children])
+            children = [child for child, ok in zip(children, valid, strict=True) if ok]
+        return self._novel(children, generation_number)
+
+    def _novel(
+        self, children: List[Tuple[int, str]], generation_number: int
+    ) -> List[Tuple[int, str]]:
+        if self.novelty is None:
+            return children
+        novel = []
+        for child_number, text in children:
+            signature = self.min_hash.program_signature(
+                Assembly_program(text.splitlines(keepends=True))
+            )
+            if self.novelty.duplicates(signature):
+                self.duplicates += 1
+                continue
+            self.novelty.add(
+                self.child_name(generation_number, child_number), signature
+            )
+            novel.append((child_number, text))
+        return novel
+
+    def child_name(self, generation_number: int, child_number: int) -> str:
+        return "-".join((str(generation_number), str(child_number))) + self.extension
+
+    def generate(
+        self,
+        count: int,
+        generation_number: int,
+        out_dir: Path,
+        max_workers: Optional[int] = None,
+        shard_size: int = 1000,
+        archive: bool = False,
+    ) -> List[str]:
+        """
+        Produce `count` children and write them in bulk, either into
+        directory shards of at most `shard_size` files or, with `archive`,
+        into a single `<generation>.tar` file in `out_dir`
+
+        :return: paths of the children, or their member names in the archive
+        """
+        children = self.make_children(count, generation_number, max_workers)
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+        if archive:
+            names = []
+            archive_path = out_dir / "{}.tar".format(generation_number)
+            with tarfile.open(archive_path, "w") as tar:
+                for child_number, text in children:
+                    data = text.encode()
+                    info = tarfile.TarInfo(
+                        self.child_name(generation_number, child_number)
+                    )
+                    info.size = len(data)
+                    info.mtime = int(time.time())
+                    tar.addfile(info, io.BytesIO(data))
+                    names.append(info.name)
+            return names
+
+        paths = []
+        for child_number, text in children:
+            shard = out_dir / "shard-{}".format(child_number // shard_size)
+            if not shard.is_dir():
+                shard.mkdir()
+            path = shard / self.child_name(generation_number, child_number)
+            with open(path, "w") as child:
+                child.write(text)
+            paths.append(str(path))
+        return paths
@@ -0,0 +1,90 @@
+from typing import List, Sequence
+
+Objectives = Sequence[float]
+
+
+def dominates(first: Objectives, second: Objectives) -> bool:
+    """
+    Whether `first` is at least as good as `second` in every objective
+    and better in at least one, all objectives being maximized
+    """
+    better = False
+    for x, y in zip(first, second, strict=True):
+        if x < y:
+            return False
+        better = better or x > y
+    return better
+
+
+def non_dominated_sort(objectives: Sequence[Objectives]) -> List[List[int]]:
+    """
+    Fast non-dominated sorting of NSGA-II
+
+    :return: indices of the items grouped by Pareto fronts, the best first
+    """
+    dominated: List[List[int]] = [[] for _ in objectives]
+    counts = [0] * len(objectives)
+    for p, first in enumerate(objectives):
+        for q in range(p + 1, len(objectives)):
+            second = objectives[q]
+            if dominates(first, second):
+                dominated[p].append(q)
+                counts[q] += 1
+            elif dominates(second, first):
+                dominated[q].append(p)
+                counts[p] += 1
+    front = [p for p, count in enumerate(counts) if count == 0]
+
+    fronts = []
+    while front:
+        fronts.append(front)
+        next_front = []
+        for p in front:
+            for q in dominated[p]:
+                counts[q] -= 1
+                if counts[q] == 0:
+                    next_front.append(q)
+        front = next_front
+    return fronts
+
+
+def crowding_distance(
+    objectives: Sequence[Objectives], front: Sequence[int]
+) -> List[float]:
+    """
+    Crowding distance of every item of a front, in the order of `front`.
+    Boundary items of every objective get an infinite distance
+    """
+    distances = [0.0] * len(front)
+    if not front:
+        return distances
+    for objective in range(len(objectives[front[0]])):
+        order = sorted(range(len(front)), key=lambda i: objectives[front[i]][objective])
+        low = objectives[front[order[0]]][objective]
+        high = objectives[front[order[-1]]][objective]
+        distances[order[0]] = distances[order[-1]] = float("inf")
+        if high == low:
+            continue
+        for previous, current, following in zip(
+            order, order[1:], order[2:], strict=False
+        ):
+            distances[current] += (
+                objectives[front[following]][objective]
+                - objectives[front[previous]][objective]
+            ) / (high - low)
+    return distances
+
+
+def pareto_select(objectives: Sequence[Objectives], amount: int) -> List[int]:
+    """
+    Indices of `amount` items chosen front by front, the last front
+    that does not fit whole being cut by descending crowding distance
+    """
+    selected: List[int] = []
+    for front in non_dominated_sort(objectives):
+        distances = crowding_distance(objectives, front)
+        ranked = sorted(range(len(front)), key=lambda i: distances[i], reverse=True)
+        selected.extend(front[i] for i in ranked[: amount - len(selected)])
+        if len(selected) >= amount:
+            break
+    return selected
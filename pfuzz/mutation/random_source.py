@@ -0,0 +1,19 @@
+from typing import List, Optional, Protocol, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+class Random_source(Protocol):
+    """Either the `random` module itself or a seeded random.Random instance"""
+
+    def random(self) -> float: ...
+
+    def randint(self, a: int, b: int) -> int: ...
+
+    def randrange(
+        self, start: int, stop: Optional[int] = None, step: int = 1
+    ) -> int: ...
+
+    def choice(self, seq: Sequence[T]) -> T: ...
+
+    def choices(self, population: Sequence[T], *, k: int = 1) -> List[T]: ...
@@ -0,0 +1,82 @@
+import random
+from itertools import pairwise
+from typing import Dict, List, Optional, Tuple
+
+LATIN_HYPERCUBE = "latin_hypercube"
+UNIFORM = "uniform"
+
+
+def latin_hypercube(
+    template_config: Dict[str, range], size: int, rng: Optional[random.Random] = None
+) -> List[Dict[str, str]]:
+    """
+    Latin hypercube sample of `size` chromosomes: the values of every gene
+    are cut into `size` equal strata and each stratum is used by exactly
+    one chromosome, the strata of different genes being paired at random
+
+    :rng: source of randomness, the global random module if None
+    """
+    choose = random if rng is None else rng
+    columns = {}
+    for gene, values in template_config.items():
+        bounds = [stratum * len(values) // size for stratum in range(size + 1)]
+        strata = [values[low : max(high, low + 1)] for low, high in pairwise(bounds)]
+        column = [str(choose.choice(stratum)) for stratum in strata]
+        choose.shuffle(column)
+        columns[gene] = column
+    return [
+        {gene: column[index] for gene, column in columns.items()}
+        for index in range(size)
+    ]
+
+
+def uniform(
+    template_config: Dict[str, range], size: int, rng: Optional[random.Random] = None
+) -> List[Dict[str, str]]:
+    """Sample of `size` chromosomes with independent uniform genes"""
+    choose = random if rng is None else rng
+    return [
+        {gene: str(choose.choice(values)) for gene, values in template_config.items()}
+        for _ in range(size)
+    ]
+
+
+STRATEGIES = {LATIN_HYPERCUBE: latin_hypercube, UNIFORM: uniform}
+
+
+def initial_population(
+    template_config: Dict[str, range],
+    size: int,
+    strategy: str = LATIN_HYPERCUBE,
+    seed: Optional[int] = None,
+) -> List[Tuple[Dict[str, str], float]]:
+    """
+    Unscored starting population for Mutation.genetic_func
+
+    :strategy: name of the sampling strategy, one of STRATEGIES
+    :seed: seed of the sampling, the global random module if None
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError("unknown initialization strategy {}".format(strategy))
+    rng = None if seed is None else random.Random(seed)
+    return [
+        (chromosome, 0.0)
+        for chromosome in STRATEGIES[strategy](template_config, size, rng)
+    ]
+
+
+def diversity(
+    chromosomes: List[Dict[str, str]], template_config: Dict[str, range]
+) -> float:
+    """
+    Mean over the genes of the share of the possible distinct values that
+    the chromosomes use, 0 for identical chromosomes and 1 for the most
+    diverse ones. A gene left out of a chromosome counts as its own value
+    """
+    shares = []
+    for gene, values in template_config.items():
+        possible = min(len(chromosomes), len(values) + 1)
+        if possible > 1:
+            used = len({chromosome.get(gene) for chromosome in chromosomes})
+            shares.append((used - 1) / (possible - 1))
+    return sum(shares) / len(shares) if shares else 0.0
@@ -0,0 +1,109 @@
+import heapq
+from array import array
+from typing import Any, Dict, List, Sequence
+
+ABSENT = -1.0
+
+
+class Nearest_neighbour_surrogate:
+    """
+    Cheap fitness model of Csmith configurations: the prediction for
+    a chromosome is the inverse-distance-weighted mean fitness of the `k`
+    nearest already simulated ones. Flags are scaled to [0, 1] by their
+    position in the template config range, absent flags are ABSENT.
+    The model is trained incrementally and keeps the last `max_points`
+    observations
+    """
+
+    def __init__(
+        self,
+        template_config: Dict[str, range],
+        k: int = 5,
+        max_points: int = 4096,
+    ) -> None:
+        self.flags = list(template_config.keys())
+        self.ranges = [template_config[flag] for flag in self.flags]
+        self.width = len(self.flags)
+        self.k = k
+        self.max_points = max_points
+        self.points = array("d")
+        self.fitness = array("d")
+        self.screened_out = 0
+
+    def __len__(self) -> int:
+        return len(self.fitness)
+
+    def encode(self, chromosome: Dict[str, str]) -> List[float]:
+        point = []
+        for flag, values in zip(self.flags, self.ranges, strict=True):
+            if flag not in chromosome:
+                point.append(ABSENT)
+                continue
+            position = values.index(int(chromosome[flag]))
+            point.append(position / max(len(values) - 1, 1))
+        return point
+
+    def update(
+        self, chromosomes: Sequence[Dict[str, str]], fitness: Sequence[float]
+    ) -> None:
+        """Add simulated chromosomes and their fitness to the model"""
+        for chromosome, value in zip(chromosomes, fitness, strict=True):
+            self.points.extend(self.encode(chromosome))
+            self.fitness.append(value)
+        excess = len(self) - self.max_points
+        if excess > 0:
+            del self.points[: excess * self.width]
+            del self.fitness[:excess]
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "points": self.points.tolist(),
+            "fitness": self.fitness.tolist(),
+            "screened_out": self.screened_out,
+        }
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        """Continue from a state returned by `state`"""
+        self.points = array("d", state["points"])
+        self.fitness = array("d", state["fitness"])
+        self.screened_out = state["screened_out"]
+
+    def predict(self, chromosome: Dict[str, str]) -> float:
+        point = self.encode(chromosome)
+        points = self.points
+        width = self.width
+        distances = (
+            sum(
+                (x - y) ** 2
+                for x, y in zip(
+                    point, points[row * width : (row + 1) * width], strict=True
+                )
+            )
+            for row in range(len(self))
+        )
+        nearest = heapq.nsmallest(self.k, zip(distances, self.fitness, strict=True))
+        for distance, value in nearest:
+            if distance == 0.0:
+                return value
+        weights = [1.0 / distance for distance, _ in nearest]
+        return sum(
+            weight * value for weight, (_, value) in zip(weights, nearest, strict=True)
+        ) / sum(weights)
+
+    def screen(
+        self, chromosomes: Sequence[Dict[str, str]], fraction: float
+    ) -> List[int]:
+        """
+        Indices of the most promising `fraction` of the chromosomes in their
+        original order. Until the model has `k` observations every chromosome
+        passes
+        """
+        if len(self) < self.k:
+            return list(range(len(chromosomes)))
+        keep = max(1, round(len(chromosomes) * fraction))
+        predictions = [self.predict(chromosome) for chromosome in chromosomes]
+        chosen = heapq.nlargest(
+            keep, range(len(chromosomes)), key=predictions.__getitem__
+        )
+        self.screened_out += len(chromosomes) - len(chosen)
+        return sorted(chosen)
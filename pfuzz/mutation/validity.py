@@ -0,0 +1,210 @@
+import os
+import re
+import subprocess
+import tempfile
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from pfuzz.mutation.assembly import LABEL_PATTERN
+
+REGISTERS = frozenset(
+    ["x{}".format(number) for number in range(32)]
+    + ["zero", "ra", "sp", "gp", "tp", "fp"]
+    + ["t{}".format(number) for number in range(7)]
+    + ["s{}".format(number) for number in range(12)]
+    + ["a{}".format(number) for number in range(8)]
+)
+IMMEDIATE_PATTERN = re.compile(r"^(-?(0x[0-9a-fA-F]+|\d+)|%\w+\([\w.$+-]+\))$")
+SYMBOL_PATTERN = re.compile(r"^([A-Za-z_.$][\w.$]*|\d+[bf])$")
+MEMORY_PATTERN = re.compile(r"^(?P<offset>%\w+\([\w.$+-]+\)|[^()]*)\((?P<base>\w+)\)$")
+ERROR_LINE_PATTERN = re.compile(r":(\d+): Error:")
+
+R_TYPE = ("reg", "reg", "reg")
+I_TYPE = ("reg", "reg", "imm12")
+SHIFT = ("reg", "reg", "shamt")
+B_TYPE = ("reg", "reg", "label")
+MEMORY = ("reg", "mem")
+U_TYPE = ("reg", "imm20")
+
+OPERAND_FORMATS: Dict[str, Tuple[Tuple[str, ...], ...]] = {
+    **{
+        opcode: (R_TYPE,)
+        for opcode in (
+            "add sub and or xor sll srl sra slt sltu mul mulh div divu rem remu "
+            "addw subw sllw srlw sraw mulw divw remw"
+        ).split()
+    },
+    **{opcode: (I_TYPE,) for opcode in "addi andi ori xori slti sltiu addiw".split()},
+    **{opcode: (SHIFT,) for opcode in "slli srli srai slliw srliw sraiw".split()},
+    **{opcode: (B_TYPE,) for opcode in "beq bne blt bge bltu bgeu".split()},
+    **{opcode: (MEMORY,) for opcode in "lb lh lw ld lbu lhu lwu sb sh sw sd".split()},
+    **{opcode: (U_TYPE,) for opcode in ("lui", "auipc")},
+    "jal": (("reg", "label"), ("label",)),
+    "j": (("label",),),
+}
+
+
+def _immediate(operand: str, low: int, high: int) -> bool:
+    if not IMMEDIATE_PATTERN.match(operand):
+        return False
+    if operand.startswith("%"):
+        return True
+    return low <= int(operand, 0) <= high
+
+
+def operand_matches(kind: str, operand: str) -> bool:
+    if kind == "reg":
+        return operand in REGISTERS
+    if kind == "imm12":
+        return _immediate(operand, -2048, 2047)
+    if kind == "shamt":
+        return _immediate(operand, 0, 63)
+    if kind == "imm20":
+        return _immediate(operand, 0, (1 << 20) - 1)
+    if kind == "label":
+        return operand not in REGISTERS and SYMBOL_PATTERN.match(operand) is not None
+    if kind == "mem":
+        match = MEMORY_PATTERN.match(operand)
+        return (
+            match is not None
+            and match.group("base") in REGISTERS
+            and (
+                not match.group("offset")
+                or _immediate(match.group("offset"), -2048, 2047)
+            )
+        )
+    raise ValueError("unknown operand kind {}".format(kind))
+
+
+class Assembly_validator:
+    """
+    Validity filter for mutated RISC-V programs. Every instruction whose
+    opcode has known operand formats is checked in-process for its number
+    of operands and their kinds (register, immediate in range, label,
+    memory reference); other lines are left to the assembler. Programs
+    passing the check can be assembled in chunks with a single assembler
+    run per chunk: labels of each program are prefixed to keep them apart
+    and errors are mapped back to programs by line number.
+    Rejections are counted by reason in `rejected`
+
+    :assembler: assembler command, the in-process check only if None
+    """
+
+    def __init__(
+        self,
+        assembler: Optional[str] = None,
+        flags: Optional[List[str]] = None,
+        chunk_size: int = 256,
+    ) -> None:
+        self.assembler = assembler
+        self.flags = [] if flags is None else flags
+        self.chunk_size = chunk_size
+        self.checked = 0
+        self.rejected: Counter[str] = Counter()
+
+    def check_line(self, line: str) -> Optional[str]:
+        """Reason why an instruction line is invalid, None if it looks valid"""
+        code = line.split("#", 1)[0].strip()
+        if not code or code.startswith(".") or LABEL_PATTERN.match(code):
+            return None
+        opcode, *rest = code.split(None, 1)
+        operands_text = rest[0] if rest else ""
+        formats = OPERAND_FORMATS.get(opcode)
+        if formats is None:
+            return None
+        operands = [
+            operand.strip() for operand in operands_text.split(",") if operand.strip()
+        ]
+        arity = [kinds for kinds in formats if len(kinds) == len(operands)]
+        if not arity:
+            return "arity"
+        for kinds in arity:
+            if all(map(operand_matches, kinds, operands)):
+                return None
+        return "operand kind"
+
+    def check(self, text: str) -> Optional[str]:
+        """Reason why a program is invalid, None if every line looks valid"""
+        for line in text.splitlines():
+            reason = self.check_line(line)
+            if reason is not None:
+                return reason
+        return None
+
+    def _merge(self, texts: Sequence[str]) -> Tuple[str, List[int]]:
+        """
+        One source holding all the programs with their labels prefixed,
+        and the first line of every program in it
+        """
+        lines: List[str] = []
+        starts = []
+        for number, text in enumerate(texts):
+            starts.append(len(lines) + 1)
+            labels = {
+                match.group(1)
+                for match in re.finditer(r"^\s*([A-Za-z_.$][\w.$]*):", text, re.M)
+            }
+            if labels:
+                pattern = re.compile(
+                    r"(?<![\w.$])({})(?![\w.$])".format(
+                        "|".join(map(re.escape, sorted(labels, key=len, reverse=True)))
+                    )
+                )
+                text = pattern.sub(r"p{}_\1".format(number), text)
+            lines.extend(text.splitlines())
+        return "\n".join(lines) + "\n", starts
+
+    def assemble(self, texts: Sequence[str]) -> List[bool]:
+        """Whether every program assembles, with one assembler run"""
+        assert self.assembler is not None
+        source, starts = self._merge(texts)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "chunk.s")
+            with open(path, "w") as chunk:
+                chunk.write(source)
+            process = subprocess.run(
+                [self.assembler, *self.flags, "-o", os.devnull, path],
+                capture_output=True,
+                text=True,
+            )
+        valid = [True] * len(texts)
+        if process.returncode == 0:
+            return valid
+        errors = [int(line) for line in ERROR_LINE_PATTERN.findall(process.stderr)]
+        if not errors:
+            return [False] * len(texts)
+        for line in errors:
+            program = max(
+                number for number, start in enumerate(starts) if start <= line
+            )
+            valid[program] = False
+        return valid
+
+    def validate(self, texts: Sequence[str]) -> List[bool]:
+        """Whether every program is valid, counting the rejections"""
+        self.checked += len(texts)
+        valid = []
+        for text in texts:
+            reason = self.check(text)
+            if reason is not None:
+                self.rejected[reason] += 1
+            valid.append(reason is None)
+
+        if self.assembler is not None:
+            survivors = [index for index, ok in enumerate(valid) if ok]
+            for start in range(0, len(survivors), self.chunk_size):
+                chunk = survivors[start : start + self.chunk_size]
+                for index, ok in zip(
+                    chunk, self.assemble([texts[i] for i in chunk]), strict=True
+                ):
+                    if not ok:
+                        self.rejected["assembler"] += 1
+                        valid[index] = False
+        return valid
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "checked": self.checked,
+            "accepted": self.checked - sum(self.rejected.values()),
+            **self.rejected,
+        }
@@ -0,0 +1,33 @@
+import threading
+from pathlib import Path
+from typing import Optional
+
+_local = threading.local()
+
+
+def worker_dir() -> Optional[Path]:
+    """
+    Output directory assigned to the current evaluation worker,
+    or None when the code does not run inside an evaluation engine
+    """
+    directory: Optional[Path] = getattr(_local, "directory", None)
+    return directory
+
+
+def set_worker_dir(directory: Optional[Path]) -> None:
+    """Bind an output directory to the current thread"""
+    _local.directory = directory
+
+
+def worker_name() -> Optional[str]:
+    """
+    Name of the current evaluation pool worker, unique within its engine,
+    or None when the code does not run in a pool worker
+    """
+    name: Optional[str] = getattr(_local, "name", None)
+    return name
+
+
+def set_worker_name(name: Optional[str]) -> None:
+    """Bind a worker name to the current thread"""
+    _local.name = name
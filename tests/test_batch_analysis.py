@@ -0,0 +1,100 @@
+import csv
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from benchmarks.synthetic import write_trace
+from pfuzz.gem5_statistics.batch_analysis import (
+    Batch_analysis,
+    analyze_trace,
+    find_traces,
+    rank,
+    write_csv,
+    write_json,
+)
+from pfuzz.gem5_statistics.tick_statistics import Tick_statistics
+from pfuzz.gem5_statistics.window_analysis import Window_analysis
+
+
+class TestBatchAnalysis(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp_dir.name)
+        for number, instructions in enumerate((50, 400, 100, 200)):
+            write_trace(
+                self.directory / "run-{}.txt".format(number), instructions, number
+            )
+        (self.directory / "broken.txt.gz").write_bytes(b"\x1f\x8b broken")
+        self.traces = find_traces([str(self.directory)])
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_find_traces(self) -> None:
+        (self.directory / "run-0.txt.ticks").touch()
+
+        self.assertEqual(len(find_traces([str(self.directory)])), 5)
+        self.assertEqual(len(find_traces([str(self.directory / "run-*.txt")])), 4)
+
+    def test_windows_are_computed_once(self) -> None:
+        with patch.object(
+            Window_analysis,
+            "longest_run_without",
+            autospec=True,
+            side_effect=Window_analysis.longest_run_without,
+        ) as stall, patch.object(
+            Window_analysis,
+            "worst_ratio_window",
+            autospec=True,
+            side_effect=Window_analysis.worst_ratio_window,
+        ) as ratio:
+            report = analyze_trace(self.traces[-1], 10)
+
+        self.assertEqual(stall.call_count, 1)
+        self.assertEqual(ratio.call_count, 1)
+        self.assertIsNotNone(report["ratio_start_tick"])
+
+    def test_undecodable_zstd_trace(self) -> None:
+        path = self.directory / "broken.txt.zst"
+        path.write_bytes(b"\x28\xb5\x2f\xfd broken")
+
+        report = analyze_trace(str(path))
+
+        self.assertIn("error", report)
+        self.assertNotIn("ticks", report)
+
+    def test_chunks_largest_first(self) -> None:
+        chunks = Batch_analysis(chunk_bytes=20_000).chunks(self.traces)
+
+        paths = [path for chunk in chunks for path in chunk]
+        self.assertEqual(Path(paths[0]).name, "run-1.txt")
+        self.assertEqual(sorted(paths), self.traces)
+        self.assertGreater(len(chunks), 1)
+
+    def test_run_and_rank(self) -> None:
+        reports = Batch_analysis(max_workers=2, chunk_bytes=20_000).run(self.traces)
+        ranked = rank(reports, "stall_ticks")
+
+        self.assertEqual(len(ranked), 5)
+        self.assertEqual([report["rank"] for report in ranked], [1, 2, 3, 4, 5])
+        self.assertIn("error", ranked[-1])
+        stalls = [report["stall_ticks"] for report in ranked[:-1]]
+        self.assertEqual(stalls, sorted(stalls, reverse=True))
+
+        statistics = Tick_statistics()
+        best = ranked[0]
+        table = statistics.get_tick_statistics_list(best["path"])
+        self.assertEqual(
+            statistics.get_pipeline_objectives(table)[0], best["stall_ticks"]
+        )
+
+        write_json(ranked[:2], self.directory / "report.json")
+        write_csv(ranked, self.directory / "report.csv")
+        with open(self.directory / "report.json") as report_file:
+            self.assertEqual(json.load(report_file), ranked[:2])
+        with open(self.directory / "report.csv", newline="") as report_file:
+            rows = list(csv.DictReader(report_file))
+        self.assertEqual(rows[0]["path"], best["path"])
+        self.assertEqual(len(rows), 5)
@@ -0,0 +1,39 @@
+import unittest
+
+from benchmarks.suite import Result, compare, run_suite
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_run_suite(self) -> None:
+        results = run_suite(scale=0.001, repeat=1)
+
+        self.assertEqual(
+            set(results),
+            {
+                "get_tick_statistics_list",
+                "worst_ratio_window",
+                "longest_run_without_retired",
+                "assembly_mutate",
+                "assembly_crossover",
+                "genetic_func",
+            },
+        )
+        for result in results.values():
+            self.assertGreater(result["items"], 0)
+            self.assertGreater(result["peak_bytes"], 0)
+
+    def test_compare(self) -> None:
+        baseline: dict[str, Result] = {
+            "fast": {"items": 1, "seconds": 1, "per_second": 100, "peak_bytes": 10},
+            "lean": {"items": 1, "seconds": 1, "per_second": 100, "peak_bytes": 10},
+        }
+        results: dict[str, Result] = {
+            "fast": {"items": 1, "seconds": 1, "per_second": 70, "peak_bytes": 10},
+            "lean": {"items": 1, "seconds": 1, "per_second": 90, "peak_bytes": 20},
+            "new": {"items": 1, "seconds": 1, "per_second": 1, "peak_bytes": 1},
+        }
+
+        self.assertEqual(
+            compare(results, baseline, tolerance=0.25),
+            ["fast: throughput", "lean: peak memory"],
+        )
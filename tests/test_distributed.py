@@ -0,0 +1,107 @@
+import multiprocessing
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Optional
+
+from pfuzz.mutation.distributed import (
+    Coordinator_engine,
+    chromosome_key,
+    is_loopback,
+    run_worker,
+)
+from pfuzz.worker import worker_dir
+
+
+def score_gene(chromosome: dict[str, str]) -> float:
+    directory: Optional[Path] = worker_dir()
+    if directory is not None and "quiet" not in chromosome:
+        (directory / "program.c").write_text(chromosome["gene1"])
+    marker = chromosome.get("crash_once")
+    if marker is not None and not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return float(chromosome["gene1"])
+
+
+class TestCoordinatorEngine(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.directory.name)
+        self.engine = Coordinator_engine(
+            heartbeat_timeout=5.0, artifact_dir=self.root / "artifacts"
+        )
+        self.workers = [
+            multiprocessing.Process(
+                target=run_worker,
+                args=(self.engine.address, score_gene, self.engine.authkey),
+                kwargs={
+                    "work_dir": self.root / "worker-{}".format(index),
+                    "artifacts": ["*.c"],
+                    "heartbeat_interval": 0.5,
+                },
+            )
+            for index in range(2)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def tearDown(self) -> None:
+        self.engine.close()
+        for worker in self.workers:
+            worker.join(timeout=10)
+            if worker.is_alive():
+                worker.kill()
+        self.directory.cleanup()
+
+    def test_evaluate(self) -> None:
+        chromosomes = [{"gene1": str(value)} for value in range(10)]
+        results = self.engine.evaluate(score_gene, chromosomes)
+
+        self.assertEqual(results, [float(value) for value in range(10)])
+        artifact = self.root / "artifacts" / chromosome_key(chromosomes[3])
+        self.assertEqual((artifact / "program.c").read_text(), "3")
+
+    def test_stale_artifacts_are_not_sent(self) -> None:
+        self.engine.evaluate(score_gene, [{"gene1": str(value)} for value in range(4)])
+        quiet = [{"gene1": str(value), "quiet": "1"} for value in range(4)]
+        self.engine.evaluate(score_gene, quiet)
+
+        for chromosome in quiet:
+            artifact = self.root / "artifacts" / chromosome_key(chromosome)
+            self.assertFalse(artifact.exists())
+
+    def test_lost_worker_job_is_requeued(self) -> None:
+        marker = str(self.root / "crashed")
+        chromosomes = [
+            {"gene1": "1"},
+            {"gene1": "2", "crash_once": marker},
+            {"gene1": "3"},
+        ]
+        results = self.engine.evaluate(score_gene, chromosomes)
+
+        self.assertEqual(results, [1.0, 2.0, 3.0])
+        self.assertEqual(self.engine.requeued, 1)
+
+
+class TestAuthkey(unittest.TestCase):
+    def test_random_authkey(self) -> None:
+        first, second = Coordinator_engine(), Coordinator_engine()
+        try:
+            self.assertEqual(len(first.authkey), 32)
+            self.assertNotEqual(first.authkey, second.authkey)
+        finally:
+            first.close()
+            second.close()
+
+    def test_remote_address_requires_authkey(self) -> None:
+        with self.assertRaises(ValueError):
+            Coordinator_engine(("0.0.0.0", 0))
+
+    def test_is_loopback(self) -> None:
+        self.assertTrue(is_loopback("localhost"))
+        self.assertTrue(is_loopback("127.0.0.2"))
+        self.assertTrue(is_loopback("::1"))
+        self.assertFalse(is_loopback("0.0.0.0"))
+        self.assertFalse(is_loopback("node7"))
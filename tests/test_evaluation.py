@@ -0,0 +1,167 @@
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from typing import Optional
+
+from pfuzz.mutation.cache import Fitness_cache
+from pfuzz.mutation.evaluation import (
+    Process_pool_engine,
+    Serial_engine,
+    Thread_pool_engine,
+)
+from pfuzz.worker import worker_dir
+
+
+def score_gene(chromosome: dict[str, str]) -> float:
+    if chromosome["gene1"] == "crash":
+        os._exit(1)
+    if chromosome["gene1"] == "sleep":
+        time.sleep(0.5)
+        return 10.0
+    if chromosome["gene1"] == "fail":
+        raise RuntimeError("simulation crashed")
+    if chromosome["gene1"] == "slow":
+        time.sleep(5)
+    return float(chromosome["gene1"])
+
+
+def score_worker_dir(chromosome: dict[str, str]) -> float:
+    directory: Optional[Path] = worker_dir()
+    assert directory is not None
+    (directory / chromosome["gene1"]).touch()
+    return 1.0
+
+
+class TestEvaluationEngines(unittest.TestCase):
+    def setUp(self) -> None:
+        self.chromosomes = [{"gene1": str(value)} for value in range(8)]
+        self.expected = [float(value) for value in range(8)]
+
+    def test_engines_preserve_order(self) -> None:
+        for engine in (
+            Serial_engine(),
+            Thread_pool_engine(max_workers=3),
+            Process_pool_engine(max_workers=2),
+        ):
+            with engine:
+                self.assertEqual(
+                    engine.evaluate(score_gene, self.chromosomes), self.expected
+                )
+                self.assertEqual(engine.evaluated, len(self.chromosomes))
+
+    def test_failure_isolation(self) -> None:
+        with Thread_pool_engine(max_workers=2, failure_fitness=-1.0) as engine:
+            results = engine.evaluate(
+                score_gene, [{"gene1": "1"}, {"gene1": "fail"}, {"gene1": "2"}]
+            )
+        self.assertEqual(results, [1.0, -1.0, 2.0])
+        self.assertEqual(engine.failed, 1)
+
+    def test_serial_failures_propagate(self) -> None:
+        with Serial_engine() as engine:
+            with self.assertRaises(RuntimeError):
+                engine.evaluate(score_gene, [{"gene1": "1"}, {"gene1": "fail"}])
+        with Serial_engine(failure_fitness=-1.0, isolate_failures=True) as engine:
+            results = engine.evaluate(score_gene, [{"gene1": "fail"}])
+        self.assertEqual(results, [-1.0])
+
+    def test_worker_crash_is_isolated(self) -> None:
+        chromosomes = [
+            {"gene1": "sleep"},
+            {"gene1": "1"},
+            {"gene1": "crash"},
+            {"gene1": "sleep"},
+            {"gene1": "2"},
+            {"gene1": "3"},
+        ]
+        with Process_pool_engine(max_workers=4, failure_fitness=-1.0) as engine:
+            results = engine.evaluate(score_gene, chromosomes)
+            self.assertEqual(engine.evaluate(score_gene, [{"gene1": "4"}]), [4.0])
+
+        self.assertEqual(results, [10.0, 1.0, -1.0, 10.0, 2.0, 3.0])
+        self.assertEqual(engine.failed, 1)
+        self.assertEqual(engine.evaluated, 7)
+
+    def test_timeout(self) -> None:
+        with Process_pool_engine(max_workers=2, timeout=0.2) as engine:
+            start = time.monotonic()
+            results = engine.evaluate(score_gene, [{"gene1": "slow"}, {"gene1": "3"}])
+        self.assertLess(time.monotonic() - start, 4)
+        self.assertEqual(results, [0.0, 3.0])
+        self.assertEqual(engine.timed_out, 1)
+
+    def test_worker_dirs(self) -> None:
+        with tempfile.TemporaryDirectory() as work_dir:
+            with Thread_pool_engine(max_workers=2, work_dir=Path(work_dir)) as engine:
+                engine.evaluate(score_worker_dir, self.chromosomes)
+            workers = sorted(path.name for path in Path(work_dir).iterdir())
+            self.assertTrue(set(workers) <= {"worker-0", "worker-1"})
+            produced = [path.name for path in Path(work_dir).glob("worker-*/*")]
+            self.assertEqual(
+                sorted(produced), sorted(c["gene1"] for c in self.chromosomes)
+            )
+        self.assertIsNone(worker_dir())
+
+
+class TestFitnessCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.calls: list[dict[str, str]] = []
+
+    def score(self, chromosome: dict[str, str]) -> float:
+        self.calls.append(chromosome)
+        return score_gene(chromosome)
+
+    def test_memory_tier(self) -> None:
+        cache = Fitness_cache(max_entries=2)
+        chromosomes = [{"gene1": "1"}, {"gene1": "2"}, {"gene1": "1"}]
+        results = cache.evaluate(Serial_engine(), self.score, chromosomes)
+        self.assertEqual(results, [1.0, 2.0, 1.0])
+        self.assertEqual(len(self.calls), 2)
+
+        cache.evaluate(Serial_engine(), self.score, [{"gene1": "2"}])
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(cache.misses, 2)
+
+        cache.evaluate(Serial_engine(), self.score, [{"gene1": "3"}])
+        cache.evaluate(Serial_engine(), self.score, [{"gene1": "1"}])
+        self.assertEqual(len(self.calls), 4)
+
+    def test_failures_are_not_cached(self) -> None:
+        cache = Fitness_cache()
+        engine = Serial_engine(isolate_failures=True)
+        cache.evaluate(engine, self.score, [{"gene1": "fail"}])
+        cache.evaluate(engine, self.score, [{"gene1": "fail"}])
+        self.assertEqual(len(self.calls), 2)
+
+    def test_version_and_key_order(self) -> None:
+        cache = Fitness_cache(version="gem5-23")
+        self.assertEqual(
+            cache.key({"a": "1", "b": "2"}), cache.key({"b": "2", "a": "1"})
+        )
+        self.assertNotEqual(
+            cache.key({"a": "1"}), Fitness_cache(version="gem5-24").key({"a": "1"})
+        )
+
+    def test_target(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "fitness.sqlite"
+            with Fitness_cache(path=path) as cache:
+                cache.put({"gene1": "5"}, 0.5, target=3.0)
+            with Fitness_cache(path=path) as cache:
+                self.assertEqual(cache.get({"gene1": "5"}, target=3.0), 0.5)
+                self.assertIsNone(cache.get({"gene1": "5"}, target=4.0))
+                self.assertIsNone(cache.get({"gene1": "5"}))
+
+    def test_sqlite_tier(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "fitness.sqlite"
+            with Fitness_cache(path=path) as cache:
+                cache.evaluate(Serial_engine(), self.score, [{"gene1": "5"}])
+            with Fitness_cache(path=path) as cache:
+                results = cache.evaluate(Serial_engine(), self.score, [{"gene1": "5"}])
+                self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(results, [5.0])
+        self.assertEqual(len(self.calls), 1)
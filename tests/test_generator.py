@@ -0,0 +1,151 @@
+import os
+import sqlite3
+import stat
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from pfuzz.generator.artifact_cache import Artifact_cache
+from pfuzz.generator.generator import Generator
+from pfuzz.mutation.evaluation import Thread_pool_engine
+
+FAKE_CSMITH = """#!/bin/sh
+echo "$@" >> "$(dirname "$0")/calls"
+if [ "$2" = "fail" ]; then
+    exit 1
+fi
+echo "/* $@ */"
+echo "int main(void) { return 0; }"
+"""
+
+FAKE_COMPILER = """#!/bin/sh
+cp "$1" "$3"
+"""
+
+
+def write_script(path: Path, content: str) -> str:
+    path.write_text(content)
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
+
+
+class TestGenerator(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        root = Path(self.directory.name)
+        self.out_dir = root / "out"
+        self.calls = root / "calls"
+        self.generator = Generator(
+            {"--max-funcs": range(1, 5)},
+            csmith=write_script(root / "csmith", FAKE_CSMITH),
+            compiler=write_script(root / "gcc", FAKE_COMPILER),
+            compile_flags=[],
+        )
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_generate(self) -> None:
+        cwd = os.getcwd()
+        self.generator.generate({"--seed": "1"}, "a.c", "a.out", self.out_dir)
+        self.assertEqual(os.getcwd(), cwd)
+        self.assertIn("--seed 1", (self.out_dir / "a.c").read_text())
+        self.assertTrue((self.out_dir / "a.out").exists())
+
+    def test_pool_workers_get_own_output_dirs(self) -> None:
+        default = Path(self.directory.name) / "generated"
+
+        def output_dir(chromosome: dict[str, str]) -> float:
+            (self.generator.output_dir() / chromosome["gene1"]).touch()
+            return 1.0
+
+        chromosomes = [{"gene1": str(value)} for value in range(8)]
+        with mock.patch("pfuzz.constants.OUT_DIR", str(default)):
+            with Thread_pool_engine(max_workers=2) as engine:
+                engine.evaluate(output_dir, chromosomes)
+        workers = {path.name for path in default.iterdir()}
+        self.assertTrue(workers <= {"worker-0", "worker-1"})
+        self.assertEqual(len(list(default.glob("worker-*/*"))), len(chromosomes))
+
+    def test_generate_batch(self) -> None:
+        configs = [{"--seed": str(seed)} for seed in range(10)]
+        configs.append({"--seed": "fail"})
+        results = self.generator.generate_batch(configs, self.out_dir, max_jobs=3)
+
+        self.assertEqual(len(results), len(configs))
+        for seed, result in enumerate(results[:-1]):
+            self.assertTrue(result.ok)
+            self.assertEqual(result.c_path, self.out_dir / "program-{}.c".format(seed))
+            self.assertIn("--seed {}".format(seed), result.binary_path.read_text())
+        self.assertFalse(results[-1].ok)
+        self.assertEqual(results[-1].generate_returncode, 1)
+        self.assertIsNone(results[-1].compile_returncode)
+
+    def csmith_calls(self) -> int:
+        if not self.calls.exists():
+            return 0
+        return len(self.calls.read_text().splitlines())
+
+    def test_artifact_cache(self) -> None:
+        cache = Artifact_cache(Path(self.directory.name) / "cache")
+        self.generator.artifact_cache = cache
+
+        configs = [{"--seed": "1"}, {"--seed": "2"}, {"--max-funcs": "3"}]
+        first = self.generator.generate_batch(configs, self.out_dir, prefix="a")
+        second = self.generator.generate_batch(configs, self.out_dir, prefix="b")
+        self.generator.generate({"--seed": "1"}, "c.c", "c.out", self.out_dir)
+
+        # one version probe, three builds, then only the unseeded config again
+        self.assertEqual(self.csmith_calls(), 1 + 3 + 1)
+        self.assertEqual([result.cached for result in second], [True, True, False])
+        self.assertEqual(
+            first[0].binary_path.read_text(), (self.out_dir / "c.out").read_text()
+        )
+        self.assertEqual(cache.hits, 3)
+        cache.close()
+
+    def test_artifact_cache_keeps_binaries_executable(self) -> None:
+        root = Path(self.directory.name)
+        source = root / "a.c"
+        source.write_text("int main(void) { return 0; }")
+        binary = Path(write_script(root / "a.out", "#!/bin/sh\n"))
+        cache = Artifact_cache(root / "cache")
+        cache.put("key", source, binary)
+        self.assertTrue(cache.get("key", root / "b.c", root / "b.out"))
+        cache.close()
+        self.assertTrue(os.access(root / "b.out", os.X_OK))
+
+    def test_artifact_cache_eviction(self) -> None:
+        cache = Artifact_cache(Path(self.directory.name) / "cache", max_bytes=200)
+        self.generator.artifact_cache = cache
+
+        configs = [{"--seed": str(seed)} for seed in range(5)]
+        self.generator.generate_batch(configs, self.out_dir, max_jobs=1)
+        self.assertLessEqual(cache.size(), 200)
+        stored = sum(
+            path.stat().st_size for path in cache.directory.glob("objects/*/*")
+        )
+        self.assertEqual(cache.size(), stored)
+
+        calls = self.csmith_calls()
+        self.generator.generate_batch(configs[-1:], self.out_dir)
+        self.assertEqual(self.csmith_calls(), calls)
+        self.generator.generate_batch(configs[:1], self.out_dir)
+        self.assertEqual(self.csmith_calls(), calls + 1)
+        cache.close()
+
+    def test_artifact_cache_indexes_sizes_of_old_stores(self) -> None:
+        cache = Artifact_cache(Path(self.directory.name) / "cache")
+        self.generator.artifact_cache = cache
+        self.generator.generate_batch([{"--seed": "1"}], self.out_dir)
+        size = cache.size()
+        with sqlite3.connect(cache.directory / "index.sqlite") as db:
+            db.execute("DROP TABLE objects")
+            db.execute("DROP TABLE totals")
+        cache.close()
+
+        reopened = Artifact_cache(cache.directory)
+        self.assertGreater(size, 0)
+        self.assertEqual(reopened.size(), size)
+        reopened.close()
@@ -0,0 +1,80 @@
+import random
+import unittest
+from unittest.mock import Mock
+
+from pfuzz.mutation.genome import Genome_population
+from pfuzz.mutation.mutation import Mutation
+
+
+class TestGenomePopulation(unittest.TestCase):
+    def setUp(self) -> None:
+        self.template_config = {
+            "gene1": range(1, 5),
+            "gene2": range(10, 20, 2),
+            "gene3": range(0, 3),
+        }
+        self.rng = random.Random(1)
+
+    def test_encode_decode(self) -> None:
+        population = Genome_population(self.template_config)
+        population.encode({"gene1": "3", "gene2": "14"}, 0.5)
+        self.assertEqual(list(population.row(0)), [2, 2, -1])
+        self.assertEqual(population.decode(0), {"gene1": "3", "gene2": "14"})
+        self.assertEqual(population.fitness[0], 0.5)
+
+    def test_random_population(self) -> None:
+        population = Genome_population.random_population(
+            self.template_config, 100, self.rng
+        )
+        self.assertEqual(len(population), 100)
+        for chromosome in population.decode_rows(range(len(population))):
+            for flag, value in chromosome.items():
+                self.assertIn(int(value), self.template_config[flag])
+
+    def test_operators(self) -> None:
+        population = Genome_population.random_population(
+            self.template_config, 10, self.rng
+        )
+        children = population.crossover([0, 1], [2, 3], self.rng)
+        self.assertEqual(len(children), 4)
+        for child, parent in zip(range(4), [0, 2, 1, 3], strict=True):
+            differences = sum(
+                1
+                for a, b in zip(
+                    children.row(child), population.row(parent), strict=True
+                )
+                if a != b
+            )
+            self.assertLessEqual(differences, 1)
+
+        mutants = population.mutate([4, 5, 6], self.rng)
+        self.assertEqual(len(mutants), 3)
+
+    def test_select(self) -> None:
+        population = Genome_population(self.template_config)
+        for fitness in [0.1, 0.5, 0.2, 0.7]:
+            population.encode({}, fitness)
+        self.assertEqual(population.select(2), [3, 1])
+        self.assertEqual(list(population.take([3, 1]).fitness), [0.7, 0.5])
+
+
+class TestGeneticFuncGenome(unittest.TestCase):
+    def test_reaches_desired_output(self) -> None:
+        template_config = {"gene1": range(1, 5), "gene2": range(1, 5)}
+        population = Genome_population.random_population(template_config, 4)
+        func_generate = Mock()
+        func_run = Mock(return_value=10)
+
+        result = Mutation().genetic_func_genome(
+            population,
+            iterations=10,
+            alive=2,
+            reproduce=2,
+            func_generate=func_generate,
+            func_run=func_run,
+            desired_output=10,
+        )
+
+        self.assertEqual(result.fitness[0], 1.0)
+        self.assertEqual(len(result), 2)
+        self.assertIsInstance(func_generate.call_args[0][0], dict)
@@ -0,0 +1,101 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import Mock
+
+from pfuzz.metrics import COMPILE, SCORE, SIMULATE, Metrics, metrics
+from pfuzz.mutation.evaluation import Process_pool_engine
+from pfuzz.mutation.mutation import Mutation
+
+
+def score_in_stages(chromosome: dict[str, str]) -> float:
+    with metrics.stage(COMPILE):
+        metrics.count("build_cached")
+    with metrics.stage(SIMULATE):
+        return float(chromosome["gene1"])
+
+
+class TestMetrics(unittest.TestCase):
+    def tearDown(self) -> None:
+        metrics.enabled = False
+        metrics.path = None
+        metrics.reset()
+
+    def test_disabled_records_nothing(self) -> None:
+        disabled = Metrics()
+        with disabled.stage("parse"):
+            pass
+        disabled.count("ok")
+        disabled.generation(1, 10)
+
+        self.assertEqual(disabled.stages, {})
+        self.assertEqual(disabled.counters, {})
+        self.assertEqual(disabled.generations, [])
+
+    def test_stage_timer(self) -> None:
+        enabled = Metrics(enabled=True)
+        for _ in range(3):
+            with enabled.stage("parse"):
+                pass
+        enabled.record("parse", 2.0)
+
+        timer = enabled.stages["parse"]
+        self.assertEqual(timer.calls, 4)
+        self.assertEqual(timer.max_seconds, 2.0)
+        self.assertGreaterEqual(timer.seconds, 2.0)
+
+    def test_capture_and_merge(self) -> None:
+        merged = Metrics(enabled=True)
+        with metrics.capture() as captured:
+            score_in_stages({"gene1": "1"})
+        merged.merge(captured.snapshot())
+        merged.merge(captured.snapshot())
+
+        self.assertFalse(metrics.enabled)
+        self.assertEqual(metrics.stages, {})
+        self.assertEqual(merged.stages[SIMULATE].calls, 2)
+        self.assertEqual(merged.counters["build_cached"], 2)
+
+    def test_process_pool_workers_send_stages(self) -> None:
+        metrics.enabled = True
+        with Process_pool_engine(max_workers=2) as engine:
+            engine.evaluate(score_in_stages, [{"gene1": str(n)} for n in range(5)])
+
+        self.assertEqual(metrics.stages[SIMULATE].calls, 5)
+        self.assertEqual(metrics.stages[COMPILE].calls, 5)
+        self.assertEqual(metrics.stages[SCORE].calls, 5)
+        self.assertEqual(metrics.counters["build_cached"], 5)
+
+    def test_genetic_func_is_instrumented(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "metrics.jsonl"
+            metrics.enabled = True
+            metrics.path = path
+            func_run = Mock(return_value=8)
+            population = [
+                ({"gene1": "1", "gene2": "2"}, 0.0),
+                ({"gene1": "2", "gene2": "1"}, 0.0),
+            ]
+            Mutation().genetic_func(
+                population,
+                {"gene1": range(1, 3), "gene2": range(1, 3)},
+                iterations=3,
+                alive=2,
+                reproduce=1,
+                func_generate=Mock(),
+                func_run=func_run,
+                desired_output=10,
+            )
+            records = [json.loads(line) for line in path.read_text().splitlines()]
+
+        self.assertEqual(metrics.stages[SIMULATE].calls, func_run.call_count)
+        self.assertEqual(metrics.stages[SCORE].calls, func_run.call_count)
+        self.assertEqual(metrics.counters["ok"], func_run.call_count)
+        self.assertEqual([record["generation"] for record in records], [1, 2, 3])
+        self.assertTrue(all(record["evaluated"] == 2 for record in records))
+
+        text = metrics.prometheus()
+        self.assertIn('pfuzz_stage_calls_total{stage="simulate"} 8', text)
+        self.assertIn('pfuzz_events_total{event="ok"} 8', text)
+        self.assertIn("pfuzz_generation_per_second", text)
@@ -1,10 +1,25 @@
+import random
 import unittest
+import tarfile
 import tempfile
 import os
+from pathlib import Path
+from typing import Any
 from unittest.mock import Mock
 
+from pfuzz.mutation.assembly import Assembly_program
+from pfuzz.mutation.cache import Fitness_cache
+from pfuzz.mutation.checkpoint import Checkpoint
+from pfuzz.mutation.evaluation import Serial_engine, Thread_pool_engine
 from pfuzz.mutation.mutation import Mutation
 from pfuzz.mutation.mutation import Assembly_mutation, RISCV_INSTRUCTIONS
+from pfuzz.mutation.adaptive import Adaptive_rates
+from pfuzz.mutation.offspring import Assembly_population
+from pfuzz.mutation.validity import Assembly_validator
+from pfuzz.mutation.novelty import Novelty_index
+from pfuzz.mutation.pareto import dominates
+from pfuzz.mutation.sampling import initial_population
+from pfuzz.mutation.surrogate import Nearest_neighbour_surrogate
 
 
 def count_differences(chrom_a: dict[str, str], chrom_b: dict[str, str]) -> int:
@@ -112,6 +127,333 @@ class TestMutation(unittest.TestCase):
         self.assertEqual(result_population[0][1], 1.0)
         self.assertEqual(len(result_population), 1)
 
+    def test_genetic_func_cache(self) -> None:
+        population = [
+            ({"gene1": "1", "gene2": "1", "gene3": "1"}, 0.0),
+            ({"gene1": "1", "gene2": "1", "gene3": "1"}, 0.0),
+        ]
+        template_config = {
+            "gene1": range(1, 2),
+            "gene2": range(1, 2),
+            "gene3": range(1, 2),
+        }
+        cache = Fitness_cache()
+
+        self.func_run.return_value = 8
+        self.mutation.genetic_func(
+            population,
+            template_config,
+            iterations=5,
+            alive=2,
+            reproduce=2,
+            func_generate=self.func_generate,
+            func_run=self.func_run,
+            desired_output=10,
+            cache=cache,
+        )
+
+        self.assertEqual(self.func_run.call_count, 1)
+        self.assertGreater(cache.hits, 0)
+
+    def run_checkpointed(
+        self,
+        directory: Path,
+        interrupt_after: int = -1,
+        desired_output: float = 100,
+        **options: Any,
+    ) -> list[tuple[dict[str, str], float]]:
+        chromosomes: list[dict[str, str]] = []
+
+        def run() -> int:
+            if len(chromosomes) == interrupt_after + 1:
+                raise KeyboardInterrupt()
+            return sum(int(value) for value in chromosomes[-1].values())
+
+        self.func_generate.side_effect = chromosomes.append
+        self.func_run.side_effect = run
+        population = [
+            ({"gene1": "1", "gene2": "2", "gene3": "3"}, 0.0),
+            ({"gene1": "4", "gene2": "4", "gene3": "4"}, 0.0),
+        ]
+        with Checkpoint(directory) as checkpoint:
+            return self.mutation.genetic_func(
+                population,
+                self.template_config,
+                iterations=6,
+                alive=3,
+                reproduce=2,
+                func_generate=self.func_generate,
+                func_run=self.func_run,
+                desired_output=desired_output,
+                checkpoint=checkpoint,
+                **options,
+            )
+
+    def resume_checkpointed(
+        self, directory: Path, desired_output: float = 100, **options: Any
+    ) -> list[tuple[dict[str, str], float]]:
+        with Checkpoint(directory) as checkpoint:
+            return self.mutation.resume_genetic_func(
+                checkpoint,
+                self.template_config,
+                iterations=6,
+                alive=3,
+                reproduce=2,
+                func_generate=self.func_generate,
+                func_run=self.func_run,
+                desired_output=desired_output,
+                **options,
+            )
+
+    def test_genetic_func_resumes_from_checkpoint(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            random.seed(1)
+            expected = self.run_checkpointed(Path(tmp_dir) / "whole")
+            total_calls = self.func_run.call_count
+
+            self.func_run.reset_mock()
+            random.seed(1)
+            with self.assertRaises(KeyboardInterrupt):
+                self.run_checkpointed(Path(tmp_dir) / "resumed", total_calls // 2)
+
+            self.func_run.reset_mock()
+            random.seed(2)
+            result = self.resume_checkpointed(Path(tmp_dir) / "resumed")
+
+        self.assertEqual(result, expected)
+        self.assertLess(self.func_run.call_count, total_calls)
+
+    def test_genetic_func_resumes_adaptive_rates(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            random.seed(3)
+            rates = Adaptive_rates(1, max_amount=3)
+            expected = self.run_checkpointed(Path(tmp_dir) / "whole", rates=rates)
+            total_calls = self.func_run.call_count
+
+            self.func_run.reset_mock()
+            random.seed(3)
+            with self.assertRaises(KeyboardInterrupt):
+                self.run_checkpointed(
+                    Path(tmp_dir) / "resumed",
+                    total_calls // 2,
+                    rates=Adaptive_rates(1, max_amount=3),
+                )
+
+            resumed_rates = Adaptive_rates(1, max_amount=3)
+            result = self.resume_checkpointed(
+                Path(tmp_dir) / "resumed", rates=resumed_rates
+            )
+
+        self.assertEqual(result, expected)
+        self.assertEqual(resumed_rates.state(), rates.state())
+
+    def test_genetic_func_resumes_surrogate(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            random.seed(0)
+            surrogate = Nearest_neighbour_surrogate(self.template_config, k=2)
+            expected = self.run_checkpointed(
+                Path(tmp_dir) / "whole", desired_output=9, surrogate=surrogate
+            )
+            total_calls = self.func_run.call_count
+
+            self.func_run.reset_mock()
+            random.seed(0)
+            with self.assertRaises(KeyboardInterrupt):
+                self.run_checkpointed(
+                    Path(tmp_dir) / "resumed",
+                    total_calls - 2,
+                    desired_output=9,
+                    surrogate=Nearest_neighbour_surrogate(self.template_config, k=2),
+                )
+
+            resumed = Nearest_neighbour_surrogate(self.template_config, k=2)
+            result = self.resume_checkpointed(
+                Path(tmp_dir) / "resumed", desired_output=9, surrogate=resumed
+            )
+
+        self.assertEqual(result, expected)
+        self.assertEqual(resumed.state(), surrogate.state())
+
+    def test_genetic_func_surrogate(self) -> None:
+        random.seed(0)
+        population = [
+            ({"gene1": "1", "gene2": "1", "gene3": "1"}, 0.0),
+            ({"gene1": "2", "gene2": "2", "gene3": "2"}, 0.0),
+            ({"gene1": "3", "gene2": "1", "gene3": "2"}, 0.0),
+        ]
+        chromosomes: list[dict[str, str]] = []
+        self.func_generate.side_effect = chromosomes.append
+        self.func_run.side_effect = lambda: sum(
+            int(value) for value in chromosomes[-1].values()
+        )
+        surrogate = Nearest_neighbour_surrogate(self.template_config, k=2)
+
+        result_population = self.mutation.genetic_func(
+            population,
+            self.template_config,
+            iterations=10,
+            alive=3,
+            reproduce=2,
+            func_generate=self.func_generate,
+            func_run=self.func_run,
+            desired_output=12,
+            surrogate=surrogate,
+            screen_fraction=0.5,
+        )
+
+        self.assertEqual(surrogate.screened_out, self.func_run.call_count - 3)
+        self.assertEqual(len(surrogate), self.func_run.call_count)
+        self.assertGreater(result_population[0][1], 1 / 6)
+
+    def test_genetic_func_adaptive_rates(self) -> None:
+        random.seed(0)
+        population = initial_population(self.template_config, 4, seed=0)
+        chromosomes: list[dict[str, str]] = []
+        self.func_generate.side_effect = chromosomes.append
+        self.func_run.side_effect = lambda: sum(
+            int(value) for value in chromosomes[-1].values()
+        )
+        rates = Adaptive_rates(1, max_amount=4)
+
+        result_population = self.mutation.genetic_func(
+            population,
+            self.template_config,
+            iterations=5,
+            alive=4,
+            reproduce=1,
+            func_generate=self.func_generate,
+            func_run=self.func_run,
+            desired_output=100,
+            rates=rates,
+        )
+
+        self.assertTrue(all(fitness > 0.0 for _, fitness in result_population))
+        self.assertIsNotNone(rates.best)
+        self.assertGreater(rates.crossover + rates.mutation, 2)
+
+    def test_genetic_func_adaptive_rates_sparse_chromosomes(self) -> None:
+        random.seed(1)
+        population: list[tuple[dict[str, str], float]] = [
+            ({"gene1": "1", "gene2": "1"}, 0.0),
+            ({"gene1": "2", "gene2": "4"}, 0.0),
+            ({"gene1": "3", "gene2": "3"}, 0.0),
+        ]
+        chromosomes: list[dict[str, str]] = []
+        self.func_generate.side_effect = chromosomes.append
+        self.func_run.side_effect = lambda: sum(
+            int(value) for value in chromosomes[-1].values()
+        )
+
+        result_population = self.mutation.genetic_func(
+            population,
+            self.template_config,
+            iterations=4,
+            alive=3,
+            reproduce=2,
+            func_generate=self.func_generate,
+            func_run=self.func_run,
+            desired_output=100,
+            rates=Adaptive_rates(2, max_amount=10),
+        )
+
+        self.assertTrue(all(fitness > 0.0 for _, fitness in result_population))
+        self.assertTrue(all("gene3" not in item[0] for item in result_population))
+
+    def test_pareto_func(self) -> None:
+        random.seed(0)
+        population = [
+            {"gene1": "1", "gene2": "1", "gene3": "1"},
+            {"gene1": "2", "gene2": "2", "gene3": "2"},
+        ]
+        chromosomes: list[dict[str, str]] = []
+        self.func_generate.side_effect = chromosomes.append
+        self.func_run.side_effect = lambda: (
+            float(chromosomes[-1]["gene1"]),
+            float(chromosomes[-1]["gene2"]),
+        )
+
+        result_population = self.mutation.pareto_func(
+            population,
+            self.template_config,
+            iterations=15,
+            alive=4,
+            reproduce=2,
+            func_generate=self.func_generate,
+            func_run=self.func_run,
+        )
+
+        self.assertEqual(len(result_population), 4)
+        self.assertEqual(self.func_run.call_count, 2 + 15 * 6)
+        best = result_population[0][1]
+        self.assertTrue(dominates(best, (2.0, 2.0)))
+        self.assertFalse(any(dominates(item[1], best) for item in result_population))
+
+    def test_pareto_func_failed_children(self) -> None:
+        population = [
+            {"gene1": "1", "gene2": "1", "gene3": "1"},
+            {"gene1": "2", "gene2": "2", "gene3": "2"},
+        ]
+        self.func_run.side_effect = [(1.0, 2.0), (2.0, 1.0)] + [
+            RuntimeError("simulation crashed")
+        ] * (3 * 6)
+        engine = Serial_engine(failure_fitness=-1.0, isolate_failures=True)
+
+        result_population = self.mutation.pareto_func(
+            population,
+            self.template_config,
+            iterations=3,
+            alive=4,
+            reproduce=2,
+            func_generate=self.func_generate,
+            func_run=self.func_run,
+            engine=engine,
+        )
+
+        self.assertEqual(len(result_population), 4)
+        self.assertEqual({len(item[1]) for item in result_population}, {2})
+        self.assertIn((-1.0, -1.0), [item[1] for item in result_population])
+
+    def test_steady_state_func(self) -> None:
+        population = [
+            ({"gene1": "1", "gene2": "2", "gene3": "3"}, 0.0),
+            ({"gene1": "4", "gene2": "4", "gene3": "4"}, 0.0),
+        ]
+        self.func_run.side_effect = lambda: random.choice([4, 6, 8])
+
+        with Thread_pool_engine(max_workers=3) as engine:
+            result_population = self.mutation.steady_state_func(
+                population,
+                self.template_config,
+                evaluations=20,
+                alive=3,
+                func_generate=self.func_generate,
+                func_run=self.func_run,
+                desired_output=10,
+                engine=engine,
+            )
+
+        self.assertEqual(self.func_run.call_count, 22)
+        self.assertEqual(len(result_population), 3)
+        fitness = [item[1] for item in result_population]
+        self.assertEqual(fitness, sorted(fitness, reverse=True))
+
+    def test_steady_state_func_stops_at_desired_output(self) -> None:
+        population = [({"gene1": "1", "gene2": "2", "gene3": "3"}, 0.0)]
+        self.func_run.return_value = 10
+
+        result_population = self.mutation.steady_state_func(
+            population,
+            self.template_config,
+            evaluations=20,
+            alive=2,
+            func_generate=self.func_generate,
+            func_run=self.func_run,
+            desired_output=10,
+        )
+
+        self.assertEqual(self.func_run.call_count, 1)
+        self.assertEqual(result_population[0][1], 1.0)
+
 
 class TestAssemblyMutation(unittest.TestCase):
 
@@ -208,3 +550,101 @@ class TestAssemblyMutation(unittest.TestCase):
         self.assertLessEqual(mutation_count, max_mutations)
 
         os.remove(child_file_path)
+
+    def test_mutate_program_keeps_parent(self) -> None:
+        parent = Assembly_program.from_file(self.temp_file1.name)
+        original = list(parent.lines)
+
+        child = self.assembly_mutation.mutate_program(parent, 3)
+
+        self.assertEqual(parent.lines, original)
+        self.assertEqual(len(child.lines), len(original))
+        self.assertEqual(parent.boundaries, [0, 2, 3, 5])
+        self.assertEqual(parent.instructions, [1, 3, 4, 6])
+
+    def test_crossover_programs(self) -> None:
+        parent1 = Assembly_program.from_file(self.temp_file1.name)
+        parent2 = Assembly_program.from_file(self.temp_file2.name)
+
+        child = self.assembly_mutation.crossover_programs(parent1, parent2)
+
+        assert child is not None
+        self.assertEqual(child.lines[0], parent1.lines[0])
+        self.assertIsNone(
+            self.assembly_mutation.crossover_programs(
+                Assembly_program(["main:\n"]), parent2
+            )
+        )
+
+    def test_program_store_reloads_changed_file(self) -> None:
+        labels = self.assembly_mutation.find_labels_and_jumps(self.temp_file1.name)
+        with open(self.temp_file1.name, "a") as file:
+            file.write("tail:\n")
+        self.assertEqual(
+            self.assembly_mutation.find_labels_and_jumps(self.temp_file1.name),
+            labels + [7],
+        )
+
+
+class TestAssemblyPopulation(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.parent = os.path.join(self.directory.name, "parent.s")
+        with open(self.parent, "w") as parent:
+            parent.writelines(
+                [
+                    "main:\n",
+                    "    add x1, x2, x3\n",
+                    "loop:\n",
+                    "    beq x1, x2, end\n",
+                    "    addi x1, x1, 1\n",
+                    "end:\n",
+                    "    xor x4, x5, x6\n",
+                ]
+            )
+        self.population = Assembly_population([self.parent, self.parent], seed=7)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_make_children_is_deterministic(self) -> None:
+        serial = self.population.make_children(50, 1, max_workers=1, chunk_size=8)
+        parallel = self.population.make_children(50, 1, max_workers=2, chunk_size=8)
+        self.assertEqual(serial, parallel)
+        self.assertEqual([number for number, _ in serial], list(range(50)))
+
+    def test_generate_shards(self) -> None:
+        out_dir = Path(self.directory.name) / "children"
+        paths = self.population.generate(5, 2, out_dir, max_workers=1, shard_size=2)
+        self.assertEqual(len(paths), 5)
+        self.assertEqual(len(list(out_dir.iterdir())), 3)
+        self.assertTrue(paths[4].endswith(os.path.join("shard-2", "2-4.s")))
+
+    def test_generate_archive(self) -> None:
+        out_dir = Path(self.directory.name) / "children"
+        names = self.population.generate(4, 3, out_dir, archive=True)
+        with tarfile.open(out_dir / "3.tar") as tar:
+            self.assertEqual(tar.getnames(), names)
+
+    def test_make_children_skips_duplicates(self) -> None:
+        parent = os.path.join(self.directory.name, "single.s")
+        with open(parent, "w") as program:
+            program.writelines(["main:\n", "    add x1, x2, x3\n"])
+        novelty = Novelty_index(threshold=1.0)
+        population = Assembly_population([parent], seed=7, novelty=novelty)
+        children = population.make_children(50, 1, max_workers=1)
+
+        self.assertGreater(population.duplicates, 0)
+        self.assertEqual(len(children) + population.duplicates, 50)
+        self.assertEqual(len(novelty), len(children) + 1)
+
+    def test_make_children_drops_invalid(self) -> None:
+        validator = Assembly_validator()
+        population = Assembly_population(
+            [self.parent, self.parent], seed=7, validator=validator
+        )
+        children = population.make_children(50, 1, max_workers=1)
+
+        self.assertGreater(sum(validator.rejected.values()), 0)
+        self.assertEqual(validator.stats()["accepted"], len(children))
+        self.assertTrue(all(validator.check(text) is None for _, text in children))
@@ -0,0 +1,90 @@
+import unittest
+
+from pfuzz.gem5_statistics.tick_table import Tick_table
+from pfuzz.mutation.assembly import Assembly_program
+from pfuzz.mutation.novelty import Min_hash, Novelty_index, shingles, similarity
+
+
+class TestMinHash(unittest.TestCase):
+    def setUp(self) -> None:
+        self.min_hash = Min_hash(num_perm=128)
+
+    def test_shingles(self) -> None:
+        self.assertEqual(
+            shingles(["a", "b", "c", "a", "b"], 2),
+            {
+                ("a", "b"),
+                ("b", "c"),
+                ("c", "a"),
+            },
+        )
+        self.assertEqual(shingles(["a"], 3), {("a",)})
+
+    def test_similarity_estimates_jaccard(self) -> None:
+        first = self.min_hash.signature(range(0, 100))
+        second = self.min_hash.signature(range(50, 150))
+
+        self.assertEqual(similarity(first, self.min_hash.signature(range(100))), 1.0)
+        self.assertAlmostEqual(similarity(first, second), 1 / 3, delta=0.15)
+        self.assertLess(
+            similarity(first, self.min_hash.signature(range(200, 300))), 0.1
+        )
+
+    def test_program_signature_ignores_operands(self) -> None:
+        program = Assembly_program(["main:\n", "\tadd a0, a1, a2\n", "\tret\n"])
+        renamed = Assembly_program(["start:\n", "\tadd t0, t1, t2\n", "\tret\n"])
+        other = Assembly_program(["main:\n", "\tsub a0, a1, a2\n", "\tret\n"])
+
+        self.assertEqual(
+            self.min_hash.program_signature(program),
+            self.min_hash.program_signature(renamed),
+        )
+        self.assertNotEqual(
+            self.min_hash.program_signature(program),
+            self.min_hash.program_signature(other),
+        )
+
+    def test_trace_signature_caps_counts(self) -> None:
+        columns = [[1, 0, 2, 1, 0] for _ in range(8)]
+        table = Tick_table.from_columns([1, 2, 3, 4, 5], columns)
+        busier = Tick_table.from_columns(
+            [10, 20, 30, 40, 50], [[1, 0, 7, 1, 0] for _ in range(8)]
+        )
+        capped = Tick_table.from_columns(
+            [1, 2, 3, 4, 5], [[1, 0, 3, 1, 0] for _ in range(8)]
+        )
+
+        self.assertNotEqual(
+            self.min_hash.trace_signature(table), self.min_hash.trace_signature(busier)
+        )
+        self.assertEqual(
+            self.min_hash.trace_signature(capped),
+            self.min_hash.trace_signature(busier),
+        )
+
+
+class TestNoveltyIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self.min_hash = Min_hash()
+        self.index = Novelty_index(bands=16, threshold=0.8)
+        self.index.add("a", self.min_hash.signature(range(100)), 0.5)
+        self.index.add("b", self.min_hash.signature(range(2, 100)), 0.7)
+        self.index.add("c", self.min_hash.signature(range(500, 600)))
+
+    def test_duplicates_and_estimate(self) -> None:
+        signature = self.min_hash.signature(range(1, 100))
+
+        self.assertEqual(sorted(map(str, self.index.duplicates(signature))), ["a", "b"])
+        estimate = self.index.estimate(signature)
+        assert estimate is not None
+        self.assertAlmostEqual(estimate, 0.6)
+        self.assertIsNone(
+            self.index.estimate(self.min_hash.signature(range(1000, 1100)))
+        )
+
+    def test_novelty(self) -> None:
+        known = self.index.novelty(self.min_hash.signature(range(100)), k=1)
+        unknown = self.index.novelty(self.min_hash.signature(range(900, 1000)), k=1)
+
+        self.assertEqual(known, 0.0)
+        self.assertEqual(unknown, 1.0)
@@ -0,0 +1,47 @@
+import unittest
+
+from pfuzz.mutation.pareto import (
+    crowding_distance,
+    dominates,
+    non_dominated_sort,
+    pareto_select,
+)
+
+
+class TestPareto(unittest.TestCase):
+    def setUp(self) -> None:
+        self.objectives = [
+            (1.0, 5.0),
+            (2.0, 4.0),
+            (3.0, 3.0),
+            (1.0, 1.0),
+            (2.0, 2.0),
+            (5.0, 1.0),
+            (3.0, 3.0),
+        ]
+
+    def test_dominates(self) -> None:
+        self.assertTrue(dominates((2.0, 2.0), (1.0, 2.0)))
+        self.assertFalse(dominates((2.0, 2.0), (2.0, 2.0)))
+        self.assertFalse(dominates((3.0, 1.0), (1.0, 3.0)))
+
+    def test_non_dominated_sort(self) -> None:
+        fronts = non_dominated_sort(self.objectives)
+
+        self.assertEqual(
+            [sorted(front) for front in fronts], [[0, 1, 2, 5, 6], [4], [3]]
+        )
+
+    def test_crowding_distance(self) -> None:
+        front = [0, 1, 2, 5]
+        distances = crowding_distance(self.objectives, front)
+
+        self.assertEqual(distances[0], float("inf"))
+        self.assertEqual(distances[3], float("inf"))
+        self.assertAlmostEqual(distances[1], 0.5 + 0.5)
+        self.assertAlmostEqual(distances[2], 0.75 + 0.75)
+
+    def test_pareto_select(self) -> None:
+        self.assertEqual(sorted(pareto_select(self.objectives, 2)), [0, 5])
+        self.assertEqual(len(pareto_select(self.objectives, 6)), 6)
+        self.assertNotIn(3, pareto_select(self.objectives, 6))
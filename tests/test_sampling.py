@@ -0,0 +1,73 @@
+import random
+import unittest
+
+from pfuzz.mutation.adaptive import Adaptive_rates
+from pfuzz.mutation.sampling import (
+    UNIFORM,
+    diversity,
+    initial_population,
+    latin_hypercube,
+)
+
+
+class TestSampling(unittest.TestCase):
+    def setUp(self) -> None:
+        self.template_config = {"gene1": range(0, 100), "gene2": range(1, 5)}
+
+    def test_latin_hypercube_covers_every_stratum(self) -> None:
+        sample = latin_hypercube(self.template_config, 10, random.Random(3))
+
+        self.assertEqual(len(sample), 10)
+        self.assertEqual(
+            sorted(int(chromosome["gene1"]) // 10 for chromosome in sample),
+            list(range(10)),
+        )
+        values = sorted(int(chromosome["gene2"]) for chromosome in sample)
+        self.assertEqual(values, [1, 1, 1, 2, 2, 3, 3, 3, 4, 4])
+
+    def test_initial_population(self) -> None:
+        population = initial_population(self.template_config, 6, seed=1)
+        self.assertEqual(
+            population, initial_population(self.template_config, 6, seed=1)
+        )
+        self.assertTrue(all(fitness == 0.0 for _, fitness in population))
+        self.assertEqual(len(initial_population(self.template_config, 3, UNIFORM)), 3)
+        with self.assertRaises(ValueError):
+            initial_population(self.template_config, 3, "sobol")
+
+    def test_diversity(self) -> None:
+        same = [{"gene1": "1", "gene2": "1"}] * 4
+        spread = [{"gene1": str(value), "gene2": str(value)} for value in range(1, 5)]
+
+        self.assertEqual(diversity(same, self.template_config), 0.0)
+        self.assertEqual(diversity(spread, self.template_config), 1.0)
+        sample = [
+            chromosome
+            for chromosome, _ in initial_population(self.template_config, 4, seed=0)
+        ]
+        self.assertEqual(diversity(sample, self.template_config), 1.0)
+
+    def test_diversity_of_left_out_genes(self) -> None:
+        sparse = [{}, {"gene1": "1"}, {"gene2": "1"}, {"gene1": "2", "gene2": "1"}]
+        self.assertEqual(diversity(sparse, self.template_config), 0.5)
+
+
+class TestAdaptiveRates(unittest.TestCase):
+    def test_improvement_favours_crossover(self) -> None:
+        rates = Adaptive_rates(2, max_amount=6)
+        rates.update(0.1, 1.0)
+        rates.update(0.2, 1.0)
+
+        self.assertGreater(rates.crossover, 2)
+        self.assertEqual(rates.mutation, 1)
+
+    def test_stagnation_and_collapse_favour_mutation(self) -> None:
+        rates = Adaptive_rates(2, max_amount=6, patience=2)
+        for _ in range(4):
+            rates.update(0.5, 1.0)
+        self.assertEqual(rates.stagnant, 3)
+        self.assertEqual((rates.crossover, rates.mutation), (1, 3))
+
+        collapsed = Adaptive_rates(2, max_amount=6)
+        collapsed.update(0.5, 0.0)
+        self.assertEqual((collapsed.crossover, collapsed.mutation), (1, 3))
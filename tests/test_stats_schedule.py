@@ -0,0 +1,98 @@
+import unittest
+from typing import List, Optional, Tuple
+from unittest.mock import patch
+
+from pfuzz.gem5_statistics.stats_schedule import (
+    DUMP,
+    RESET,
+    Stats_scheduler,
+    coalesce,
+)
+from pfuzz.gem5_statistics.tick_statistics import Tick_statistics
+
+
+class Fake_stats:
+    def __init__(self, m5: "Fake_m5") -> None:
+        self.m5 = m5
+
+    def reset(self) -> None:
+        self.m5.log.append((self.m5.tick, RESET))
+
+    def dump(self) -> None:
+        self.m5.log.append((self.m5.tick, DUMP))
+
+
+class Fake_m5:
+    """Stand-in for the gem5 m5 module whose workload exits at `exit_tick`"""
+
+    def __init__(self, tick: int = 0, exit_tick: Optional[int] = None) -> None:
+        self.tick = tick
+        self.exit_tick = exit_tick
+        self.log: List[Tuple[int, str]] = []
+        self.simulated: List[int] = []
+        self.stats = Fake_stats(self)
+
+    def curTick(self) -> int:
+        return self.tick
+
+    def simulate(self, ticks: int) -> None:
+        self.simulated.append(ticks)
+        self.tick += ticks
+        if self.exit_tick is not None:
+            self.tick = min(self.tick, self.exit_tick)
+
+
+class TestStatsScheduler(unittest.TestCase):
+    def test_coalesce(self) -> None:
+        self.assertEqual(
+            coalesce([(4000, 5000), (1000, 2000), (1500, 2500), (1000, 2000)]),
+            [(1000, 2000), (2000, 2500), (4000, 5000)],
+        )
+
+    def test_plan_dumps_before_resetting(self) -> None:
+        self.assertEqual(
+            Stats_scheduler().plan([(2000, 3000), (1000, 2000)]),
+            [(1000, RESET), (2000, DUMP), (2000, RESET), (3000, DUMP)],
+        )
+
+    def test_single_simulate_per_action(self) -> None:
+        m5 = Fake_m5()
+        scheduler = Stats_scheduler(m5)
+        dumped = scheduler.dump_exclusive([50000, 3000, 10000, 3000])
+
+        self.assertEqual(dumped, 3)
+        self.assertEqual(
+            m5.log,
+            [
+                (2000, RESET),
+                (3000, DUMP),
+                (9000, RESET),
+                (10000, DUMP),
+                (49000, RESET),
+                (50000, DUMP),
+            ],
+        )
+        self.assertEqual(sum(m5.simulated), 50000)
+        self.assertEqual(scheduler.simulate_calls, 6)
+
+    def test_windows_and_past_ticks(self) -> None:
+        m5 = Fake_m5(tick=1500)
+        Stats_scheduler(m5).run([(1000, 2000), (2000, 7000)])
+
+        self.assertEqual(
+            m5.log, [(1500, RESET), (2000, DUMP), (2000, RESET), (7000, DUMP)]
+        )
+        self.assertEqual(m5.simulated, [500, 5000])
+
+    def test_stops_when_simulation_exits(self) -> None:
+        m5 = Fake_m5(exit_tick=5500)
+        self.assertEqual(Stats_scheduler(m5).dump_exclusive([2000, 6000, 9000]), 1)
+        self.assertEqual(m5.log, [(1000, RESET), (2000, DUMP), (5000, RESET)])
+
+    def test_tick_statistics_uses_m5_module(self) -> None:
+        m5 = Fake_m5()
+        with patch.dict("sys.modules", {"m5": m5}):
+            Tick_statistics().get_stats_for_certain_ticks_exclusively([2000, 1000])
+        self.assertEqual(
+            m5.log, [(0, RESET), (1000, DUMP), (1000, RESET), (2000, DUMP)]
+        )
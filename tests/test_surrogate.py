@@ -0,0 +1,48 @@
+import unittest
+
+from pfuzz.mutation.surrogate import Nearest_neighbour_surrogate
+
+
+class TestNearestNeighbourSurrogate(unittest.TestCase):
+    def setUp(self) -> None:
+        self.surrogate = Nearest_neighbour_surrogate(
+            {"gene1": range(0, 11), "gene2": range(0, 11)}, k=2
+        )
+        self.surrogate.update(
+            [{"gene1": "0", "gene2": "0"}, {"gene1": "10", "gene2": "10"}],
+            [0.0, 1.0],
+        )
+
+    def test_predict(self) -> None:
+        self.assertEqual(self.surrogate.predict({"gene1": "10", "gene2": "10"}), 1.0)
+        self.assertAlmostEqual(
+            self.surrogate.predict({"gene1": "5", "gene2": "5"}), 0.5
+        )
+        self.assertGreater(self.surrogate.predict({"gene1": "8", "gene2": "9"}), 0.5)
+
+    def test_screen(self) -> None:
+        chromosomes = [
+            {"gene1": "1", "gene2": "0"},
+            {"gene1": "9", "gene2": "10"},
+            {"gene1": "2", "gene2": "1"},
+            {"gene1": "8", "gene2": "8"},
+        ]
+
+        self.assertEqual(self.surrogate.screen(chromosomes, 0.5), [1, 3])
+        self.assertEqual(self.surrogate.screened_out, 2)
+
+    def test_screen_passes_everything_until_trained(self) -> None:
+        surrogate = Nearest_neighbour_surrogate({"gene1": range(0, 11)}, k=5)
+        surrogate.update([{"gene1": "1"}], [1.0])
+
+        self.assertEqual(
+            surrogate.screen([{"gene1": "1"}, {"gene1": "2"}], 0.5), [0, 1]
+        )
+
+    def test_max_points(self) -> None:
+        surrogate = Nearest_neighbour_surrogate({"gene1": range(0, 11)}, max_points=2)
+        surrogate.update([{"gene1": str(value)} for value in range(5)], [0, 1, 2, 3, 4])
+
+        self.assertEqual(len(surrogate), 2)
+        self.assertEqual(list(surrogate.fitness), [3.0, 4.0])
+        self.assertEqual(list(surrogate.points), [0.3, 0.4])
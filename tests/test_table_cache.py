@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from pfuzz.gem5_statistics.table_cache import Table_cache
+from pfuzz.gem5_statistics.tick_statistics import Tick_statistics
+from tests.test_tick_statistics import TRACE
+
+
+class TestTableCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "trace.txt")
+        with open(self.path, "w") as trace:
+            trace.writelines(TRACE)
+        self.expected = Tick_statistics().get_tick_statistics_list(self.path)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_sidecar_round_trip(self) -> None:
+        cache = Table_cache()
+        statistics = Tick_statistics(cache)
+        statistics.get_tick_statistics_list(self.path)
+        table = statistics.get_tick_statistics_list(self.path)
+
+        self.assertTrue(os.path.exists(self.path + ".ticks"))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertIsInstance(table.tick_numbers, memoryview)
+        self.assertEqual(
+            [row.astuple() for row in table],
+            [row.astuple() for row in self.expected],
+        )
+        self.assertEqual(
+            statistics.get_pipeline_objectives(table, 2),
+            statistics.get_pipeline_objectives(self.expected, 2),
+        )
+
+    def test_changed_trace_is_parsed_again(self) -> None:
+        cache = Table_cache(Path(self.tmp_dir.name) / "cache")
+        statistics = Tick_statistics(cache)
+        statistics.get_tick_statistics_list(self.path)
+        with open(self.path, "a") as trace:
+            trace.write("O3PipeView:fetch:9000:0x00010084:0:4:  nop\n")
+        table = statistics.get_tick_statistics_list(self.path)
+
+        self.assertEqual((cache.hits, cache.misses), (0, 2))
+        self.assertEqual(table[-1].fetched_during_this_tick, 1)
+        self.assertIsNotNone(cache.load(self.path))
+
+    def test_corrupt_sidecar_is_ignored(self) -> None:
+        cache = Table_cache()
+        cache.store(self.path, self.expected)
+        with open(cache.sidecar_path(self.path), "r+b") as sidecar:
+            sidecar.truncate(20)
+
+        self.assertIsNone(cache.load(self.path))
+
+    def test_failed_store_keeps_table(self) -> None:
+        statistics = Tick_statistics(Table_cache())
+
+        with patch.object(Table_cache, "store", side_effect=PermissionError):
+            table = statistics.get_tick_statistics_list(self.path)
+
+        self.assertEqual(len(table), len(self.expected))
@@ -0,0 +1,138 @@
+import gzip
+import os
+import tempfile
+import unittest
+from dataclasses import astuple
+
+from pfuzz.gem5_statistics.tick_statistics import Tick_statistics
+from pfuzz.gem5_statistics.tick_table import DECODED, FETCHED, RETIRED, Tick_table
+from pfuzz.gem5_statistics.window_analysis import Window_analysis
+
+TRACE = [
+    "O3PipeView:fetch:1000:0x00010078:0:1:  addi sp, sp, -32\n",
+    "O3PipeView:decode:2000\n",
+    "O3PipeView:rename:3000\n",
+    "O3PipeView:dispatch:4000\n",
+    "O3PipeView:issue:5000\n",
+    "O3PipeView:complete:6000\n",
+    "O3PipeView:retire:7000:store:0\n",
+    "O3PipeView:fetch:1000:0x0001007c:0:2:  sd ra, 24(sp)\n",
+    "O3PipeView:decode:2000\n",
+    "O3PipeView:rename:3000\n",
+    "O3PipeView:dispatch:4000\n",
+    "O3PipeView:issue:5000\n",
+    "O3PipeView:complete:6000\n",
+    "O3PipeView:retire:8000:store:9000\n",
+    "O3PipeView:fetch:2000:0x00010080:0:3:  ld a0, 8(sp)\n",
+    "O3PipeView:decode:3000\n",
+    "O3PipeView:rename:4000\n",
+    "O3PipeView:dispatch:5000\n",
+    "O3PipeView:issue:6000\n",
+    "O3PipeView:complete:0\n",
+    "O3PipeView:retire:0:store:0\n",
+]
+
+
+class TestTickStatistics(unittest.TestCase):
+    def setUp(self) -> None:
+        self.statistics = Tick_statistics()
+        trace = tempfile.NamedTemporaryFile(delete=False, mode="w", suffix=".txt")
+        trace.writelines(TRACE)
+        trace.close()
+        self.path = trace.name
+
+    def tearDown(self) -> None:
+        os.remove(self.path)
+
+    def test_get_tick_statistics_list(self) -> None:
+        ticks = self.statistics.get_tick_statistics_list(self.path)
+
+        self.assertEqual(
+            [tick.tick_number for tick in ticks],
+            [1000, 2000, 3000, 4000, 5000, 6000, 7000, 8000, 9000],
+        )
+        self.assertEqual(ticks[0].fetched_during_this_tick, 2)
+        self.assertEqual(ticks[1].fetched_during_this_tick, 1)
+        self.assertEqual(ticks[1].decoded_during_this_tick, 2)
+        self.assertEqual(ticks[5].completed_during_this_tick, 3)
+        self.assertEqual(ticks[-1].fetched_so_far, 3)
+        self.assertEqual(ticks[-1].retired_so_far, 3)
+        self.assertEqual(ticks[-1].stored_during_this_tick, 1)
+
+    def test_get_pipeline_objectives(self) -> None:
+        ticks = self.statistics.get_tick_statistics_list(self.path)
+
+        self.assertEqual(
+            self.statistics.get_pipeline_objectives(ticks, cycle_number=2),
+            (4000.0, 1.5, 3.0),
+        )
+        self.assertEqual(
+            self.statistics.get_pipeline_objectives(Tick_table()), (0.0, 0.0, 0.0)
+        )
+
+    def test_iter_ticks_matches_list(self) -> None:
+        self.assertEqual(
+            [astuple(tick) for tick in self.statistics.iter_ticks(self.path)],
+            [
+                row.astuple()
+                for row in self.statistics.get_tick_statistics_list(self.path)
+            ],
+        )
+
+    def test_gzip_trace(self) -> None:
+        with open(self.path, "rb") as plain, gzip.open(self.path + ".gz", "wb") as gz:
+            gz.write(plain.read())
+        try:
+            compressed = self.statistics.get_tick_statistics_list(self.path + ".gz")
+            plain_table = self.statistics.get_tick_statistics_list(self.path)
+            self.assertEqual(
+                [row.astuple() for row in compressed],
+                [row.astuple() for row in plain_table],
+            )
+        finally:
+            os.remove(self.path + ".gz")
+
+
+class TestWindowAnalysis(unittest.TestCase):
+    def setUp(self) -> None:
+        self.analysis = Window_analysis()
+        self.table = Tick_table()
+        fetched = [2, 1, 4, 0, 3, 1]
+        decoded = [1, 1, 1, 0, 3, 2]
+        retired = [1, 0, 0, 0, 1, 0]
+        for index in range(len(fetched)):
+            self.table.append(
+                (index + 1) * 1000, [fetched[index], decoded[index]] + [0] * 6
+            )
+            self.table.during[RETIRED][index] = retired[index]
+        self.brute_ratios = []
+        for start in range(len(fetched) - 1):
+            fetched_sum = sum(fetched[start : start + 2])
+            decoded_sum = sum(decoded[start : start + 2])
+            self.brute_ratios.append(
+                fetched_sum if decoded_sum == 0 else fetched_sum / decoded_sum
+            )
+
+    def test_rolling_ratios(self) -> None:
+        ratios = self.analysis.rolling_ratios(self.table, FETCHED, DECODED, 2)
+        self.assertEqual(list(ratios), self.brute_ratios)
+
+    def test_worst_ratio_window(self) -> None:
+        window = self.analysis.worst_ratio_window(self.table, FETCHED, DECODED, 2)
+        assert window is not None
+        self.assertEqual((window.start, window.end), (2, 4))
+        self.assertEqual((window.start_tick, window.end_tick), (3000, 4000))
+        self.assertEqual(window.value, 4.0)
+        self.assertEqual(window.totals[FETCHED], 4)
+        self.assertIsNone(
+            self.analysis.worst_ratio_window(self.table, FETCHED, DECODED, 7)
+        )
+
+    def test_longest_run_without(self) -> None:
+        window = self.analysis.longest_run_without(self.table, RETIRED)
+        assert window is not None
+        self.assertEqual((window.start_tick, window.end_tick), (2000, 4000))
+        self.assertEqual(
+            Tick_statistics().get_longest_tick_sequence_without_retired(self.table),
+            [2000, 3000, 4000],
+        )
@@ -0,0 +1,89 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from unittest.mock import patch
+
+from pfuzz.gem5_statistics import trace_decoder
+from pfuzz.gem5_statistics.tick_table import COMPLETED, FETCHED, RETIRED, STORED
+from pfuzz.gem5_statistics.trace_decoder import Trace_decoder
+from tests.test_tick_statistics import TRACE
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class TestTraceDecoder(unittest.TestCase):
+    def setUp(self) -> None:
+        self.data = "".join(TRACE).encode()
+        trace = tempfile.NamedTemporaryFile(delete=False, suffix=".txt")
+        trace.write(self.data)
+        trace.close()
+        self.path = trace.name
+
+    def tearDown(self) -> None:
+        os.remove(self.path)
+
+    def test_events(self) -> None:
+        events = list(Trace_decoder().events(self.data))
+
+        self.assertEqual(len(events), 24)
+        self.assertEqual(events[0], (FETCHED, 1000))
+        self.assertEqual(events[6:8], [(RETIRED, 7000), (STORED, 7000)])
+        self.assertEqual(events[14:16], [(RETIRED, 8000), (STORED, 9000)])
+        # zero ticks repeat the tick of the previous event
+        self.assertEqual(
+            events[-3:], [(COMPLETED, 6000), (RETIRED, 6000), (STORED, 6000)]
+        )
+
+    def test_chunks_split_at_lines(self) -> None:
+        expected = Trace_decoder().decode_file(self.path).table()
+        table = Trace_decoder(chunk_size=50).decode_file(self.path).table()
+
+        self.assertEqual(
+            [row.astuple() for row in table], [row.astuple() for row in expected]
+        )
+
+    def test_gzip_trace(self) -> None:
+        compressed = self.path + ".gz"
+        with gzip.open(compressed, "wb") as trace:
+            trace.write(self.data)
+        try:
+            table = Trace_decoder(chunk_size=64).decode_file(compressed).table()
+        finally:
+            os.remove(compressed)
+
+        expected = Trace_decoder().decode_file(self.path).table()
+        self.assertEqual(
+            [row.astuple() for row in table], [row.astuple() for row in expected]
+        )
+
+    @unittest.skipIf(zstandard is None, "zstandard is not installed")
+    def test_zstd_trace(self) -> None:
+        compressed = self.path + ".zst"
+        with open(compressed, "wb") as trace:
+            trace.write(zstandard.ZstdCompressor().compress(self.data))
+        try:
+            table = Trace_decoder(chunk_size=64).decode_file(compressed).table()
+        finally:
+            os.remove(compressed)
+
+        expected = Trace_decoder().decode_file(self.path).table()
+        self.assertEqual(
+            [row.astuple() for row in table], [row.astuple() for row in expected]
+        )
+
+    def test_zstd_trace_without_zstandard(self) -> None:
+        with open(self.path, "wb") as trace:
+            trace.write(b"\x28\xb5\x2f\xfd")
+        with patch.object(trace_decoder, "zstandard", None):
+            with self.assertRaisesRegex(ImportError, "pfuzz\\[zstd\\]"):
+                Trace_decoder().decode_file(self.path)
+
+    def test_empty_trace(self) -> None:
+        open(self.path, "w").close()
+
+        self.assertEqual(len(Trace_decoder().decode_file(self.path).table()), 0)
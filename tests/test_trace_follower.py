@@ -0,0 +1,61 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from pfuzz.gem5_statistics.tick_statistics import Tick_statistics
+from pfuzz.gem5_statistics.trace_follower import Trace_follower
+from tests.test_tick_statistics import TRACE
+
+
+class TestTraceFollower(unittest.TestCase):
+    def setUp(self) -> None:
+        trace = tempfile.NamedTemporaryFile(delete=False, mode="w", suffix=".txt")
+        trace.close()
+        self.path = trace.name
+
+    def tearDown(self) -> None:
+        os.remove(self.path)
+
+    def test_follow_growing_trace(self) -> None:
+        follower = Trace_follower(self.path, cycle_number=2)
+        text = "".join(TRACE)
+        middle = text.index("O3PipeView:fetch:2000") + 10
+
+        with open(self.path, "w") as trace:
+            trace.write(text[:middle])
+        self.assertFalse(follower.poll())
+        self.assertEqual(follower.offset, middle)
+        rows = len(follower.table)
+
+        with open(self.path, "a") as trace:
+            trace.write(text[middle:])
+        table = follower.finish()
+
+        statistics = Tick_statistics()
+        expected = statistics.get_tick_statistics_list(self.path)
+        self.assertLess(rows, len(table))
+        self.assertEqual(
+            [row.astuple() for row in table], [row.astuple() for row in expected]
+        )
+        stall, ratio, _ = statistics.get_pipeline_objectives(expected, 2)
+        self.assertEqual(follower.longest_stall, stall)
+        self.assertEqual(follower.worst_ratio, ratio)
+
+    def test_terminates_simulation_at_target(self) -> None:
+        script = (
+            "import sys, time\n"
+            "trace = open(sys.argv[1], 'w')\n"
+            "trace.writelines(sys.argv[2:])\n"
+            "trace.flush()\n"
+            "time.sleep(30)\n"
+        )
+        # the later fetch finishes the ticks of TRACE while gem5 keeps running
+        lines = [*TRACE, "O3PipeView:fetch:20000:0x00010084:0:4:  nop\n"]
+        process = subprocess.Popen([sys.executable, "-c", script, self.path, *lines])
+        follower = Trace_follower(self.path, stall_target=1000)
+
+        self.assertTrue(follower.follow(process, interval=0.05, timeout=20))
+        self.assertIsNotNone(process.poll())
+        self.assertGreaterEqual(follower.longest_stall, 1000)
@@ -0,0 +1,88 @@
+import stat
+import tempfile
+import unittest
+from pathlib import Path
+
+from pfuzz.mutation.validity import Assembly_validator, operand_matches
+
+FAKE_ASSEMBLER = """#!/bin/sh
+for source; do :; done
+echo "$@" >> "$(dirname "$0")/calls"
+grep -n bogus "$source" | sed 's/^\\([0-9]*\\):.*/chunk.s:\\1: Error: unknown/' >&2
+! grep -q bogus "$source"
+"""
+
+PROGRAM = "main:\n    add a0, a1, a2\nloop:\n    beq a0, zero, loop\n    ret\n"
+
+
+class TestAssemblyValidator(unittest.TestCase):
+    def setUp(self) -> None:
+        self.validator = Assembly_validator()
+
+    def test_operand_kinds(self) -> None:
+        self.assertTrue(operand_matches("reg", "x31"))
+        self.assertFalse(operand_matches("reg", "x32"))
+        self.assertTrue(operand_matches("imm12", "-2048"))
+        self.assertFalse(operand_matches("imm12", "2048"))
+        self.assertTrue(operand_matches("imm12", "%lo(counter)"))
+        self.assertTrue(operand_matches("shamt", "0x3f"))
+        self.assertTrue(operand_matches("label", ".L2"))
+        self.assertFalse(operand_matches("label", "a0"))
+        self.assertTrue(operand_matches("mem", "-8(s0)"))
+        self.assertTrue(operand_matches("mem", "(sp)"))
+        self.assertFalse(operand_matches("mem", "8(label)"))
+        self.assertTrue(operand_matches("mem", "%lo(g_1)(a5)"))
+        self.assertTrue(operand_matches("mem", "%lo(.LC0)(a5)"))
+        self.assertFalse(operand_matches("mem", "%lo(g_1)(g_2)"))
+
+    def test_check_line(self) -> None:
+        self.assertIsNone(self.validator.check_line("\taddi sp, sp, -16"))
+        self.assertIsNone(self.validator.check_line("\tsd ra, 8(sp)  # save"))
+        self.assertIsNone(self.validator.check_line("\tcall printf"))
+        self.assertIsNone(self.validator.check_line("\tlw a5,%lo(g_1)(a5)"))
+        self.assertIsNone(self.validator.check_line("\tsw a4,%lo(g_2)(a5)"))
+        self.assertIsNone(self.validator.check_line("\tld a5,%lo(.LC0)(a5)"))
+        self.assertIsNone(self.validator.check_line("\t.globl main"))
+        self.assertEqual(self.validator.check_line("\tlw a0, a1, a2"), "arity")
+        self.assertEqual(self.validator.check_line("\tbeq a0, 8(sp)"), "arity")
+        self.assertEqual(self.validator.check_line("\tadd a0, a1, 4"), "operand kind")
+        self.assertEqual(
+            self.validator.check_line("\taddi a0, a1, 4096"), "operand kind"
+        )
+
+    def test_validate_counts_rejections(self) -> None:
+        programs = [PROGRAM, PROGRAM.replace("add", "lw"), PROGRAM.replace("beq", "or")]
+        self.assertEqual(self.validator.validate(programs), [True, False, False])
+        self.assertEqual(
+            self.validator.stats(),
+            {"checked": 3, "accepted": 1, "arity": 1, "operand kind": 1},
+        )
+
+    def test_assembler_runs_once_per_chunk(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            assembler = Path(tmp_dir) / "as"
+            assembler.write_text(FAKE_ASSEMBLER)
+            assembler.chmod(assembler.stat().st_mode | stat.S_IEXEC)
+            validator = Assembly_validator(str(assembler), ["-march=rv64gc"], 2)
+            programs = [
+                PROGRAM,
+                PROGRAM.replace("ret", "bogus"),
+                PROGRAM.replace("add", "sw"),
+                PROGRAM,
+                PROGRAM + "    bogus\n",
+            ]
+            valid = validator.validate(programs)
+            calls = (Path(tmp_dir) / "calls").read_text().splitlines()
+
+        self.assertEqual(valid, [True, False, False, True, False])
+        self.assertEqual(len(calls), 2)
+        self.assertTrue(calls[0].startswith("-march=rv64gc -o "))
+        self.assertEqual(validator.rejected["assembler"], 2)
+        self.assertEqual(validator.stats()["accepted"], 2)
+
+    def test_labels_are_kept_apart(self) -> None:
+        source, starts = self.validator._merge([PROGRAM, PROGRAM])
+        self.assertEqual(starts, [1, 6])
+        self.assertIn("p0_loop:", source)
+        self.assertIn("beq a0, zero, p1_loop", source)
+        self.assertNotIn("p1_zero", source)